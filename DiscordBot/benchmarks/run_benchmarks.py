@@ -0,0 +1,476 @@
+"""Микробенчмарки горячих путей бота с проверкой регрессий
+
+Запуск из каталога DiscordBot (нужен config.py, сеть и токен Discord не нужны):
+    python -m benchmarks.run_benchmarks                  # сравнить с benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks -k embed         # только бенчмарки, в имени которых есть "embed"
+    python -m benchmarks.run_benchmarks --output results.json
+    python -m benchmarks.run_benchmarks --save-baseline  # записать текущие результаты как базовую линию
+
+Для каждого бенчмарка измеряется время одной операции (медиана и минимум по
+нескольким раундам). Бенчмарк считается регрессией, если медиана превышает
+медиану базовой линии больше чем на допустимую долю (tolerance в baseline.json,
+общая или для отдельного бенчмарка). При регрессии код возврата равен 1.
+
+Базовая линия зависит от машины: после смены машины CI ее нужно записать заново.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import inspect
+import logging
+import argparse
+import platform
+import statistics
+import tempfile
+import discord
+from discord.ext import commands
+from utils.storage import JsonStorage, SQLiteStorage, default_server_status, write_json_file, MESSAGE_FILES
+from utils.message_catalog import MessageCatalog
+from utils.status_client import StatusClient
+from utils.paginator import EmbedContent, Paginator
+from utils.templates import compile_template
+from cogs.server_status import ServerStatus
+from cogs.notifications import Notifications, NotificationTarget
+from cogs.messages import Messages
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(BENCHMARKS_DIR, 'baseline.json')
+DEFAULT_TOLERANCE = 0.5
+
+# Минимальная длительность одного раунда измерений (в секундах) и количество раундов
+ROUND_TIME = 0.05
+ROUNDS = 5
+
+# Зарегистрированные бенчмарки: (имя, async-функция подготовки, возвращающая измеряемую функцию)
+BENCHMARKS = []
+
+
+def benchmark(name):
+    """Регистрирует бенчмарк; функция подготовки получает окружение и возвращает измеряемую функцию"""
+    def decorator(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return decorator
+
+
+class OfflineBot(commands.Bot):
+    """Бот без подключения к Discord: считается готовым, смена статуса ничего не отправляет"""
+
+    def __init__(self):
+        super().__init__(command_prefix='!', intents=discord.Intents.default())
+        self.presence_updates = 0
+
+    def is_ready(self):
+        return True
+
+    async def change_presence(self, **kwargs):
+        self.presence_updates += 1
+
+
+class FakeChannel:
+    """Канал, который только считает отправленные сообщения"""
+
+    def __init__(self, channel_id):
+        self.id = channel_id
+        self.sent = 0
+
+    async def send(self, **kwargs):
+        self.sent += 1
+
+
+def make_players(count):
+    return [f"Player_{i:04d}" for i in range(count)]
+
+
+def make_status_response(player_count):
+    """Ответ API статуса StatusMod с указанным количеством игроков"""
+    return {
+        'online': True,
+        'playerCount': player_count,
+        'maxPlayers': max(32, player_count),
+        'players': make_players(player_count),
+        'tps': 19.8,
+        'uptime': '3 ч. 12 мин.',
+        'version': '1.20.0',
+        'temporalStorm': 'Неактивен',
+        'prettyDate': '12 мая 3 года, 14:00'
+    }
+
+
+def make_server_status(player_count):
+    """Состояние из хранилища (формат server_status.json) с указанным количеством игроков"""
+    status = default_server_status()
+    status['server'].update({
+        'online': True,
+        'player_count': player_count,
+        'max_players': max(32, player_count),
+        'players': make_players(player_count),
+        'tps': 19.8,
+        'uptime': '3 ч. 12 мин.',
+        'version': '1.20.0',
+        'temporal_storm': 'Неактивен',
+        'pretty_date': '12 мая 3 года, 14:00',
+        'last_checked': '2025-01-01 12:00:00'
+    })
+    return status
+
+
+def make_guide(guide_id, sections=10, section_length=1500):
+    rng = random.Random(guide_id)
+    words = ['шторм', 'руда', 'медь', 'бронза', 'печь', 'глина', 'кремень', 'сезон', 'урожай', 'зима']
+    text = lambda length: ' '.join(rng.choice(words) for _ in range(length // 6))
+    return {
+        'id': guide_id,
+        'title': f"Гайд {guide_id}: {text(30)}",
+        'description': text(200),
+        'content': text(800),
+        'author': 'Benchmark',
+        'sections': [{'title': f"Раздел {i + 1}", 'content': text(section_length)} for i in range(sections)]
+    }
+
+
+def make_messages():
+    return {
+        'storm': {
+            'storm_warning': [f"⚠️ Шторм близко ({i}) на {{server}}, игроков {{player_count}}/{{max_players}}" for i in range(20)],
+            'storm_start': [f"⚡ Шторм начался ({i}) в {{game_time}}" for i in range(20)],
+            'storm_end': [f"☀️ Шторм закончился ({i})" for i in range(20)]
+        },
+        'season': {season: [f"{season} ({i}): {{season}} на {{server}}" for i in range(20)]
+                   for season in ('spring', 'summer', 'autumn', 'winter')}
+    }
+
+
+class Environment:
+    """Окружение бенчмарков: бот без сети, cogs и хранилища во временном каталоге"""
+
+    async def start(self, tmp_dir):
+        self.tmp_dir = tmp_dir
+        data_dir = os.path.join(tmp_dir, 'data')
+        os.makedirs(data_dir)
+        write_json_file(os.path.join(data_dir, 'guides.json'), {'guides': [make_guide(i) for i in range(1, 21)]})
+        for kind, file_name in MESSAGE_FILES.items():
+            write_json_file(os.path.join(data_dir, file_name), make_messages()[kind])
+        write_json_file(os.path.join(data_dir, 'server_status.json'), make_server_status(10))
+
+        self.bot = OfflineBot()
+        self.bot.storage = JsonStorage(data_dir)
+        self.bot.message_catalog = MessageCatalog(self.bot.storage, check_interval=0)
+        self.bot.message_catalog.ensure_loaded()
+        self.sqlite = SQLiteStorage(os.path.join(tmp_dir, 'bench.db'), import_dir=data_dir)
+
+        self.server_status = ServerStatus(self.bot)
+        # Фоновый опрос сервера в бенчмарках не нужен
+        self.server_status.status_update_task.cancel()
+        await self.bot.add_cog(self.server_status)
+
+        self.notifications = Notifications(self.bot)
+        self.channels = [FakeChannel(1000 + i) for i in range(3)]
+        self.notifications.routes = {'*': [NotificationTarget(channel.id, None, None) for channel in self.channels]}
+        self.notifications.channel_cache = {channel.id: channel for channel in self.channels}
+        # Защита от повторов отбросила бы все уведомления пакета после первого уведомления каждого типа
+        self.notifications.notification_cooldown = 0
+        self.messages = Messages(self.bot)
+        # Cog уведомлений не регистрируется в боте: cog_load запустил бы HTTP сервер на NOTIFICATION_PORT
+        return self
+
+    async def close(self):
+        await self.bot.close()
+        self.sqlite.close()
+
+
+# --- Статус сервера -----------------------------------------------------------
+
+def status_embed_benchmark(player_count):
+    async def setup(env):
+        status = make_server_status(player_count)
+        return lambda: env.server_status.create_server_status_embed(status)
+    return setup
+
+
+for player_count in (0, 50, 500):
+    benchmark(f"status_embed[{player_count}]")(status_embed_benchmark(player_count))
+
+
+@benchmark("status_embed[maintenance]")
+async def setup_status_embed_maintenance(env):
+    status = make_server_status(10)
+    status['manual_maintenance'] = {'active': True, 'reason': 'Обновление сервера'}
+    return lambda: env.server_status.create_server_status_embed(status)
+
+
+def status_parse_benchmark(player_count):
+    async def setup(env):
+        body = json.dumps(make_status_response(player_count))
+        return lambda: StatusClient.normalize(json.loads(body))
+    return setup
+
+
+for player_count in (0, 50, 500):
+    benchmark(f"status_parse[{player_count}]")(status_parse_benchmark(player_count))
+
+
+@benchmark("status_apply_delta[500]")
+async def setup_status_apply_delta(env):
+    client = StatusClient('http://localhost/')
+    client.snapshot = make_status_response(500)
+    delta = {'delta': True, 'added': make_players(505)[500:], 'removed': make_players(5), 'baseVersion': 41}
+    return lambda: client.apply_delta(delta)
+
+
+def bot_presence_benchmark(status):
+    async def setup(env):
+        return lambda: env.server_status.update_bot_presence(status)
+    return setup
+
+
+PRESENCE_STATES = {
+    'online': make_server_status(50),
+    'offline': dict(make_server_status(0), server={'online': False}),
+    'maintenance': dict(make_server_status(0), manual_maintenance={'active': True, 'reason': 'Обновление'})
+}
+
+for state_name, status in PRESENCE_STATES.items():
+    benchmark(f"bot_presence[{state_name}]")(bot_presence_benchmark(status))
+
+
+# --- Уведомления --------------------------------------------------------------
+
+NOTIFICATION_PAYLOADS = {
+    'storm_warning': {'type': 'storm_notification', 'data': {'type': 'storm_notification', 'is_warning': True, 'time': '12:00'}},
+    'storm_start': {'type': 'storm_notification', 'data': {'type': 'storm_notification', 'is_active': True, 'time': '12:00'}},
+    'storm_end': {'type': 'storm_notification', 'data': {'type': 'storm_notification', 'is_active': False, 'time': '12:00'}},
+    'season': {'type': 'season_notification', 'data': {'type': 'season_notification', 'season': 'зима', 'time': '1 декабря'}},
+    'server_status': {'type': 'server_status', 'data': {'type': 'server_status'}}
+}
+
+def notification_benchmark(payload):
+    async def setup(env):
+        cog = env.notifications
+
+        return lambda: cog.process_notification(payload)
+    return setup
+
+
+def make_batch(size):
+    payloads = list(NOTIFICATION_PAYLOADS.values())
+    return {'type': 'notification_batch', 'notifications': [payloads[i % len(payloads)] for i in range(size)]}
+
+
+for notification_name, payload in NOTIFICATION_PAYLOADS.items():
+    benchmark(f"process_notification[{notification_name}]")(notification_benchmark(payload))
+
+for batch_size in (50, 500):
+    benchmark(f"process_notification[batch {batch_size}]")(notification_benchmark(make_batch(batch_size)))
+
+
+# --- Гайды и сообщения ------------------------------------------------------
+
+@benchmark("guide_render[10 sections]")
+async def setup_guide_render(env):
+    guide = make_guide(1)
+
+    def run():
+        content = lambda: EmbedContent(
+            title=guide['title'],
+            description=guide['content'],
+            fields=[(section['title'], section['content']) for section in guide['sections']],
+            footer=f"Автор: {guide['author']}"
+        )
+        paginator = Paginator(content)
+        paginator.ensure_layout()
+        for page in range(paginator.page_count):
+            paginator.render(page)
+        paginator.stop()
+    return run
+
+
+@benchmark("message_list_render[storm]")
+async def setup_message_list_render(env):
+    def run():
+        paginator = Paginator(lambda: env.messages.build_list_content('storm', "Сообщения о штормах"))
+        paginator.ensure_layout()
+        for page in range(paginator.page_count):
+            paginator.render(page)
+        paginator.stop()
+    return run
+
+
+@benchmark("message_choice[storm_warning]")
+async def setup_message_choice(env):
+    catalog = env.bot.message_catalog
+    context = env.notifications.build_template_context(game_time='12:00')
+    return lambda: catalog.choice('storm', 'storm_warning', context)
+
+
+@benchmark("template_compile")
+async def setup_template_compile(env):
+    text = "⚡ Шторм на {server}! Игроков онлайн: {player_count}/{max_players}, время {game_time}"
+    return lambda: compile_template(text)
+
+
+# --- Запись данных ----------------------------------------------------------
+
+@benchmark("storage_json[save_status_section]")
+async def setup_json_status_write(env):
+    server = make_server_status(50)['server']
+    return lambda: env.bot.storage.save_status_section('server', server)
+
+
+@benchmark("storage_json[insert_message]")
+async def setup_json_message_write(env):
+    storage = env.bot.storage
+
+    def run():
+        storage.insert_message('storm', 'storm_end', "Временное сообщение")
+        storage.delete_messages('storm', 'storm_end', len(storage.load_messages('storm')['storm_end']) - 1)
+    return run
+
+
+@benchmark("storage_sqlite[save_status_section]")
+async def setup_sqlite_status_write(env):
+    server = make_server_status(50)['server']
+    return lambda: env.sqlite.save_status_section('server', server)
+
+
+@benchmark("storage_sqlite[append_status_history]")
+async def setup_sqlite_history_write(env):
+    return lambda: env.sqlite.append_status_history(True, 12)
+
+
+# --- Измерение и сравнение ---------------------------------------------------
+
+async def call(function):
+    result = function()
+    if inspect.isawaitable(result):
+        await result
+
+
+async def measure(function, round_time=ROUND_TIME, rounds=ROUNDS):
+    """Возвращает время одной операции по раундам (в микросекундах)
+
+    Количество вызовов в раунде подбирается так, чтобы раунд длился не меньше round_time.
+    """
+    await call(function)
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            await call(function)
+        elapsed = time.perf_counter() - start
+        if elapsed >= round_time:
+            break
+        number = number * 10 if elapsed < round_time / 10 else number * 2
+
+    samples = [elapsed / number]
+    for _ in range(rounds - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            await call(function)
+        samples.append((time.perf_counter() - start) / number)
+    return [sample * 1_000_000 for sample in samples], number
+
+
+async def run_benchmarks(name_filter=None, round_time=ROUND_TIME, rounds=ROUNDS):
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='bot-bench-') as tmp_dir:
+        env = await Environment().start(tmp_dir)
+        try:
+            for name, setup in BENCHMARKS:
+                if name_filter and name_filter not in name:
+                    continue
+                function = await setup(env)
+                samples, number = await measure(function, round_time, rounds)
+                results[name] = {
+                    'median_us': round(statistics.median(samples), 3),
+                    'min_us': round(min(samples), 3),
+                    'calls_per_round': number
+                }
+                print(f"{name:<44} {results[name]['median_us']:>12.1f} мкс")
+        finally:
+            await env.close()
+    return results
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {'tolerance': DEFAULT_TOLERANCE, 'benchmarks': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(results, baseline):
+    """Сравнивает результаты с базовой линией; возвращает список регрессий"""
+    default_tolerance = baseline.get('tolerance', DEFAULT_TOLERANCE)
+    regressions = []
+    print()
+    print(f"{'Бенчмарк':<44} {'База, мкс':>12} {'Сейчас, мкс':>12} {'Отношение':>10}")
+    for name, result in results.items():
+        base = baseline.get('benchmarks', {}).get(name)
+        if not base:
+            print(f"{name:<44} {'-':>12} {result['median_us']:>12.1f} {'новый':>10}")
+            continue
+        ratio = result['median_us'] / base['median_us'] if base['median_us'] else 1.0
+        tolerance = base.get('tolerance', default_tolerance)
+        marker = ''
+        if ratio > 1 + tolerance:
+            marker = '  РЕГРЕССИЯ'
+            regressions.append((name, ratio, tolerance))
+        print(f"{name:<44} {base['median_us']:>12.1f} {result['median_us']:>12.1f} {ratio:>9.2f}x{marker}")
+    return regressions
+
+
+def save_baseline(results, path, previous):
+    """Записывает результаты как базовую линию
+
+    Настроенные допуски сохраняются, бенчмарки, которые не запускались (фильтр -k), остаются прежними.
+    """
+    benchmarks = dict(previous.get('benchmarks', {}))
+    for name, result in results.items():
+        benchmarks[name] = {**benchmarks.get(name, {}), 'median_us': result['median_us']}
+    baseline = {
+        'tolerance': previous.get('tolerance', DEFAULT_TOLERANCE),
+        'machine': f"{platform.python_implementation()} {platform.python_version()}, {platform.machine()}",
+        'benchmarks': benchmarks
+    }
+    write_json_file(path, baseline)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Микробенчмарки горячих путей бота")
+    parser.add_argument('-k', dest='name_filter', default=None, help="Запускать только бенчмарки, в имени которых есть эта строка")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="Файл базовой линии")
+    parser.add_argument('--output', default=None, help="Записать результаты в JSON файл")
+    parser.add_argument('--save-baseline', action='store_true', help="Записать результаты как новую базовую линию")
+    parser.add_argument('--rounds', type=int, default=ROUNDS, help="Количество раундов измерений")
+    parser.add_argument('--round-time', type=float, default=ROUND_TIME, help="Минимальная длительность раунда (в секундах)")
+    args = parser.parse_args(argv)
+
+    # Журнал бота не должен влиять на измерения и засорять вывод
+    logging.getLogger('discord_bot').setLevel(logging.CRITICAL)
+
+    results = asyncio.run(run_benchmarks(args.name_filter, args.round_time, max(1, args.rounds)))
+    if args.output:
+        write_json_file(args.output, results)
+
+    baseline = load_baseline(args.baseline)
+    if args.save_baseline:
+        save_baseline(results, args.baseline, baseline)
+        print(f"\nБазовая линия записана в {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline)
+    if regressions:
+        print(f"\nОбнаружены регрессии производительности: {len(regressions)}")
+        for name, ratio, tolerance in regressions:
+            print(f"  {name}: в {ratio:.2f} раза медленнее (допустимо до {1 + tolerance:.2f})")
+        return 1
+    print("\nРегрессий не обнаружено")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,55 @@
 import os
+import time
+import signal
 import logging
 import asyncio
-import discord
-from discord.ext import commands
-import aiohttp
-from config import Config
-
-# Настройка логирования
-logging.basicConfig(
-    level=logging.ERROR,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("discord_bot.log", encoding='utf-8'),
-        logging.StreamHandler()
-    ]
+import tracemalloc
+# Таймер импортируется первым, чтобы в отчет о запуске попало время импорта остальных модулей
+from utils.startup_timing import startup_timer
+
+with startup_timer.measure('import', 'discord'):
+    import discord
+    from discord.ext import commands
+    import aiohttp
+    import yarl
+with startup_timer.measure('import', 'config'):
+    from config import Config
+with startup_timer.measure('import', 'utils.command_sync'):
+    from utils.command_sync import sync_command_tree
+    from utils.hot_reload import hot_reload_extension
+    from utils.health import get_health_state
+    from utils.logging_setup import configure_logging, stop_logging, set_log_level, get_log_level, LOG_LEVELS
+    from utils.memory import describe_structure, process_memory, tracemalloc_summary, format_bytes
+
+# Настройка логирования: записи передаются через очередь фоновому потоку,
+# поэтому запись в файл и консоль не блокирует цикл событий
+configure_logging(
+    level=Config.LOG_LEVEL,
+    path=Config.LOG_FILE,
+    log_format=Config.LOG_FORMAT,
+    rotation=Config.LOG_ROTATION,
+    max_bytes=Config.LOG_MAX_BYTES,
+    backup_count=Config.LOG_BACKUP_COUNT,
+    when=Config.LOG_ROTATION_WHEN
 )
 logger = logging.getLogger('discord_bot')
 
+# Отслеживание выделений памяти замедляет работу, поэтому включается только по настройке или командой memory
+if Config.MEMORY_TRACEMALLOC:
+    tracemalloc.start()
+
+# Подключение к локальной замене Discord API (tools/fake_discord.py) вместо настоящего Discord
+if Config.DISCORD_API_BASE:
+    discord.http.Route.BASE = Config.DISCORD_API_BASE.rstrip('/')
+    logger.warning(f"REST API Discord заменен на {discord.http.Route.BASE}")
+if Config.DISCORD_GATEWAY_URL:
+    discord.gateway.DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(Config.DISCORD_GATEWAY_URL)
+    logger.warning(f"Шлюз Discord заменен на {Config.DISCORD_GATEWAY_URL}")
+
 # Инициализация бота
 intents = discord.Intents.default()
-intents.message_content = True  # Разрешаем боту читать содержимое сообщений
+intents.message_content = True  # Разрешаем боту читать содержимое сообщений (нужно для префиксных команд)
+# Основные команды доступны и как слэш-команды; префиксы оставлены для совместимости
 bot = commands.Bot(command_prefix=['!', '/'], description="Бот для управления сервером Vintage Story", intents=intents)
 
 # Путь к директории с cogs
@@ -30,24 +60,69 @@ EXTENSIONS = [
     'cogs.server_status',
     'cogs.notifications',
     'cogs.guides',
-    'cogs.messages'
+    'cogs.messages',
+    'cogs.subscriptions'
+]
+# Расширения, загружаемые при INGESTION_ONLY (без входа в Discord)
+INGESTION_EXTENSIONS = [
+    'cogs.notifications'
 ]
 
+# Устанавливается при получении сигнала остановки (ожидается в режиме INGESTION_ONLY)
+shutdown_requested = asyncio.Event()
+
+async def setup_hook():
+    """Выполняется после авторизации и до подключения к шлюзу Discord"""
+    try:
+        # Дерево команд синхронизируется только при изменении сигнатур команд
+        with startup_timer.measure('startup', 'sync_command_tree'):
+            await sync_command_tree(bot)
+    except Exception as e:
+        logger.error(f"Не удалось синхронизировать слэш-команды: {e}")
+    bot.setup_finished_at = time.perf_counter()
+
+bot.setup_hook = setup_hook
+
 @bot.event
 async def on_ready():
     """Выполняется при успешном подключении бота к Discord"""
     logger.warning(f'Бот {bot.user.name} успешно подключен к Discord! ID: {bot.user.id}')
+    get_health_state(bot).gateway_ready = True
     
-    # Устанавливаем начальный статус бота
-    await bot.change_presence(
-        activity=discord.Game(name=f"{Config.SERVER_NAME}: Подключение к серверу..."),
-        status=discord.Status.idle
-    )
+    # Отчет о запуске формируется только при первом on_ready (при переподключениях событие повторяется)
+    setup_finished_at = getattr(bot, 'setup_finished_at', None)
+    if setup_finished_at is not None:
+        startup_timer.record('startup', 'gateway (до on_ready)', time.perf_counter() - setup_finished_at)
+    if startup_timer.mark_ready():
+        logger.warning(f"Отчет о запуске бота:\n{startup_timer.report(Config.Timers.STARTUP_BUDGET)}")
+        if startup_timer.total > Config.Timers.STARTUP_BUDGET:
+            logger.error(f"Запуск бота занял {startup_timer.total:.1f} с при бюджете {Config.Timers.STARTUP_BUDGET:.1f} с")
+    
+    # Устанавливаем начальный статус бота; если статус сервера уже получен (переподключение к Discord
+    # или ответ рабочего процесса пришел раньше on_ready), показываем его - ответ 304 статус не обновит
+    server_status = bot.get_cog('ServerStatus')
+    if server_status is not None and server_status.status_client.snapshot is not None:
+        await server_status.update_bot_presence(server_status.get_current_server_status())
+    else:
+        await bot.change_presence(
+            activity=discord.Game(name=f"{Config.SERVER_NAME}: Подключение к серверу..."),
+            status=discord.Status.idle
+        )
     
     # Логируем информацию о серверах, к которым подключен бот
     guilds_info = ", ".join([f"{guild.name} (ID: {guild.id})" for guild in bot.guilds])
     logger.warning(f"Подключен к следующим серверам: {guilds_info}")
 
+@bot.event
+async def on_disconnect():
+    """Соединение со шлюзом Discord потеряно (discord.py переподключится автоматически)"""
+    get_health_state(bot).gateway_ready = False
+
+@bot.event
+async def on_resumed():
+    """Сессия шлюза восстановлена после переподключения"""
+    get_health_state(bot).gateway_ready = True
+
 @bot.event
 async def on_command_error(ctx, error):
     """Обработчик ошибок команд"""
@@ -91,35 +166,295 @@ async def uptime(ctx):
     
     await ctx.send(embed=embed)
 
+@bot.command(name='sync_commands', aliases=['синхронизировать_команды'])
+@commands.has_permissions(administrator=True)
+async def sync_commands(ctx):
+    """Принудительно синхронизирует слэш-команды с Discord"""
+    try:
+        await sync_command_tree(bot, force=True)
+        await ctx.send("✅ Слэш-команды синхронизированы.")
+    except Exception as e:
+        logger.error(f"Ошибка при синхронизации слэш-команд: {e}")
+        await ctx.send("❌ Не удалось синхронизировать слэш-команды.")
+
+@bot.command(name='startup_report', aliases=['отчет_запуска'])
+@commands.has_permissions(administrator=True)
+async def startup_report(ctx):
+    """Показывает время этапов запуска бота (импорты, cogs, загрузка данных)"""
+    report = startup_timer.report(Config.Timers.STARTUP_BUDGET)
+    await ctx.send(f"```\n{report[:1900]}\n```")
+
+@bot.command(name='reload_cog', aliases=['перезагрузить_модуль'])
+@commands.has_permissions(administrator=True)
+async def reload_cog(ctx, extension: str):
+    """Перезагружает модуль без потери состояния (HTTP сервер, очередь уведомлений, статус)
+
+    Параметры:
+    extension - имя модуля: server_status, notifications, guides, messages, subscriptions
+    """
+    if not extension.startswith('cogs.'):
+        extension = f"cogs.{extension}"
+    if extension not in EXTENSIONS:
+        await ctx.send(f"❌ Неизвестный модуль: {extension}. Доступные модули: {', '.join(EXTENSIONS)}")
+        return
+    
+    try:
+        cog_names = await hot_reload_extension(bot, extension)
+    except Exception as e:
+        logger.error(f"Ошибка при перезагрузке модуля {extension}: {e}", exc_info=e)
+        await ctx.send(f"❌ Не удалось перезагрузить модуль {extension}: {e}")
+        return
+    
+    # Сигнатуры команд могли измениться; без изменений синхронизация пропускается
+    try:
+        await sync_command_tree(bot)
+    except Exception as e:
+        logger.error(f"Не удалось синхронизировать слэш-команды после перезагрузки {extension}: {e}")
+    
+    logger.warning(f"Модуль {extension} перезагружен ({', '.join(cog_names)})")
+    await ctx.send(f"✅ Модуль {extension} перезагружен, состояние передано: {', '.join(cog_names) or 'нет cogs'}")
+
+@bot.command(name='log_level', aliases=['уровень_логов'])
+@commands.has_permissions(administrator=True)
+async def log_level(ctx, level: str = None):
+    """Показывает или меняет уровень журналирования без перезапуска бота
+    
+    Параметры:
+    level - DEBUG, INFO, WARNING, ERROR или CRITICAL (без параметра показывает текущий уровень)
+    """
+    if level is None:
+        await ctx.send(f"Текущий уровень журналирования: {get_log_level()}")
+        return
+    
+    try:
+        level = set_log_level(level)
+    except ValueError:
+        await ctx.send(f"❌ Неизвестный уровень. Доступные уровни: {', '.join(LOG_LEVELS)}")
+        return
+    
+    worker = getattr(bot, 'worker', None)
+    if worker is not None:
+        worker.send(('log_level', level))
+    logger.warning(f"Уровень журналирования изменен на {level} пользователем {ctx.author}")
+    await ctx.send(f"✅ Уровень журналирования: {level}")
+
+@bot.command(name='memory', aliases=['память'])
+@commands.has_permissions(administrator=True)
+async def memory(ctx, tracing: str = None):
+    """Показывает размеры долгоживущих структур бота и потребление памяти процессом
+    
+    Параметры:
+    tracing - start или stop: включить или выключить отслеживание выделений памяти (tracemalloc)
+    """
+    if tracing == 'start':
+        tracemalloc.start()
+        await ctx.send("✅ Отслеживание выделений памяти включено")
+        return
+    if tracing == 'stop':
+        tracemalloc.stop()
+        await ctx.send("✅ Отслеживание выделений памяти выключено")
+        return
+    if tracing is not None:
+        await ctx.send("❌ Неизвестный параметр. Используйте `start` или `stop`.")
+        return
+    
+    rss, peak = process_memory()
+    embed = discord.Embed(
+        title="Память бота",
+        description=f"RSS процесса: {format_bytes(rss)} (пик: {format_bytes(peak)})",
+        color=discord.Color.blue()
+    )
+    
+    # Объекты, входящие в несколько структур, учитываются один раз - в первой из них
+    seen = set()
+    sources = [(name, cog.memory_structures()) for name, cog in bot.cogs.items() if hasattr(cog, 'memory_structures')]
+    catalog = getattr(bot, 'message_catalog', None)
+    if catalog is not None:
+        sources.append(("Каталог сообщений", catalog.memory_structures()))
+    
+    for source_name, structures in sources:
+        lines = []
+        for name, structure in structures.items():
+            entries, size = describe_structure(structure, seen)
+            entries_text = f"{entries} зап., " if entries is not None else ""
+            evictions = getattr(structure, 'evictions', 0)
+            evictions_text = f", вытеснено {evictions}" if evictions else ""
+            limit = getattr(structure, 'maxsize', None)
+            limit_text = f" из {limit}" if limit else ""
+            lines.append(f"`{name}`: {entries_text}~{format_bytes(size)}{limit_text}{evictions_text}")
+        embed.add_field(name=source_name, value="\n".join(lines)[:1024] or "-", inline=False)
+    
+    summary = await asyncio.to_thread(tracemalloc_summary)
+    if summary is not None:
+        current, traced_peak, top = summary
+        lines = [f"Отслеживается: {format_bytes(current)} (пик: {format_bytes(traced_peak)})"]
+        lines.extend(f"`{location}`: {format_bytes(size)} ({count} об.)" for location, size, count in top)
+        embed.add_field(name="tracemalloc", value="\n".join(lines)[:1024], inline=False)
+    else:
+        embed.set_footer(text="Подробная статистика выделений: !memory start")
+    
+    await ctx.send(embed=embed)
+
+async def load_extension(extension):
+    """Загружает одно расширение; возвращает True при успехе"""
+    try:
+        with startup_timer.measure('extension', extension):
+            await bot.load_extension(extension)
+        return True
+    except Exception as e:
+        logger.error(f"Не удалось загрузить расширение {extension}: {e}", exc_info=e)
+        return False
+
 async def load_extensions():
-    """Загружает все расширения (cogs)"""
-    for extension in EXTENSIONS:
+    """Загружает все расширения (cogs) параллельно
+
+    Cogs не зависят друг от друга при загрузке (общие ресурсы создаются при первом
+    обращении), а чтение данных выполняется в cog_load в отдельных потоках,
+    поэтому расширения загружаются одновременно.
+    """
+    extensions = INGESTION_EXTENSIONS if Config.INGESTION_ONLY else EXTENSIONS
+    with startup_timer.measure('startup', 'load_extensions'):
+        results = await asyncio.gather(*(load_extension(extension) for extension in extensions))
+    
+    failed = [extension for extension, loaded in zip(extensions, results) if not loaded]
+    if failed:
+        logger.error(f"Не загружены расширения: {', '.join(failed)}")
+
+async def shutdown(reason):
+    """Корректно останавливает бота
+    
+    Порядок остановки:
+    1. рабочий процесс (WORKER_MODE) и cogs перестают принимать новую работу и дожидаются
+       обработки уже принятой (не дольше SHUTDOWN_DRAIN_TIMEOUT секунд); необработанное
+       записывается в журнал, после чего рабочий процесс останавливается;
+    2. расширения выгружаются: останавливаются HTTP сервер, фоновые задачи и HTTP сессии;
+    3. хранилище закрывается (для SQLite журнал WAL переносится в файл базы);
+    4. закрывается соединение с Discord.
+    """
+    logger.warning(f"Остановка бота ({reason})")
+    health = get_health_state(bot)
+    # /readyz сразу сообщает балансировщику, что бот больше не принимает работу
+    health.draining = True
+    budget = Config.Timers.SHUTDOWN_DRAIN_TIMEOUT
+    started = time.perf_counter()
+    
+    # Рабочий процесс перестает принимать уведомления и передает уже принятые
+    abandoned = []
+    worker = getattr(bot, 'worker', None)
+    if worker is not None:
+        abandoned.extend(await worker.drain())
+    
+    # Отправка уведомлений требует соединения с Discord, поэтому оно закрывается последним
+    drains = [cog.drain(budget) for cog in bot.cogs.values() if hasattr(cog, 'drain')]
+    results = await asyncio.gather(*drains, return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            logger.error(f"Ошибка при завершении обработки очереди: {result}", exc_info=result)
+        else:
+            abandoned.extend(result)
+    
+    if abandoned:
+        logger.error(f"Не обработано при остановке ({len(abandoned)}): {', '.join(abandoned)}")
+    else:
+        logger.warning(f"Принятая работа завершена за {time.perf_counter() - started:.1f} с")
+    
+    if worker is not None:
+        await worker.stop()
+    
+    for extension in reversed(list(bot.extensions)):
         try:
-            await bot.load_extension(extension)
-            # Не логируем успешную загрузку
+            await bot.unload_extension(extension)
         except Exception as e:
-            logger.error(f"Не удалось загрузить расширение {extension}: {e}")
+            logger.error(f"Ошибка при выгрузке расширения {extension}: {e}", exc_info=e)
+    
+    # Запланированные задачи остаются в хранилище и восстанавливаются при следующем запуске
+    scheduler = getattr(bot, 'scheduler', None)
+    if scheduler is not None:
+        scheduler.stop()
+    
+    webhook_delivery = getattr(bot, 'webhook_delivery', None)
+    if webhook_delivery is not None:
+        await webhook_delivery.close()
+    
+    storage = getattr(bot, 'storage', None)
+    if storage is not None:
+        try:
+            storage.close()
+        except Exception as e:
+            logger.error(f"Ошибка при закрытии хранилища: {e}")
+    
+    if not bot.is_closed():
+        await bot.close()
+    health.stop_heartbeat()
+    logger.warning("Бот остановлен")
+
+def request_shutdown(reason):
+    """Запускает остановку бота (один раз); возвращает задачу остановки"""
+    task = getattr(bot, 'shutdown_task', None)
+    if task is None:
+        task = asyncio.get_running_loop().create_task(shutdown(reason))
+        bot.shutdown_task = task
+        shutdown_requested.set()
+    else:
+        logger.warning(f"Остановка бота уже выполняется, сигнал {reason} проигнорирован")
+    return task
+
+def install_signal_handlers():
+    """Перехватывает SIGTERM (остановка службы systemd) и SIGINT (Ctrl+C)"""
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, request_shutdown, sig.name)
+        except (NotImplementedError, RuntimeError):
+            # Windows: обработчики сигналов в цикле событий не поддерживаются
+            logger.warning(f"Обработчик сигнала {sig.name} не установлен на этой платформе")
 
 async def main():
     """Основная функция запуска бота"""
-    try:
-        # Сохраняем время запуска бота
-        bot.start_time = discord.utils.utcnow()
-        
-        # Загружаем расширения
-        await load_extensions()
-        
-        # Запускаем бота
-        await bot.start(Config.DISCORD_TOKEN)
-    except aiohttp.ClientConnectorError:
-        logger.error("Не удалось подключиться к Discord. Проверьте интернет-соединение.")
-    except discord.errors.LoginFailure:
-        logger.error("Не удалось авторизоваться в Discord. Проверьте токен бота.")
-    except Exception as e:
-        logger.error(f"Произошла ошибка при запуске бота: {e}")
-    finally:
-        if not bot.is_closed():
-            await bot.close()
+    # Контекстный менеджер инициализирует асинхронные объекты клиента до загрузки расширений:
+    # фоновые задачи cogs сразу ждут bot.wait_until_ready(), а до входа в Discord без этого
+    # discord.py завершает ожидание ошибкой и задачи (опрос статуса, поток) не запускаются
+    async with bot:
+        try:
+            # Сохраняем время запуска бота
+            bot.start_time = discord.utils.utcnow()
+            install_signal_handlers()
+            get_health_state(bot).start_heartbeat()
+            
+            # Загружаем расширения
+            await load_extensions()
+            
+            if Config.INGESTION_ONLY:
+                # Уведомления принимаются и доставляются через вебхуки без входа в Discord до сигнала остановки
+                get_health_state(bot).ingestion_only = True
+                logger.warning("Режим только приема уведомлений (INGESTION_ONLY): бот не подключается к Discord")
+                if Config.WORKER_MODE:
+                    logger.warning("WORKER_MODE не используется при INGESTION_ONLY: уведомления принимает основной процесс")
+                await shutdown_requested.wait()
+                return
+            
+            # Прием уведомлений и опрос статуса в отдельном процессе (модуль нужен только в этом режиме)
+            if Config.WORKER_MODE:
+                from utils.worker import WorkerSupervisor
+                bot.worker = WorkerSupervisor(bot)
+                await bot.worker.start()
+            
+            # Запускаем бота
+            await bot.start(Config.DISCORD_TOKEN)
+        except aiohttp.ClientConnectorError:
+            logger.error("Не удалось подключиться к Discord. Проверьте интернет-соединение.")
+        except discord.errors.LoginFailure:
+            logger.error("Не удалось авторизоваться в Discord. Проверьте токен бота.")
+        except Exception as e:
+            logger.error(f"Произошла ошибка при запуске бота: {e}")
+        finally:
+            # Остановка по сигналу уже могла начаться; в любом случае дожидаемся ее завершения
+            shutdown_task = getattr(bot, 'shutdown_task', None)
+            if shutdown_task is None:
+                shutdown_task = request_shutdown("завершение работы")
+            await shutdown_task
+            # Дописываем очередь журнала перед выходом из процесса
+            stop_logging()
 
 if __name__ == "__main__":
     # Запускаем бота в цикле событий asyncio
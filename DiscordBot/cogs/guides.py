@@ -1,10 +1,15 @@
-import os
-import json
+import asyncio
 import logging
 import discord
+from discord import app_commands
 from discord.ext import commands
 import functools
 from config import Config
+from utils.startup_timing import startup_timer
+from utils.search_index import GuideSearchIndex
+from utils.trie import PrefixTrie
+from utils.paginator import Paginator, EmbedContent
+from utils.storage import get_storage
 
 logger = logging.getLogger('discord_bot')
 
@@ -45,36 +50,102 @@ class Guides(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         
-        # Пути к файлам
-        self.BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        self.DATA_DIR = os.path.join(self.BASE_DIR, 'data')
-        self.GUIDES_FILE = os.path.join(self.DATA_DIR, 'guides.json')
+        # Хранилище данных (JSON файлы или SQLite, см. STORAGE_BACKEND)
+        self.storage = get_storage(bot)
         
-        # Загрузка гайдов
+        # Гайды загружаются в cog_load, чтобы не блокировать запуск бота
+        self.guides_data = {"guides": []}
+        
+        # Версия данных гайдов (увеличивается при каждом изменении, используется кэшем страниц)
+        self.guides_version = 0
+        
+        # Поисковый индекс по гайдам (обновляется инкрементально при изменениях)
+        self.search_index = GuideSearchIndex()
+        # Префиксное дерево названий гайдов для автодополнения слэш-команд
+        self.title_trie = PrefixTrie()
+        self.guide_positions = (None, {})
+    
+    async def cog_load(self):
+        """Загружает гайды и строит индексы в отдельном потоке"""
+        with startup_timer.measure('data', 'guides'):
+            await asyncio.to_thread(self.load_and_index_guides)
+    
+    def load_and_index_guides(self):
+        """Загружает гайды из хранилища и строит поисковый индекс и дерево автодополнения"""
         self.guides_data = self.load_guides()
+        for guide in self.guides_data.get('guides', []):
+            self.search_index.add_guide(guide['id'], guide)
+            self.index_guide_title(guide)
+        self.guides_version += 1
+    
+    def index_guide_title(self, guide):
+        """Добавляет гайд в дерево автодополнения по названию и по каждому слову названия"""
+        title = guide.get('title', '')
+        word_starts = [i for i, char in enumerate(title) if char.isalnum() and (i == 0 or not title[i - 1].isalnum())]
+        self.title_trie.add(guide['id'], title, *(title[i:] for i in word_starts))
+    
+    def get_guide_positions(self):
+        """Возвращает словарь ID гайда -> номер в списке (пересчитывается только при изменении гайдов)"""
+        version, positions = self.guide_positions
+        if version != self.guides_version:
+            positions = {guide['id']: i for i, guide in enumerate(self.guides_data.get('guides', []), 1)}
+            self.guide_positions = (self.guides_version, positions)
+        return positions
+    
+    async def guide_number_autocomplete(self, interaction, current):
+        """Подсказывает номера гайдов по началу названия или любого слова в названии"""
+        guides = self.guides_data.get('guides', [])
+        positions = self.get_guide_positions()
+        current = str(current or '').strip()
+        
+        if not current:
+            guide_ids = [guide['id'] for guide in guides[:25]]
+        elif current.isdigit():
+            # Введен номер гайда - подсказываем его и номера, начинающиеся с этих цифр
+            guide_ids = [guide['id'] for i, guide in enumerate(guides, 1) if str(i).startswith(current)][:25]
+        else:
+            guide_ids = self.title_trie.complete(current, limit=25)
+        
+        choices = []
+        for guide_id in guide_ids:
+            position = positions.get(guide_id)
+            if position is None:
+                continue
+            title = guides[position - 1].get('title', 'Без названия')
+            choices.append(app_commands.Choice(name=f"{position}. {title}"[:100], value=position))
+        return choices
+    
+    def memory_structures(self):
+        """Долгоживущие структуры cog для отчета о памяти"""
+        return {
+            'guides_data': self.guides_data,
+            'search_index': self.search_index,
+            'title_trie': self.title_trie,
+            'guide_positions': self.guide_positions[1]
+        }
+    
+    def next_guide_id(self):
+        """Возвращает ID для нового гайда"""
+        return max((guide.get('id', 0) for guide in self.guides_data.get('guides', [])), default=0) + 1
     
     def load_guides(self):
-        """Загружает данные гайдов из файла"""
+        """Загружает данные гайдов из хранилища"""
         try:
-            if os.path.exists(self.GUIDES_FILE):
-                with open(self.GUIDES_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return {"guides": []}
+            return self.storage.load_guides()
         except Exception as e:
             logger.error(f"Ошибка при загрузке гайдов: {e}")
             return {"guides": []}
     
-    def save_guides(self):
-        """Сохраняет данные гайдов в файл"""
+    def save_guide_change(self, change):
+        """Записывает изменение гайдов в хранилище (только измененные записи)"""
         try:
-            with open(self.GUIDES_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.guides_data, f, ensure_ascii=False, indent=2)
+            change()
             return True
         except Exception as e:
             logger.error(f"Ошибка при сохранении гайдов: {e}")
             return False
     
-    @commands.command(name='guides', aliases=['гайды'])
+    @commands.hybrid_command(name='guides', aliases=['гайды'])
     async def guides(self, ctx):
         """Отображает список доступных гайдов"""
         try:
@@ -84,28 +155,31 @@ class Guides(commands.Cog):
                 await ctx.send("❌ На данный момент нет доступных гайдов.")
                 return
             
-            # Создаем эмбед со списком гайдов
-            embed = discord.Embed(
-                title="Доступные гайды",
-                description="Используйте команду `!гайд [номер]` для просмотра конкретного гайда",
-                color=discord.Color.blue()
-            )
-            
-            # Добавляем информацию о каждом гайде
-            for i, guide in enumerate(guides, 1):
-                embed.add_field(
-                    name=f"{i}. {guide.get('title', 'Без названия')}",
-                    value=guide.get('short_description', 'Без описания')[:100] + "..." if len(guide.get('short_description', 'Без описания')) > 100 else guide.get('short_description', 'Без описания'),
-                    inline=False
+            def build_content():
+                # Добавляем информацию о каждом гайде
+                fields = []
+                for i, guide in enumerate(self.guides_data.get('guides', []), 1):
+                    description = guide.get('short_description') or guide.get('description') or 'Без описания'
+                    fields.append((
+                        f"{i}. {guide.get('title', 'Без названия')}",
+                        description[:100] + "..." if len(description) > 100 else description
+                    ))
+                return EmbedContent(
+                    title="Доступные гайды",
+                    description="Используйте команду `!гайд [номер]` для просмотра конкретного гайда",
+                    fields=fields
                 )
             
-            await ctx.send(embed=embed)
+            # Список выводится постранично, если гайдов больше, чем помещается в один эмбед
+            paginator = Paginator(build_content, lambda: self.guides_version, author_id=ctx.author.id)
+            await paginator.start(ctx)
             
         except Exception as e:
             logger.error(f"Ошибка при выполнении команды guides: {e}")
             await ctx.send("❌ Произошла ошибка при получении списка гайдов.")
     
-    @commands.command(name='guide', aliases=['гайд'])
+    @commands.hybrid_command(name='guide', aliases=['гайд'])
+    @app_commands.describe(guide_id="Номер гайда из списка /guides")
     async def guide(self, ctx, guide_id: int = None):
         """Отображает конкретный гайд по его номеру"""
         try:
@@ -127,37 +201,76 @@ class Guides(commands.Cog):
             # Получаем информацию о гайде
             guide = guides[guide_id - 1]
             
-            # Создаем эмбед с информацией о гайде
+            def build_content():
+                # Гайд разбивается на страницы с учетом ограничений Discord на размер эмбеда
+                author = guide.get('author')
+                return EmbedContent(
+                    title=guide.get('title', 'Без названия'),
+                    description=guide.get('content') or guide.get('description') or 'Без содержания',
+                    fields=[
+                        (section.get('title', 'Без названия'), section.get('content', 'Без содержания'))
+                        for section in guide.get('sections', [])
+                    ],
+                    footer=f"Автор: {author}" if author else '',
+                    image_url=guide.get('image_url')
+                )
+            
+            # Страницы отрисовываются по мере листания и кэшируются по версии данных гайдов
+            paginator = Paginator(build_content, lambda: self.guides_version, author_id=ctx.author.id)
+            await paginator.start(ctx)
+            
+        except Exception as e:
+            logger.error(f"Ошибка при выполнении команды guide: {e}")
+            await ctx.send("❌ Произошла ошибка при получении информации о гайде.")
+    
+    @commands.hybrid_command(name='guide_search', aliases=['гайд_поиск'])
+    @app_commands.describe(query="Ключевые слова для поиска")
+    async def guide_search(self, ctx, *, query=None):
+        """Ищет гайды и их разделы по ключевым словам
+        
+        Использование:
+        !гайд_поиск [запрос]
+        """
+        try:
+            if not query:
+                await ctx.send("❌ Вы не указали запрос. Используйте команду `!гайд_поиск [запрос]`")
+                return
+            
+            results = self.search_index.search(query, limit=10)
+            if not results:
+                await ctx.send(f"❌ По запросу '{query}' ничего не найдено.")
+                return
+            
+            # Номера гайдов в списке (ID гайда -> позиция для команды !гайд)
+            positions = {guide.get('id'): (i, guide) for i, guide in enumerate(self.guides_data.get('guides', []), 1)}
+            
             embed = discord.Embed(
-                title=guide.get('title', 'Без названия'),
-                description=guide.get('content', 'Без содержания'),
+                title=f"Результаты поиска: {query}"[:256],
+                description="Используйте команду `!гайд [номер]` для просмотра гайда",
                 color=discord.Color.blue()
             )
             
-            # Добавляем изображение, если оно есть
-            image_url = guide.get('image_url')
-            if image_url:
-                embed.set_image(url=image_url)
-            
-            # Добавляем разделы гайда
-            sections = guide.get('sections', [])
-            for section in sections:
-                embed.add_field(
-                    name=section.get('title', 'Без названия'),
-                    value=section.get('content', 'Без содержания'),
-                    inline=False
-                )
-            
-            # Добавляем информацию об авторе, если она есть
-            author = guide.get('author')
-            if author:
-                embed.set_footer(text=f"Автор: {author}")
+            for score, guide_id, section_index in results:
+                if guide_id not in positions:
+                    continue
+                position, guide = positions[guide_id]
+                name = f"{position}. {guide.get('title', 'Без названия')}"
+                
+                if section_index is None:
+                    snippet = guide.get('short_description') or guide.get('description') or guide.get('content', '')
+                else:
+                    section = guide.get('sections', [])[section_index]
+                    name += f" → {section.get('title', 'Без названия')}"
+                    snippet = section.get('content', '')
+                
+                snippet = snippet[:150] + "..." if len(snippet) > 150 else snippet
+                embed.add_field(name=name[:256], value=snippet or "Без описания", inline=False)
             
             await ctx.send(embed=embed)
             
         except Exception as e:
-            logger.error(f"Ошибка при выполнении команды guide: {e}")
-            await ctx.send("❌ Произошла ошибка при получении информации о гайде.")
+            logger.error(f"Ошибка при выполнении команды guide_search: {e}")
+            await ctx.send("❌ Произошла ошибка при поиске по гайдам.")
     
     @commands.command(name='add_guide', aliases=['добавить_гайд'])
     @admin_only()
@@ -187,6 +300,7 @@ class Guides(commands.Cog):
             
             # Создаем новый гайд
             new_guide = {
+                'id': self.next_guide_id(),
                 'title': title,
                 'description': description,
                 'image_url': image_url,
@@ -194,20 +308,29 @@ class Guides(commands.Cog):
                 'sections': []
             }
             
-            # Добавляем гайд в список
+            # Добавляем гайд в список и в поисковый индекс
             self.guides_data['guides'].append(new_guide)
+            self.search_index.add_guide(new_guide['id'], new_guide)
+            self.index_guide_title(new_guide)
+            self.guides_version += 1
             
             # Сохраняем изменения
-            if self.save_guides():
+            if self.save_guide_change(lambda: self.storage.insert_guide(new_guide)):
                 await ctx.send(f"✅ Гайд '{title}' успешно добавлен.")
             else:
+                # Хранилище не изменилось - откатываем изменение в памяти и в индексах
+                self.guides_data['guides'].remove(new_guide)
+                self.search_index.remove_guide(new_guide['id'])
+                self.title_trie.discard(new_guide['id'])
+                self.guides_version += 1
                 await ctx.send("❌ Произошла ошибка при сохранении гайда.")
             
         except Exception as e:
             logger.error(f"Ошибка при выполнении команды add_guide: {e}")
             await ctx.send("❌ Произошла ошибка при добавлении гайда.")
     
-    @commands.command(name='add_section', aliases=['добавить_раздел'])
+    @commands.hybrid_command(name='add_section', aliases=['добавить_раздел'])
+    @app_commands.describe(guide_id="Номер гайда", args="Заголовок раздела | Содержание раздела")
     @admin_only()
     async def add_section(self, ctx, guide_id: int = None, *, args=None):
         """Добавляет новый раздел к существующему гайду.
@@ -244,20 +367,30 @@ class Guides(commands.Cog):
                 'content': content
             }
             
-            # Добавляем раздел к гайду
-            self.guides_data['guides'][guide_id - 1]['sections'].append(new_section)
+            # Добавляем раздел к гайду и в поисковый индекс
+            guide = self.guides_data['guides'][guide_id - 1]
+            sections = guide.setdefault('sections', [])
+            sections.append(new_section)
+            section_index = len(sections) - 1
+            self.search_index.add_section(guide['id'], section_index, new_section)
+            self.guides_version += 1
             
             # Сохраняем изменения
-            if self.save_guides():
+            if self.save_guide_change(lambda: self.storage.insert_section(guide['id'], section_index, new_section)):
                 await ctx.send(f"✅ Раздел '{title}' успешно добавлен к гайду #{guide_id}.")
             else:
+                # Хранилище не изменилось - откатываем изменение в памяти и в индексе
+                sections.pop(section_index)
+                self.search_index.remove_document((guide['id'], section_index))
+                self.guides_version += 1
                 await ctx.send("❌ Произошла ошибка при сохранении раздела.")
             
         except Exception as e:
             logger.error(f"Ошибка при выполнении команды add_section: {e}")
             await ctx.send("❌ Произошла ошибка при добавлении раздела.")
     
-    @commands.command(name='remove_guide', aliases=['удалить_гайд'])
+    @commands.hybrid_command(name='remove_guide', aliases=['удалить_гайд'])
+    @app_commands.describe(guide_id="Номер гайда")
     @admin_only()
     async def remove_guide(self, ctx, guide_id: int = None):
         """Удаляет гайд по его номеру.
@@ -280,19 +413,34 @@ class Guides(commands.Cog):
             # Получаем название гайда для подтверждения
             guide_title = guides[guide_id - 1].get('title', 'Без названия')
             
-            # Удаляем гайд
-            del self.guides_data['guides'][guide_id - 1]
+            # Удаляем гайд и его документы из поискового индекса
+            removed_guide = self.guides_data['guides'].pop(guide_id - 1)
+            self.search_index.remove_guide(removed_guide.get('id'))
+            self.title_trie.discard(removed_guide.get('id'))
+            self.guides_version += 1
             
             # Сохраняем изменения
-            if self.save_guides():
+            if self.save_guide_change(lambda: self.storage.delete_guide(removed_guide.get('id'))):
                 await ctx.send(f"✅ Гайд '{guide_title}' успешно удален.")
             else:
+                # Хранилище не изменилось - возвращаем гайд на место в памяти и в индексах
+                self.guides_data['guides'].insert(guide_id - 1, removed_guide)
+                self.search_index.add_guide(removed_guide.get('id'), removed_guide)
+                self.index_guide_title(removed_guide)
+                self.guides_version += 1
                 await ctx.send("❌ Произошла ошибка при удалении гайда.")
             
         except Exception as e:
             logger.error(f"Ошибка при выполнении команды remove_guide: {e}")
             await ctx.send("❌ Произошла ошибка при удалении гайда.")
 
+    # Автодополнение номеров гайдов в слэш-командах
+    guide.autocomplete('guide_id')(guide_number_autocomplete)
+    add_section.autocomplete('guide_id')(guide_number_autocomplete)
+    remove_guide.autocomplete('guide_id')(guide_number_autocomplete)
+
 async def setup(bot):
     """Настройка cog"""
-    await bot.add_cog(Guides(bot)) 
\ No newline at end of file
+    with startup_timer.measure('cog', 'Guides'):
+        cog = Guides(bot)
+    await bot.add_cog(cog) 
\ No newline at end of file
@@ -1,10 +1,14 @@
-import os
-import json
+import asyncio
 import logging
 import discord
+from discord import app_commands
 from discord.ext import commands
 import functools
 from config import Config
+from utils.startup_timing import startup_timer
+from utils.paginator import Paginator, EmbedContent
+from utils.templates import TemplateError, compile_template
+from utils.message_catalog import get_message_catalog
 
 logger = logging.getLogger('discord_bot')
 
@@ -45,73 +49,52 @@ class Messages(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         
-        # Пути к файлам сообщений
-        self.BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        self.DATA_DIR = os.path.join(self.BASE_DIR, 'data')
-        self.STORM_MESSAGES_FILE = os.path.join(self.DATA_DIR, 'storm_messages.json')
-        self.SEASON_MESSAGES_FILE = os.path.join(self.DATA_DIR, 'season_messages.json')
-        
-        # Загрузка сообщений
-        self.storm_messages = self.load_messages('storm')
-        self.season_messages = self.load_messages('season')
+        # Общий с модулем Notifications каталог сообщений
+        self.catalog = get_message_catalog(bot)
     
-    def load_messages(self, message_type):
-        """Загружает сообщения указанного типа из файла"""
-        try:
-            file_path = ''
-            if message_type == 'storm':
-                file_path = self.STORM_MESSAGES_FILE
-            elif message_type == 'season':
-                file_path = self.SEASON_MESSAGES_FILE
-            
-            if file_path and os.path.exists(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return {}
-        except Exception as e:
-            logger.error(f"Ошибка при загрузке сообщений типа {message_type}: {e}")
-            return {}
+    async def cog_load(self):
+        """Вызывается при загрузке cog"""
+        await asyncio.to_thread(self.catalog.ensure_loaded)
+        self.catalog.acquire()
     
-    def save_messages(self, message_type, messages):
-        """Сохраняет сообщения указанного типа в файл"""
-        try:
-            file_path = ''
-            if message_type == 'storm':
-                file_path = self.STORM_MESSAGES_FILE
-            elif message_type == 'season':
-                file_path = self.SEASON_MESSAGES_FILE
-            
-            if file_path:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(messages, f, ensure_ascii=False, indent=2)
-                return True
-            return False
-        except Exception as e:
-            logger.error(f"Ошибка при сохранении сообщений типа {message_type}: {e}")
-            return False
+    async def cog_unload(self):
+        """Вызывается при выгрузке cog"""
+        self.catalog.release()
     
-    @commands.command(name='reload_messages', aliases=['перезагрузить_сообщения'])
+    @commands.hybrid_command(name='reload_messages', aliases=['перезагрузить_сообщения'])
     @admin_only()
     async def reload_messages(self, ctx):
         """Перезагружает все сообщения из файлов"""
         try:
-            # Обновляем сообщения в текущем модуле
-            self.storm_messages = self.load_messages('storm')
-            self.season_messages = self.load_messages('season')
-            
-            # Обновляем сообщения в модуле Notifications, если он загружен
-            notifications_cog = self.bot.get_cog('Notifications')
-            if notifications_cog:
-                notifications_cog.storm_messages = notifications_cog.load_messages('storm')
-                notifications_cog.season_messages = notifications_cog.load_messages('season')
-                logger.info("Сообщения в модуле Notifications успешно обновлены")
+            # Каталог общий для всех модулей, поэтому обновление сразу видно и в Notifications
+            await asyncio.to_thread(self.catalog.reload_all, True)
             
             await ctx.send("✅ Сообщения успешно перезагружены.")
         except Exception as e:
             logger.error(f"Ошибка при перезагрузке сообщений: {e}")
             await ctx.send(f"❌ Произошла ошибка при перезагрузке сообщений: {e}")
     
-    @commands.command(name='list_messages', aliases=['список_сообщений'])
+    def build_list_content(self, message_type, message_title):
+        """Собирает содержимое списка сообщений типа message_type для постраничного вывода"""
+        current_messages = self.catalog.get(message_type.lower())
+        fields = []
+        
+        # Добавляем сообщения в эмбед
+        if not current_messages:
+            fields.append(("Нет сообщений", "Для этого типа нет настроенных сообщений"))
+        else:
+            for key, values in current_messages.items():
+                message_list = "\n".join([f"- {msg.source}" for msg in values])
+                fields.append((key, message_list if message_list else "Пусто"))
+        
+        return EmbedContent(
+            title=message_title,
+            description=f"Тип сообщений: {message_type}",
+            fields=fields
+        )
+    
+    @commands.hybrid_command(name='list_messages', aliases=['список_сообщений'])
+    @app_commands.describe(message_type="Тип сообщений: storm или season")
     @admin_only()
     async def list_messages(self, ctx, message_type=None):
         """Отображает список доступных сообщений указанного типа"""
@@ -138,44 +121,32 @@ class Messages(commands.Cog):
                 await ctx.send(embed=embed)
                 return
             
-            messages = None
             if message_type.lower() == "storm":
-                messages = self.storm_messages
                 message_title = "🌩️ Сообщения о штормах"
             elif message_type.lower() == "season":
-                messages = self.season_messages
                 message_title = "🌱 Сообщения о сезонах"
             else:
                 await ctx.send(f"❌ Неизвестный тип сообщений: {message_type}")
                 return
             
-            # Создаем эмбед со списком сообщений
-            embed = discord.Embed(
-                title=message_title,
-                description=f"Тип сообщений: {message_type}",
-                color=discord.Color.blue()
+            # Длинные списки выводятся постранично
+            paginator = Paginator(
+                lambda: self.build_list_content(message_type, message_title),
+                lambda: self.catalog.version,
+                author_id=ctx.author.id
             )
-            
-            # Добавляем сообщения в эмбед
-            if not messages:
-                embed.add_field(name="Нет сообщений", value="Для этого типа нет настроенных сообщений", inline=False)
-            else:
-                for key, value in messages.items():
-                    if isinstance(value, list):
-                        # Если значение - список сообщений
-                        message_list = "\n".join([f"- {msg}" for msg in value])
-                        embed.add_field(name=key, value=message_list if message_list else "Пусто", inline=False)
-                    else:
-                        # Если значение - одиночное сообщение
-                        embed.add_field(name=key, value=value, inline=False)
-            
-            await ctx.send(embed=embed)
+            await paginator.start(ctx)
             
         except Exception as e:
             logger.error(f"Ошибка при выполнении команды list_messages: {e}")
             await ctx.send("❌ Произошла ошибка при получении списка сообщений.")
     
-    @commands.command(name='add_message', aliases=['добавить_сообщение'])
+    @commands.hybrid_command(name='add_message', aliases=['добавить_сообщение'])
+    @app_commands.describe(
+        message_type="Тип сообщений: storm или season",
+        message_key="Ключ, например storm_start или winter",
+        message_text="Текст сообщения (можно использовать подстановки вроде {server})"
+    )
     @admin_only()
     async def add_message(self, ctx, message_type=None, message_key=None, *, message_text=None):
         """Добавляет новое сообщение указанного типа.
@@ -193,41 +164,29 @@ class Messages(commands.Cog):
         - summer (для season)
         - autumn (для season)
         - winter (для season)
+        
+        В тексте можно использовать подстановки {game_time}, {player_count},
+        {max_players}, {server} и {season}. Фигурные скобки в обычном тексте
+        записываются как {{ и }}.
         """
         try:
             if not message_type or not message_key or not message_text:
                 await ctx.send("❌ Не все параметры указаны. Используйте команду `!add_message [тип_сообщений] [ключ] [текст_сообщения]`")
                 return
             
-            # Получаем сообщения указанного типа
-            messages = {}
-            if message_type == 'storm':
-                messages = self.storm_messages
-            elif message_type == 'season':
-                messages = self.season_messages
-            else:
+            if message_type not in self.catalog.kinds():
                 await ctx.send(f"❌ Неизвестный тип сообщений: {message_type}. Используйте команду `!list_messages` для просмотра доступных типов.")
                 return
             
-            # Добавляем сообщение
-            if message_key in messages and isinstance(messages[message_key], list):
-                # Если ключ уже существует и это список, добавляем сообщение в список
-                messages[message_key].append(message_text)
-            elif message_key in messages:
-                # Если ключ уже существует, но это не список, преобразуем в список
-                messages[message_key] = [messages[message_key], message_text]
-            else:
-                # Если ключ не существует, создаем новый список
-                messages[message_key] = [message_text]
-            
-            # Сохраняем изменения
-            if message_type == 'storm':
-                self.storm_messages = messages
-            elif message_type == 'season':
-                self.season_messages = messages
+            # Проверяем шаблон заранее, чтобы при отправке уведомления он не мог дать ошибку
+            try:
+                compile_template(message_text)
+            except TemplateError as e:
+                await ctx.send(f"❌ Ошибка в шаблоне сообщения: {e}")
+                return
             
-            # Сохраняем сообщения в файл
-            if self.save_messages(message_type, messages):
+            # Добавляем сообщение (в хранилище записывается только новое сообщение, изменения сразу видны всем cogs)
+            if self.catalog.add_message(message_type, message_key, message_text):
                 await ctx.send(f"✅ Сообщение успешно добавлено к типу '{message_type}' с ключом '{message_key}'.")
             else:
                 await ctx.send("❌ Произошла ошибка при сохранении сообщения.")
@@ -236,7 +195,12 @@ class Messages(commands.Cog):
             logger.error(f"Ошибка при выполнении команды add_message: {e}")
             await ctx.send("❌ Произошла ошибка при добавлении сообщения.")
     
-    @commands.command(name='remove_message', aliases=['удалить_сообщение'])
+    @commands.hybrid_command(name='remove_message', aliases=['удалить_сообщение'])
+    @app_commands.describe(
+        message_type="Тип сообщений: storm или season",
+        message_key="Ключ сообщений",
+        message_index="Номер сообщения (начиная с 0); без номера удаляются все сообщения ключа"
+    )
     @admin_only()
     async def remove_message(self, ctx, message_type=None, message_key=None, message_index: int = None):
         """Удаляет сообщение указанного типа.
@@ -256,15 +220,10 @@ class Messages(commands.Cog):
                 await ctx.send("❌ Не все параметры указаны. Используйте команду `!remove_message [тип_сообщений] [ключ] [индекс]`")
                 return
             
-            # Получаем сообщения указанного типа
-            messages = {}
-            if message_type == 'storm':
-                messages = self.storm_messages
-            elif message_type == 'season':
-                messages = self.season_messages
-            else:
+            if message_type not in self.catalog.kinds():
                 await ctx.send(f"❌ Неизвестный тип сообщений: {message_type}. Используйте команду `!list_messages` для просмотра доступных типов.")
                 return
+            messages = self.catalog.get(message_type)
             
             # Проверяем существование ключа
             if message_key not in messages:
@@ -274,34 +233,21 @@ class Messages(commands.Cog):
             # Удаляем сообщение
             if message_index is not None:
                 # Если указан индекс, удаляем конкретное сообщение
-                if isinstance(messages[message_key], list):
-                    if 0 <= message_index < len(messages[message_key]):
-                        removed_message = messages[message_key].pop(message_index)
-                        success_message = f"✅ Сообщение с индексом {message_index} успешно удалено из типа '{message_type}' с ключом '{message_key}'."
-                        
-                        # Если список пуст, удаляем ключ
-                        if not messages[message_key]:
-                            del messages[message_key]
-                            success_message += f" Ключ '{message_key}' удален, так как список сообщений пуст."
-                    else:
-                        await ctx.send(f"❌ Индекс {message_index} выходит за пределы списка сообщений.")
-                        return
+                if 0 <= message_index < len(messages[message_key]):
+                    success_message = f"✅ Сообщение с индексом {message_index} успешно удалено из типа '{message_type}' с ключом '{message_key}'."
+                    
+                    # Если это последнее сообщение, ключ удаляется вместе с ним
+                    if len(messages[message_key]) == 1:
+                        success_message += f" Ключ '{message_key}' удален, так как список сообщений пуст."
                 else:
-                    await ctx.send(f"❌ Сообщение с ключом '{message_key}' не является списком.")
+                    await ctx.send(f"❌ Индекс {message_index} выходит за пределы списка сообщений.")
                     return
             else:
                 # Если индекс не указан, удаляем все сообщения с указанным ключом
-                del messages[message_key]
                 success_message = f"✅ Все сообщения успешно удалены из типа '{message_type}' с ключом '{message_key}'."
             
-            # Сохраняем изменения
-            if message_type == 'storm':
-                self.storm_messages = messages
-            elif message_type == 'season':
-                self.season_messages = messages
-            
-            # Сохраняем сообщения в файл
-            if self.save_messages(message_type, messages):
+            # Удаляем сообщения из хранилища
+            if self.catalog.remove_messages(message_type, message_key, message_index):
                 await ctx.send(success_message)
             else:
                 await ctx.send("❌ Произошла ошибка при сохранении изменений.")
@@ -310,6 +256,29 @@ class Messages(commands.Cog):
             logger.error(f"Ошибка при выполнении команды remove_message: {e}")
             await ctx.send("❌ Произошла ошибка при удалении сообщения.")
 
+    async def message_type_autocomplete(self, interaction, current):
+        """Подсказывает типы сообщений"""
+        current = (current or '').strip().lower()
+        return [app_commands.Choice(name=kind, value=kind) for kind in self.catalog.kinds() if kind.startswith(current)]
+    
+    async def message_key_autocomplete(self, interaction, current):
+        """Подсказывает ключи сообщений выбранного типа"""
+        message_type = getattr(interaction.namespace, 'message_type', None)
+        kinds = [message_type] if message_type in self.catalog.kinds() else self.catalog.kinds()
+        keys = []
+        for kind in kinds:
+            keys.extend(key for key in self.catalog.complete_keys(kind, current or '') if key not in keys)
+        return [app_commands.Choice(name=key, value=key) for key in keys[:25]]
+    
+    # Автодополнение типов и ключей сообщений в слэш-командах
+    list_messages.autocomplete('message_type')(message_type_autocomplete)
+    add_message.autocomplete('message_type')(message_type_autocomplete)
+    remove_message.autocomplete('message_type')(message_type_autocomplete)
+    add_message.autocomplete('message_key')(message_key_autocomplete)
+    remove_message.autocomplete('message_key')(message_key_autocomplete)
+
 async def setup(bot):
     """Настройка cog"""
-    await bot.add_cog(Messages(bot)) 
\ No newline at end of file
+    with startup_timer.measure('cog', 'Messages'):
+        cog = Messages(bot)
+    await bot.add_cog(cog) 
\ No newline at end of file
@@ -1,18 +1,98 @@
+import io
 import os
+import re
+import hmac
 import json
+import time
+import hashlib
 import logging
 import threading
 import http.server
-import random
+import concurrent.futures
 import discord
+from discord import app_commands
 from discord.ext import commands
 import asyncio
-from datetime import datetime
+from datetime import datetime, timedelta
 from config import Config
+from utils.startup_timing import startup_timer
 import functools
+from collections import namedtuple, deque
+from utils.hot_reload import get_cog_handoff
+from utils.health import get_health_state
+from utils.memory import BoundedDict
+from utils.message_catalog import get_message_catalog
+from utils.player_activity import PlayerActivity, format_player_names
+from utils.scheduler import get_scheduler
+from utils.storage import get_storage
+from utils.trie import PrefixTrie
+from utils.webhooks import get_webhook_delivery
 
 logger = logging.getLogger('discord_bot')
 
+# Цель доставки уведомления: канал (возможно, в другой гильдии), фильтр событий и вебхук канала
+# events = None означает, что канал получает все события данного типа
+NotificationTarget = namedtuple('NotificationTarget', ['channel_id', 'guild_id', 'events', 'webhook_url'], defaults=(None,))
+
+# Способы доставки уведомлений (NOTIFICATION_DELIVERY)
+DELIVERY_MODES = ('bot', 'webhook', 'auto')
+
+# Типы тестовых уведомлений (для автодополнения ищутся и по английскому, и по русскому названию)
+TEST_STORM_TYPES = {'start': 'начало', 'warning': 'предупреждение', 'end': 'конец'}
+TEST_SEASON_TYPES = {'spring': 'весна', 'summer': 'лето', 'autumn': 'осень', 'winter': 'зима'}
+
+def build_name_trie(names):
+    trie = PrefixTrie()
+    for value, name_ru in names.items():
+        trie.add(value, value, name_ru)
+    return trie
+
+STORM_TYPE_TRIE = build_name_trie(TEST_STORM_TYPES)
+SEASON_TYPE_TRIE = build_name_trie(TEST_SEASON_TYPES)
+
+# Сколько уведомлений HTTP сервер сохраняет, пока cog перезагружается
+HANDOFF_QUEUE_LIMIT = 1000
+# Максимальное количество уведомлений в обработке; сверх него сервер отвечает 503
+IN_FLIGHT_LIMIT = 1000
+# Размер кэша каналов (ID канала приходит извне - из маршрутов)
+CHANNEL_CACHE_LIMIT = 256
+# Типы уведомлений с защитой от повторов; уведомления других типов отбрасываются до нее,
+# поэтому таблица времени последних уведомлений не растет от произвольных типов из запросов
+COOLDOWN_TYPES = ('storm_notification', 'season_notification')
+# Подпись уведомления: HMAC-SHA256 в шестнадцатеричном виде (после префикса "sha256=")
+SIGNATURE_PATTERN = re.compile(r'[0-9a-fA-F]{64}')
+
+# ID задачи планировщика с напоминанием о шторме (новый прогноз заменяет прежнее напоминание)
+STORM_REMINDER_JOB = 'storm_reminder'
+# Единицы относительного времени объявления: +30m, +2ч, +1d
+WHEN_UNITS = {'m': 'minutes', 'м': 'minutes', 'h': 'hours', 'ч': 'hours', 'd': 'days', 'д': 'days'}
+
+def parse_when(value, now=None):
+    """Разбирает время объявления: +30m, +2h, +1d, ЧЧ:ММ (ближайшее) или ГГГГ-ММ-ДДTЧЧ:ММ
+    
+    Возвращает локальное время без часового пояса (время с поясом, например
+    2026-01-01T12:00+03:00, переводится в локальное) или None, если значение
+    не распознано или выходит за допустимый диапазон дат.
+    """
+    now = now or datetime.now()
+    value = value.strip().lower()
+    try:
+        match = re.fullmatch(r'\+(\d+)([mhdмчд])', value)
+        if match:
+            return now + timedelta(**{WHEN_UNITS[match.group(2)]: int(match.group(1))})
+        try:
+            clock = datetime.strptime(value, '%H:%M')
+            when = now.replace(hour=clock.hour, minute=clock.minute, second=0, microsecond=0)
+            return when if when > now else when + timedelta(days=1)
+        except ValueError:
+            pass
+        when = datetime.fromisoformat(value.upper())
+        if when.tzinfo is not None:
+            when = when.astimezone().replace(tzinfo=None)
+        return when
+    except (ValueError, OverflowError):
+        return None
+
 # Декоратор для проверки наличия прав администратора
 def admin_only():
     """Декоратор для ограничения доступа к командам только для администраторов"""
@@ -44,18 +124,121 @@ def admin_only():
         return wrapper
     return decorator
 
+class DeadlineSocketReader(io.RawIOBase):
+    """Чтение из сокета с общим ограничением времени
+    
+    Таймаут сокета ограничивает только паузу между пакетами, поэтому клиент,
+    отправляющий по байту в секунду, мог бы занимать поток сервера сколь угодно
+    долго. Здесь перед каждым чтением таймаут сокета равен времени,
+    оставшемуся до deadline, а после него чтение завершается TimeoutError.
+    """
+    
+    def __init__(self, sock):
+        super().__init__()
+        self.sock = sock
+        self.deadline = None
+    
+    def readable(self):
+        return True
+    
+    def readinto(self, buffer):
+        if self.deadline is not None:
+            remaining = self.deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("Истекло время чтения запроса")
+            self.sock.settimeout(remaining)
+        return self.sock.recv_into(buffer)
+
+def sign_notification(secret, timestamp, body):
+    """Подпись уведомления: HMAC-SHA256 от "<timestamp>.<тело запроса>" в шестнадцатеричном виде"""
+    message = str(timestamp).encode('utf-8') + b'.' + body
+    return hmac.new(secret.encode('utf-8'), message, hashlib.sha256).hexdigest()
+
 class NotificationHandler(http.server.BaseHTTPRequestHandler):
     """Обработчик HTTP запросов для получения уведомлений от игрового сервера"""
     
+    def setup(self):
+        """Оборачивает сокет так, чтобы строка запроса и заголовки читались не дольше header_timeout"""
+        super().setup()
+        self.deadline_reader = DeadlineSocketReader(self.connection)
+        self.deadline_reader.deadline = time.monotonic() + self.server.header_timeout
+        self.rfile = io.BufferedReader(self.deadline_reader)
+    
     def _set_response(self, status_code=200, content_type='application/json'):
         """Устанавливает заголовки ответа"""
         self.send_response(status_code)
         self.send_header('Content-type', content_type)
         self.end_headers()
     
+    def _reject(self, status_code, error):
+        """Отклоняет запрос, не дочитывая тело: соединение после ответа закрывается"""
+        self.close_connection = True
+        self.send_response(status_code)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(json.dumps({"error": error}).encode('utf-8'))
+    
+    def _read_content_length(self):
+        """Проверяет заголовок Content-Length; возвращает длину тела или None, если запрос уже отклонен"""
+        value = self.headers.get('Content-Length')
+        if value is None:
+            self._reject(411, "Content-Length required")
+            return None
+        try:
+            content_length = int(value)
+        except ValueError:
+            content_length = -1
+        if content_length < 0:
+            self._reject(400, "Invalid Content-Length")
+            return None
+        if content_length > self.server.max_body:
+            logger.warning(f"Отклонен запрос размером {content_length} байт от {self.client_address[0]} (максимум {self.server.max_body})")
+            self._reject(413, "Payload too large")
+            return None
+        return content_length
+    
+    def _read_signature(self):
+        """Проверяет наличие подписи и свежесть метки времени до чтения тела
+        
+        Возвращает (метка времени, подпись) или None, если запрос уже отклонен.
+        Метка времени ограничивает повторную отправку перехваченного запроса.
+        """
+        timestamp = self.headers.get('X-Timestamp', '')
+        signature = self.headers.get('X-Signature', '')
+        if not timestamp or not signature.startswith('sha256='):
+            logger.warning(f"Отклонен запрос без подписи от {self.client_address[0]}")
+            self._reject(401, "Signature required")
+            return None
+        # Заголовки декодируются как latin-1: подпись, не похожая на HMAC-SHA256 в hex,
+        # отклоняется сразу (compare_digest не сравнивает строки с не-ASCII символами)
+        received = signature[len('sha256='):]
+        if not SIGNATURE_PATTERN.fullmatch(received):
+            logger.warning(f"Отклонен запрос с некорректной подписью от {self.client_address[0]}")
+            self._reject(401, "Invalid signature")
+            return None
+        try:
+            skew = abs(time.time() - int(timestamp))
+        except ValueError:
+            skew = None
+        if skew is None or skew > self.server.signature_max_age:
+            logger.warning(f"Отклонен запрос с устаревшей или некорректной меткой времени от {self.client_address[0]}")
+            self._reject(401, "Stale timestamp")
+            return None
+        return timestamp, received
+    
     def do_POST(self):
         """Обрабатывает POST запросы от игрового сервера"""
         try:
+            # Бот останавливается: новые уведомления не принимаются, игровой сервер может повторить запрос позже
+            if self.server.draining:
+                self.send_response(503)
+                self.send_header('Content-type', 'application/json')
+                self.send_header('Retry-After', '30')
+                self.end_headers()
+                self.wfile.write(json.dumps({"error": "Shutting down"}).encode('utf-8'))
+                return
+            
             # Проверяем путь запроса
             if self.path != "/status/notification":
                 logger.warning(f"Получен запрос по неправильному пути: {self.path}")
@@ -63,8 +246,35 @@ class NotificationHandler(http.server.BaseHTTPRequestHandler):
                 self.wfile.write(json.dumps({"error": "Not found"}).encode('utf-8'))
                 return
                 
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
+            # Размер и подпись проверяются по заголовкам, до чтения тела
+            content_length = self._read_content_length()
+            if content_length is None:
+                return
+            signature = None
+            if self.server.secret:
+                signature = self._read_signature()
+                if signature is None:
+                    return
+            
+            # Тело должно прийти целиком за body_timeout секунд
+            self.deadline_reader.deadline = time.monotonic() + self.server.body_timeout
+            try:
+                post_data = self.rfile.read(content_length)
+            except TimeoutError:
+                logger.warning(f"Истекло время получения тела запроса от {self.client_address[0]}")
+                self._reject(408, "Request timeout")
+                return
+            if len(post_data) < content_length:
+                self._reject(400, "Incomplete body")
+                return
+            
+            if signature is not None:
+                timestamp, received = signature
+                expected = sign_notification(self.server.secret, timestamp, post_data)
+                if not hmac.compare_digest(expected, received.lower()):
+                    logger.warning(f"Отклонен запрос с неверной подписью от {self.client_address[0]}")
+                    self._reject(401, "Invalid signature")
+                    return
             
             # Парсим JSON данные
             notification = json.loads(post_data.decode('utf-8'))
@@ -77,18 +287,26 @@ class NotificationHandler(http.server.BaseHTTPRequestHandler):
                 return
             
             # Получаем доступ к экземпляру Notifications cog
-            notifications_cog = getattr(self.server, 'notifications_cog', None)
+            with self.server.handoff_lock:
+                notifications_cog = self.server.notifications_cog
+                if notifications_cog is None:
+                    # Cog перезагружается: уведомление обработает новый экземпляр
+                    if len(self.server.pending) == self.server.pending.maxlen:
+                        logger.error("Очередь уведомлений на время перезагрузки переполнена, старое уведомление отброшено")
+                    self.server.pending.append(notification)
+                    self.server.health.queue_depth = len(self.server.pending)
+            
             if notifications_cog is None:
-                logger.error("Ошибка: HTTP сервер не имеет атрибута notifications_cog")
-                self._set_response(500)
-                self.wfile.write(json.dumps({"error": "Server configuration error"}).encode('utf-8'))
+                self._set_response(202)
+                self.wfile.write(json.dumps({"status": "queued"}).encode('utf-8'))
+                return
+            
+            # Бот не успевает обрабатывать уведомления - отказываем, а не накапливаем их в памяти
+            if not notifications_cog.submit(notification):
+                logger.error(f"В обработке {IN_FLIGHT_LIMIT} уведомлений, новое уведомление отклонено")
+                self._set_response(503)
+                self.wfile.write(json.dumps({"error": "Queue full"}).encode('utf-8'))
                 return
-                
-            # Запускаем асинхронную обработку уведомления
-            asyncio.run_coroutine_threadsafe(
-                notifications_cog.process_notification(notification),
-                notifications_cog.bot.loop
-            )
             
             self._set_response()
             self.wfile.write(json.dumps({"status": "success"}).encode('utf-8'))
@@ -99,11 +317,25 @@ class NotificationHandler(http.server.BaseHTTPRequestHandler):
             self.wfile.write(json.dumps({"error": "Invalid JSON"}).encode('utf-8'))
         except Exception as e:
             logger.error(f"Ошибка при обработке POST запроса: {e}")
+            # Текст исключения остается в журнале и не передается клиенту
             self._set_response(500)
-            self.wfile.write(json.dumps({"error": str(e)}).encode('utf-8'))
+            self.wfile.write(json.dumps({"error": "Internal server error"}).encode('utf-8'))
     
     def do_GET(self):
-        """Обрабатывает GET запросы (для проверки работоспособности)"""
+        """Обрабатывает GET запросы (для проверки работоспособности)
+        
+        /healthz - процесс жив и цикл событий не завис (для перезапуска супервизором)
+        /readyz - бот готов обрабатывать уведомления (для балансировщика)
+        Ответы формируются из кэшированного состояния без обращения к циклу событий.
+        """
+        path = self.path.split('?', 1)[0]
+        if path in ('/healthz', '/readyz'):
+            health = self.server.health
+            ok, body = health.liveness() if path == '/healthz' else health.readiness()
+            self._set_response(200 if ok else 503)
+            self.wfile.write(json.dumps(body).encode('utf-8'))
+            return
+        
         self._set_response(200, 'text/html')
         self.wfile.write("Notification server is running".encode('utf-8'))
     
@@ -111,67 +343,431 @@ class NotificationHandler(http.server.BaseHTTPRequestHandler):
         """Переопределяет стандартное логирование HTTP сервера"""
         logger.debug(f"HTTP: {format % args}")
 
-def create_notifications_server(host='', port=8081, notifications_cog=None):
+class NotificationServer(http.server.ThreadingHTTPServer):
+    """HTTP сервер уведомлений, обрабатывающий запросы в отдельных потоках
+    
+    Медленный клиент занимает только свой поток, а не весь сервер. Число
+    одновременных соединений ограничено max_connections: лишние соединения
+    закрываются сразу, не создавая потоков.
+    """
+    
+    daemon_threads = True
+    
+    def __init__(self, server_address, handler_class, max_connections=16):
+        self.connection_slots = threading.BoundedSemaphore(max(1, max_connections))
+        super().__init__(server_address, handler_class)
+    
+    def process_request(self, request, client_address):
+        if not self.connection_slots.acquire(blocking=False):
+            logger.warning(f"Превышено количество одновременных соединений, соединение от {client_address[0]} закрыто")
+            self.shutdown_request(request)
+            return
+        try:
+            super().process_request(request, client_address)
+        except Exception:
+            self.connection_slots.release()
+            raise
+    
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self.connection_slots.release()
+
+def configure_ingestion(server):
+    """Применяет к серверу ограничения приема уведомлений из конфигурации
+    
+    Вызывается и для сервера, принятого при горячей перезагрузке, поэтому
+    новый секрет или лимиты вступают в силу без перезапуска бота.
+    """
+    server.secret = Config.NOTIFICATION_SECRET
+    server.max_body = Config.NOTIFICATION_MAX_BODY
+    server.header_timeout = Config.Timers.NOTIFICATION_HEADER_TIMEOUT
+    server.body_timeout = Config.Timers.NOTIFICATION_BODY_TIMEOUT
+    server.signature_max_age = Config.Timers.NOTIFICATION_SIGNATURE_MAX_AGE
+
+def create_notifications_server(host='', port=8081, notifications_cog=None, health=None):
     """Создает HTTP сервер для приема уведомлений"""
-    server = http.server.HTTPServer((host, port), NotificationHandler)
+    server = NotificationServer((host, port), NotificationHandler, Config.NOTIFICATION_MAX_CONNECTIONS)
+    configure_ingestion(server)
     server.notifications_cog = notifications_cog
+    server.health = health
+    # Пока notifications_cog не задан (перезагрузка cog), уведомления складываются в очередь
+    server.handoff_lock = threading.Lock()
+    server.pending = deque(maxlen=HANDOFF_QUEUE_LIMIT)
+    # Флаг остановки бота: сервер отвечает 503 вместо приема уведомлений
+    server.draining = False
     return server
 
+def describe_notification(notification):
+    """Краткое описание уведомления для журнала"""
+    data = notification.get('data')
+    data_type = data.get('type') if isinstance(data, dict) else None
+    notification_type = notification.get('type', '?')
+    return f"{notification_type} ({data_type})" if data_type and data_type != notification_type else notification_type
+
+def stop_notifications_server(server):
+    """Останавливает HTTP сервер уведомлений и освобождает порт"""
+    server.shutdown()
+    server.server_close()
+    logger.warning("HTTP сервер для уведомлений остановлен")
+
 class Notifications(commands.Cog):
     """Cog для обработки уведомлений от игрового сервера"""
     
     def __init__(self, bot):
         self.bot = bot
         self.http_server = None
-        self.notification_channel = None
+        # Цикл событий, в котором обрабатываются уведомления из потока HTTP сервера
+        # (bot.loop недоступен, пока бот не вошел в Discord, а при INGESTION_ONLY он не входит вовсе)
+        self.loop = asyncio.get_running_loop()
+        
+        # Кэш каналов для уведомлений (ID канала -> объект канала)
+        self.channel_cache = BoundedDict(CHANNEL_CACHE_LIMIT)
         
         # Пути к файлам сообщений
         self.BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         self.DATA_DIR = os.path.join(self.BASE_DIR, 'data')
-        self.STORM_MESSAGES_FILE = os.path.join(self.DATA_DIR, 'storm_messages.json')
-        self.SEASON_MESSAGES_FILE = os.path.join(self.DATA_DIR, 'season_messages.json')
-        self.SERVER_STATUS_FILE = os.path.join(self.DATA_DIR, 'server_status.json')
+        self.ROUTES_FILE = os.path.join(self.DATA_DIR, 'notification_routes.json')
+        
+        # Общий с модулем Messages каталог сообщений (обновляется автоматически при изменении файлов)
+        self.catalog = get_message_catalog(bot)
+        self.storage = get_storage(bot)
+        self.health = get_health_state(bot)
+        
+        # Таблица маршрутизации уведомлений (загружается в cog_load)
+        self.routes = {}
+        
+        # Время последнего уведомления по типу (только типы из COOLDOWN_TYPES)
+        self.last_notification_time = dict.fromkeys(COOLDOWN_TYPES, datetime.min)
+        # Минимальный интервал между уведомлениями одного типа (бенчмарки отключают его,
+        # чтобы измерять полную обработку каждого уведомления пакета)
+        self.notification_cooldown = Config.Timers.NOTIFICATION_COOLDOWN
+        
+        # Принятые, но еще не обработанные уведомления (future -> описание); дополняются из потока HTTP сервера
+        self.in_flight = {}
+        self.in_flight_lock = threading.Lock()
+        
+        # Входы и выходы игроков, накопленные для объединенного объявления
+        self.player_activity = PlayerActivity()
+        self.player_announce_task = None
         
-        # Загрузка сообщений
-        self.storm_messages = self.load_messages('storm')
-        self.season_messages = self.load_messages('season')
+        # Общий планировщик бота (напоминания о штормах и запланированные объявления)
+        self.scheduler = get_scheduler(bot)
+        # Доставка через вебхуки (NOTIFICATION_DELIVERY=webhook/auto, INGESTION_ONLY)
+        self.webhooks = get_webhook_delivery(bot)
+        self.delivery = Config.NOTIFICATION_DELIVERY
+        if self.delivery not in DELIVERY_MODES:
+            logger.error(f"Неизвестный способ доставки уведомлений '{self.delivery}', используется bot")
+            self.delivery = 'bot'
+        if Config.INGESTION_ONLY:
+            # Без входа в Discord уведомления доставляются только через вебхуки
+            self.delivery = 'webhook'
+    
+    async def cog_load(self):
+        """Вызывается при загрузке cog: загружает данные в отдельных потоках и запускает HTTP сервер"""
+        with startup_timer.measure('data', 'notification_routes'):
+            self.routes = await asyncio.to_thread(self.load_routes)
+        await asyncio.to_thread(self.catalog.ensure_loaded)
+        self.catalog.acquire()
+        
+        # Задачи, восстановленные из хранилища, выполняются обработчиками текущего экземпляра
+        self.scheduler.register('storm_reminder', self.send_storm_reminder)
+        self.scheduler.register('announcement', self.send_announcement)
+        self.scheduler.start()
+        
+        # При горячей перезагрузке сервер, кэши и очередь принимаются от прежнего экземпляра
+        state = get_cog_handoff(self.bot).take('Notifications')
+        if state is not None:
+            self.adopt_state(state)
+            return
         
-        # Время последнего уведомления по типу
-        self.last_notification_time = {}
+        # В режиме рабочего процесса уведомления принимает он, а сюда они приходят через supervisor
+        if Config.WORKER_MODE:
+            return
         
-        # Запускаем HTTP сервер для уведомлений
+        # HTTP сервер запускается после загрузки маршрутов, чтобы первые уведомления не потерялись
         self.start_http_server()
     
     def cog_unload(self):
         """Вызывается при выгрузке cog"""
+        self.catalog.release()
+        if self.player_announce_task:
+            self.player_announce_task.cancel()
+        if not self.http_server:
+            return
+        
+        handoff = get_cog_handoff(self.bot)
+        if handoff.is_reloading('Notifications'):
+            # Сервер продолжает принимать уведомления в очередь до появления нового экземпляра
+            with self.http_server.handoff_lock:
+                self.http_server.notifications_cog = None
+            handoff.stash('Notifications', {
+                'http_server': self.http_server,
+                'channel_cache': self.channel_cache,
+                'last_notification_time': self.last_notification_time,
+                'player_activity': self.player_activity
+            }, dispose=lambda state: stop_notifications_server(state['http_server']))
+            logger.warning("HTTP сервер для уведомлений передается новому экземпляру модуля")
+            return
+        
+        stop_notifications_server(self.http_server)
+    
+    def adopt_state(self, state):
+        """Принимает HTTP сервер, кэши и накопленные уведомления от прежнего экземпляра cog"""
+        self.channel_cache = state['channel_cache']
+        self.last_notification_time.update(
+            (key, value) for key, value in state['last_notification_time'].items() if key in COOLDOWN_TYPES
+        )
+        self.player_activity = state.get('player_activity', self.player_activity)
+        self.http_server = state['http_server']
+        
+        # Новые запросы обрабатываются обработчиком из обновленного кода
+        self.http_server.RequestHandlerClass = NotificationHandler
+        configure_ingestion(self.http_server)
+        with self.http_server.handoff_lock:
+            self.http_server.notifications_cog = self
+            pending = list(self.http_server.pending)
+            self.http_server.pending.clear()
+        
+        logger.warning(f"HTTP сервер для уведомлений принят после перезагрузки, уведомлений в очереди: {len(pending)}")
+        if pending:
+            asyncio.create_task(self.process_pending(pending))
+    
+    async def process_pending(self, notifications):
+        """Обрабатывает уведомления, полученные во время перезагрузки, в порядке поступления"""
+        for notification in notifications:
+            task = asyncio.ensure_future(self.process_notification(notification))
+            self.track(task, notification)
+            await task
+    
+    def submit(self, notification):
+        """Запускает обработку уведомления из потока HTTP сервера; возвращает False, если очередь переполнена"""
+        # Проверка и регистрация под одной блокировкой: параллельные потоки HTTP сервера
+        # не могут вместе превысить IN_FLIGHT_LIMIT
+        with self.in_flight_lock:
+            if len(self.in_flight) >= IN_FLIGHT_LIMIT:
+                return False
+            future = asyncio.run_coroutine_threadsafe(self.process_notification(notification), self.loop)
+            self.register(future, notification)
+        # Вне блокировки: для уже завершенной обработки callback вызывается сразу
+        future.add_done_callback(self.untrack)
+        return True
+    
+    def track(self, future, notification):
+        """Регистрирует обработку уведомления, чтобы при остановке бота дождаться ее завершения"""
+        with self.in_flight_lock:
+            self.register(future, notification)
+        future.add_done_callback(self.untrack)
+    
+    def register(self, future, notification):
+        """Добавляет обработку в in_flight (вызывается под in_flight_lock)"""
+        self.in_flight[future] = describe_notification(notification)
+        self.health.queue_depth = len(self.in_flight)
+    
+    def untrack(self, future):
+        with self.in_flight_lock:
+            self.in_flight.pop(future, None)
+            self.health.queue_depth = len(self.in_flight)
+    
+    def memory_structures(self):
+        """Долгоживущие структуры cog для отчета о памяти"""
+        return {
+            'routes': self.routes,
+            'channel_cache': self.channel_cache,
+            'last_notification_time': self.last_notification_time,
+            'in_flight': self.in_flight,
+            'scheduled_jobs': self.scheduler.jobs
+        }
+    
+    async def drain(self, timeout):
+        """Прекращает прием уведомлений и дожидается обработки уже принятых
+        
+        Ожидание ограничено timeout секундами; необработанные уведомления отменяются.
+        Возвращает описания уведомлений, которые не удалось обработать.
+        """
+        abandoned = []
         if self.http_server:
-            self.http_server.shutdown()
-            logger.warning("HTTP сервер для уведомлений остановлен")
+            with self.http_server.handoff_lock:
+                self.http_server.draining = True
+                # Уведомления, принятые во время перезагрузки cog, которые еще никто не забрал
+                abandoned.extend(describe_notification(item) for item in self.http_server.pending)
+                self.http_server.pending.clear()
+        
+        with self.in_flight_lock:
+            in_flight = dict(self.in_flight)
+        if not in_flight:
+            return abandoned
+        
+        logger.warning(f"Ожидание обработки принятых уведомлений: {len(in_flight)} (не более {timeout:.0f} с)")
+        waiters = {}
+        for future, description in in_flight.items():
+            waiter = asyncio.wrap_future(future) if isinstance(future, concurrent.futures.Future) else future
+            waiters[waiter] = description
+        
+        _, not_done = await asyncio.wait(waiters, timeout=max(0, timeout))
+        for waiter in not_done:
+            waiter.cancel()
+            abandoned.append(waiters[waiter])
+        return abandoned
     
-    def load_messages(self, message_type):
-        """Загружает сообщения указанного типа из файла"""
+    def load_routes(self):
+        """Загружает таблицу маршрутизации: тип уведомления -> список каналов с фильтрами"""
+        routes = {}
         try:
-            file_path = ''
-            if message_type == 'storm':
-                file_path = self.STORM_MESSAGES_FILE
-            elif message_type == 'season':
-                file_path = self.SEASON_MESSAGES_FILE
-            
-            # Удаляем избыточное логирование
-            # logger.info(f"Загрузка сообщений типа {message_type} из файла {file_path}")
-            
-            if file_path and os.path.exists(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    messages = json.load(f)
-                    # logger.info(f"Загружены сообщения: {messages.keys()}")
-                    return messages
-            else:
-                logger.warning(f"Файл {file_path} не найден")
-            return {}
+            if not os.path.exists(self.ROUTES_FILE):
+                return routes
+            
+            with open(self.ROUTES_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            
+            for notification_type, targets in data.get('routes', {}).items():
+                parsed_targets = []
+                for target in targets:
+                    try:
+                        channel_id = int(target.get('channel_id', 0))
+                    except (TypeError, ValueError):
+                        channel_id = 0
+                    
+                    webhook_url = target.get('webhook_url') or None
+                    if not channel_id and not webhook_url:
+                        logger.warning(f"Пропущен маршрут без корректного channel_id или webhook_url для типа {notification_type}")
+                        continue
+                    
+                    events = target.get('events')
+                    parsed_targets.append(NotificationTarget(
+                        channel_id=channel_id,
+                        guild_id=target.get('guild_id'),
+                        events=frozenset(str(event).lower() for event in events) if events else None,
+                        webhook_url=webhook_url
+                    ))
+                
+                if parsed_targets:
+                    routes[notification_type] = parsed_targets
         except Exception as e:
-            logger.error(f"Ошибка при загрузке сообщений типа {message_type}: {e}")
+            logger.error(f"Ошибка при загрузке маршрутов уведомлений: {e}")
             logger.error("Трейс ошибки:", exc_info=True)
-            return {}
+        return routes
+    
+    def get_targets(self, notification_type, event=None):
+        """Возвращает список каналов, в которые нужно доставить уведомление
+        
+        Параметры:
+        notification_type - тип уведомления (storm_notification, season_notification, ...)
+        event - конкретное событие для фильтрации (warning/start/end, spring/summer/...)
+        """
+        if not self.routes:
+            # Таблица маршрутов не настроена - используем единственный канал из конфигурации
+            if Config.NOTIFICATION_CHANNEL_ID or Config.NOTIFICATION_WEBHOOK_URL:
+                return [NotificationTarget(Config.NOTIFICATION_CHANNEL_ID, None, None, Config.NOTIFICATION_WEBHOOK_URL or None)]
+            return []
+        
+        targets = []
+        seen_channels = set()
+        for target in self.routes.get(notification_type, []) + self.routes.get('*', []):
+            # Маршрут только с вебхуком (без channel_id) различается по адресу вебхука
+            key = target.channel_id or target.webhook_url
+            if key in seen_channels:
+                continue
+            if target.events is not None and (event is None or event.lower() not in target.events):
+                continue
+            seen_channels.add(key)
+            targets.append(target)
+        return targets
+    
+    def uses_webhook(self, target):
+        """Доставляется ли уведомление в канал через вебхук, а не от имени бота"""
+        if not target.webhook_url:
+            return False
+        if self.delivery == 'webhook':
+            return True
+        # auto: вебхук используется, пока нет соединения со шлюзом (переподключение, запуск)
+        return self.delivery == 'auto' and not self.bot.is_ready()
+    
+    async def resolve_channel(self, channel_id):
+        """Возвращает канал по ID, используя кэш, и при необходимости запрашивает его у Discord"""
+        channel = self.channel_cache.get(channel_id)
+        if channel is not None:
+            return channel
+        
+        channel = self.bot.get_channel(channel_id)
+        if channel is None:
+            try:
+                channel = await self.bot.fetch_channel(channel_id)
+            except Exception as e:
+                logger.error(f"Ошибка при получении канала {channel_id}: {e}")
+                return None
+        
+        self.channel_cache[channel_id] = channel
+        return channel
+    
+    async def send_to_targets(self, embed, targets, content=None):
+        """Параллельно отправляет один и тот же эмбед во все каналы маршрута
+        
+        Количество одновременных отправок ограничено NOTIFICATION_FANOUT_LIMIT,
+        ошибка доставки в один канал не влияет на остальные. Каналы с вебхуком
+        в режимах webhook и auto получают уведомление через вебхук (см. uses_webhook).
+        content - текст сообщения (упоминание роли подписчиков), упоминания ролей в нем разрешены.
+        Возвращает True, если уведомление доставлено хотя бы в один канал.
+        """
+        if not targets:
+            logger.error("Не настроено ни одного канала для уведомлений")
+            return False
+        
+        semaphore = asyncio.Semaphore(max(1, Config.NOTIFICATION_FANOUT_LIMIT))
+        
+        async def send_one(target):
+            async with semaphore:
+                if self.uses_webhook(target):
+                    return await self.webhooks.send(target.webhook_url, embed, content, mention_roles=bool(content))
+                if Config.INGESTION_ONLY or not target.channel_id:
+                    logger.error(f"Для канала {target.channel_id} не задан вебхук, а бот не подключен к Discord")
+                    return False
+                channel = await self.resolve_channel(target.channel_id)
+                if channel is None:
+                    return False
+                try:
+                    if content:
+                        await channel.send(content, embed=embed, allowed_mentions=discord.AllowedMentions(roles=True))
+                    else:
+                        await channel.send(embed=embed)
+                    return True
+                except discord.Forbidden as e:
+                    logger.error(f"Нет прав для отправки сообщения в канал {target.channel_id}: {e}")
+                except discord.NotFound as e:
+                    # Канал удален - сбрасываем кэш, чтобы не использовать устаревший объект
+                    self.channel_cache.pop(target.channel_id, None)
+                    logger.error(f"Канал {target.channel_id} не найден: {e}")
+                except discord.HTTPException as e:
+                    logger.error(f"Ошибка HTTP при отправке сообщения в канал {target.channel_id}: {e}")
+                except Exception as e:
+                    logger.error(f"Неожиданная ошибка при отправке уведомления в канал {target.channel_id}: {e}")
+                return False
+        
+        results = await asyncio.gather(*(send_one(target) for target in targets))
+        return any(results)
+    
+    async def deliver(self, embed, route_type, route_event=None, notify_subscribers=True):
+        """Доставляет уведомление в каналы маршрута и подписчикам темы
+        
+        Если для темы настроена роль подписки, сообщение в канале упоминает ее;
+        иначе подписчики получают эмбед личными сообщениями параллельно с отправкой в каналы.
+        Возвращает результат отправки в каналы.
+        """
+        subscriptions = self.bot.get_cog('Subscriptions')
+        role_id = subscriptions.role_for(route_type) if subscriptions is not None else None
+        content = f"<@&{role_id}>" if role_id and notify_subscribers else None
+        
+        channels_task = self.send_to_targets(embed, self.get_targets(route_type, route_event), content=content)
+        if subscriptions is None or not notify_subscribers:
+            return await channels_task
+        
+        result, notified = await asyncio.gather(channels_task, subscriptions.notify(route_type, embed), return_exceptions=True)
+        if isinstance(notified, Exception):
+            logger.error(f"Ошибка при рассылке подписчикам: {notified}", exc_info=notified)
+        if isinstance(result, BaseException):
+            raise result
+        return result
     
     def start_http_server(self):
         """Запускает HTTP сервер для приема уведомлений от игрового сервера"""
@@ -186,9 +782,13 @@ class Notifications(commands.Cog):
             # Создаем HTTP сервер с правильно настроенным доступом к экземпляру cog
             self.http_server = create_notifications_server(
                 port=Config.NOTIFICATION_PORT, 
-                notifications_cog=self
+                notifications_cog=self,
+                health=self.health
             )
             
+            if not Config.NOTIFICATION_SECRET:
+                logger.warning("NOTIFICATION_SECRET не задан: уведомления принимаются без проверки подписи от любого, кому доступен порт")
+            
             # Запускаем сервер в отдельном потоке
             server_thread = threading.Thread(target=self.http_server.serve_forever)
             server_thread.daemon = True
@@ -201,6 +801,16 @@ class Notifications(commands.Cog):
             logger.error("Трейс ошибки:", exc_info=True)
             return False
     
+    def build_template_context(self, **values):
+        """Собирает значения подстановок для шаблонов сообщений"""
+        context = {'server': Config.SERVER_NAME}
+        server_status = self.bot.get_cog('ServerStatus')
+        if server_status is not None:
+            context['player_count'] = server_status.player_count
+            context['max_players'] = server_status.max_players
+        context.update(values)
+        return context
+    
     async def process_notification(self, notification):
         """Обрабатывает полученное уведомление"""
         try:
@@ -210,18 +820,16 @@ class Notifications(commands.Cog):
             # Удаляем избыточное логирование данных
             # logger.info(f"Получено уведомление типа: {notification_type}, данные: {notification}")
             
-            # Проверяем готовность бота
-            if not self.bot.is_ready():
+            # Проверяем готовность бота (через вебхуки уведомления доставляются и без соединения со шлюзом)
+            if not self.bot.is_ready() and self.delivery == 'bot':
                 logger.error("Бот не готов к обработке уведомлений")
                 return False
             
             # Проверяем режим технического обслуживания
             manual_maintenance_active = False
             try:
-                if os.path.exists(self.SERVER_STATUS_FILE):
-                    with open(self.SERVER_STATUS_FILE, 'r', encoding='utf-8') as f:
-                        server_status = json.load(f)
-                        manual_maintenance_active = server_status.get('manual_maintenance', {}).get('active', False)
+                server_status = self.storage.load_status()
+                manual_maintenance_active = server_status.get('manual_maintenance', {}).get('active', False)
             except Exception as e:
                 logger.error(f"Ошибка при проверке режима техобслуживания: {e}")
             
@@ -235,20 +843,6 @@ class Notifications(commands.Cog):
                 else:
                     return False
             
-            # Убеждаемся, что канал для уведомлений инициализирован
-            if not self.notification_channel:
-                if Config.NOTIFICATION_CHANNEL_ID:
-                    self.notification_channel = self.bot.get_channel(Config.NOTIFICATION_CHANNEL_ID)
-                    if not self.notification_channel:
-                        try:
-                            self.notification_channel = await self.bot.fetch_channel(Config.NOTIFICATION_CHANNEL_ID)
-                        except Exception as e:
-                            logger.error(f"Ошибка при получении канала: {e}")
-                        return False
-                else:
-                    logger.error("ID канала для уведомлений не указан в конфигурации")
-                    return False
-
             # Обработка пакета уведомлений
             if notification_type == 'notification_batch':
                 notifications = notification.get('notifications', [])
@@ -260,19 +854,38 @@ class Notifications(commands.Cog):
             notification_data = notification.get('data', notification)
             actual_type = notification_data.get('type', notification_type)
 
+            # Статус сервера приходит при каждом входе и выходе игрока, поэтому обрабатывается до проверки частоты
+            if actual_type == 'server_status':
+                self.track_player_activity(notification_data)
+                return True
+            if actual_type == 'storm_forecast':
+                self.schedule_storm_reminder(notification_data)
+                return True
+
+            # Уведомления неизвестных типов отбрасываются до защиты от повторов
+            if actual_type == 'storm_notification':
+                cooldown_key = 'storm_notification'
+            elif actual_type == 'season_notification' or notification_type == 'season':
+                cooldown_key = 'season_notification'
+            else:
+                logger.info(f"Пропущено уведомление неизвестного типа: {actual_type}")
+                return False
+            
             # Проверяем частоту уведомлений
             current_time = datetime.now()
-            last_time = self.last_notification_time.get(actual_type, datetime.min)
+            last_time = self.last_notification_time[cooldown_key]
             time_diff = (current_time - last_time).total_seconds()
             
-            if time_diff < Config.Timers.NOTIFICATION_COOLDOWN:
+            if time_diff < self.notification_cooldown:
                 return False
             
             # Обновляем время последнего уведомления
-            self.last_notification_time[actual_type] = current_time
+            self.last_notification_time[cooldown_key] = current_time
             
             # Формируем сообщение в зависимости от типа уведомления
             embed = None
+            route_type = actual_type
+            route_event = None
             
             # Обработка уведомлений о шторме
             if actual_type == 'storm_notification' or (notification_type == 'шторме' and notification_data.get('type') == 'storm_notification'):
@@ -284,22 +897,28 @@ class Notifications(commands.Cog):
                 
                 description = ""
                 color = discord.Color.yellow()
+                route_type = 'storm_notification'
+                route_event = 'warning' if is_warning else ('start' if storm_active else 'end')
+                context = self.build_template_context(game_time=game_time)
                 
                 if is_warning:
-                    if Config.USE_EXTENDED_NOTIFICATIONS and self.storm_messages.get('storm_warning'):
-                        description = random.choice(self.storm_messages.get('storm_warning'))
+                    extended = self.catalog.choice('storm', 'storm_warning', context) if Config.USE_EXTENDED_NOTIFICATIONS else None
+                    if extended:
+                        description = extended
                     else:
                         description = "⚠️ **Внимание!** Приближается шторм! ⚠️"
                     color = discord.Color.yellow()
                 elif storm_active:
-                    if Config.USE_EXTENDED_NOTIFICATIONS and self.storm_messages.get('storm_start'):
-                        description = random.choice(self.storm_messages.get('storm_start'))
+                    extended = self.catalog.choice('storm', 'storm_start', context) if Config.USE_EXTENDED_NOTIFICATIONS else None
+                    if extended:
+                        description = extended
                     else:
                         description = "⚡ **На сервере начался шторм!** ⚡"
                     color = discord.Color.red()
                 else:
-                    if Config.USE_EXTENDED_NOTIFICATIONS and self.storm_messages.get('storm_end'):
-                        description = random.choice(self.storm_messages.get('storm_end'))
+                    extended = self.catalog.choice('storm', 'storm_end', context) if Config.USE_EXTENDED_NOTIFICATIONS else None
+                    if extended:
+                        description = extended
                     else:
                         description = "☀️ **Шторм на сервере закончился** ☀️"
                     color = discord.Color.green()
@@ -343,6 +962,8 @@ class Notifications(commands.Cog):
                     season_eng = season_raw  # оставляем как есть, если это уже английское название
                 
                 season_ru = season_eng_to_ru.get(season_eng, season_raw)
+                route_type = 'season_notification'
+                route_event = season_eng
                 
                 game_time = notification_data.get('time', '')
                 
@@ -356,11 +977,9 @@ class Notifications(commands.Cog):
                 color = colors.get(season_eng, discord.Color.blue())
                 
                 # Получаем сообщение из файла
-                description = ""
-                if season_eng and season_eng in self.season_messages:
-                    messages = self.season_messages[season_eng]
-                    description = random.choice(messages)
-                else:
+                context = self.build_template_context(game_time=game_time, season=season_ru)
+                description = self.catalog.choice('season', season_eng, context) if season_eng else None
+                if not description:
                     default_messages = {
                         'spring': "🌱 **Наступила весна!** Время пробуждения природы и новых начинаний.",
                         'summer': "☀️ **Наступило лето!** Пора расцвета и изобилия.",
@@ -380,32 +999,197 @@ class Notifications(commands.Cog):
                 if game_time:
                     embed.add_field(name="Игровое время", value=game_time, inline=False)
 
-            # Обработка уведомлений о статусе сервера
-            elif actual_type == 'server_status':
-                return True
-
-            # Если сформирован эмбед, отправляем его
+            # Если сформирован эмбед, отправляем его во все каналы маршрута и подписчикам
+            # (тестовые уведомления подписчикам не рассылаются)
             if embed:
-                try:
-                    await self.notification_channel.send(embed=embed)
-                    return True
-                except discord.Forbidden as e:
-                    logger.error(f"Нет прав для отправки сообщения в канал: {e}")
-                    return False
-                except discord.HTTPException as e:
-                    logger.error(f"Ошибка HTTP при отправке сообщения: {e}")
-                    return False
-                except Exception as e:
-                    logger.error(f"Неожиданная ошибка при отправке уведомления: {e}")
-                    return False
+                return await self.deliver(embed, route_type, route_event, notify_subscribers=not notification.get('test'))
             
             return False
             
         except Exception as e:
-            logger.error(f"Ошибка при обработке уведомления: {e}")
+            logger.error(f"Ошибка при обработке уведомления: {e}", exc_info=e, extra={'event': notification.get('type')})
             return False
 
-    @commands.command(name='test_storm', aliases=['тест_шторм'])
+    def track_player_activity(self, notification_data):
+        """Учитывает список игроков из уведомления о статусе и планирует объединенное объявление"""
+        if not Config.PLAYER_ANNOUNCEMENTS:
+            return
+        
+        players = notification_data.get('players') or []
+        if not notification_data.get('online', True):
+            # Сервер останавливается: выходы игроков не объявляются
+            self.player_activity.reset()
+            return
+        if notification_data.get('is_startup'):
+            # Сервер запущен: изменения отсчитываются от игроков на момент запуска
+            self.player_activity.reset(players)
+            return
+        
+        if not self.player_activity.observe(players):
+            return
+        if self.player_announce_task is None or self.player_announce_task.done():
+            self.player_announce_task = asyncio.create_task(self.announce_player_activity())
+    
+    async def announce_player_activity(self):
+        """Через PLAYER_ANNOUNCE_WINDOW секунд отправляет одно объявление обо всех входах и выходах за это время"""
+        await asyncio.sleep(Config.Timers.PLAYER_ANNOUNCE_WINDOW)
+        joined, left = self.player_activity.take()
+        if not joined and not left:
+            return
+        
+        # В режиме техобслуживания и пока сервер недоступен (перезапуск) объявления не отправляются
+        try:
+            server_status = self.storage.load_status()
+            if server_status.get('manual_maintenance', {}).get('active', False):
+                return
+            if not server_status.get('server', {}).get('online', True):
+                return
+        except Exception as e:
+            logger.error(f"Ошибка при проверке состояния сервера: {e}")
+        
+        lines = []
+        if joined:
+            lines.append(f"➡️ **Зашли на сервер:** {format_player_names(joined)}")
+        if left:
+            lines.append(f"⬅️ **Покинули сервер:** {format_player_names(left)}")
+        embed = discord.Embed(description="\n".join(lines), color=discord.Color.blurple())
+        await self.send_to_targets(embed, self.get_targets('player_activity'))
+    
+    async def wait_for_delivery(self):
+        """Дожидается возможности отправки: соединения со шлюзом, если уведомления отправляет бот"""
+        if self.delivery == 'bot':
+            await self.bot.wait_until_ready()
+    
+    def maintenance_active(self):
+        """Включен ли режим технического обслуживания"""
+        try:
+            return self.storage.load_status().get('manual_maintenance', {}).get('active', False)
+        except Exception as e:
+            logger.error(f"Ошибка при проверке режима техобслуживания: {e}")
+            return False
+    
+    def schedule_storm_reminder(self, notification_data):
+        """Планирует напоминание о шторме по прогнозу StatusMod
+        
+        storm_at - ожидаемое время начала шторма (Unix time), seconds_per_day - длительность
+        игровых суток в реальных секундах; напоминание приходит за STORM_REMINDER_DAYS игровых суток.
+        """
+        if Config.Timers.STORM_REMINDER_DAYS <= 0:
+            return
+        try:
+            storm_at = float(notification_data['storm_at'])
+            seconds_per_day = float(notification_data['seconds_per_day'])
+        except (KeyError, TypeError, ValueError):
+            logger.error(f"Некорректный прогноз шторма: {notification_data}")
+            return
+        
+        due = storm_at - Config.Timers.STORM_REMINDER_DAYS * seconds_per_day
+        if due <= time.time():
+            # До шторма меньше STORM_REMINDER_DAYS: напоминать поздно, остается предупреждение StatusMod
+            self.scheduler.cancel(STORM_REMINDER_JOB)
+            return
+        payload = {'storm_at': storm_at, 'time': notification_data.get('time', '')}
+        self.scheduler.schedule('storm_reminder', due, payload, job_id=STORM_REMINDER_JOB)
+    
+    async def send_storm_reminder(self, job):
+        """Отправляет напоминание о приближающемся шторме (задача планировщика)"""
+        await self.wait_for_delivery()
+        if self.maintenance_active():
+            return
+        
+        context = self.build_template_context(game_time=job.payload.get('time', ''))
+        description = self.catalog.choice('storm', 'storm_reminder', context) if Config.USE_EXTENDED_NOTIFICATIONS else None
+        if not description:
+            description = f"🌩️ **Примерно через {Config.Timers.STORM_REMINDER_DAYS:g} игр. сут. ожидается темпоральный шторм.** Приготовьтесь заранее!"
+        embed = discord.Embed(title="Прогноз шторма", description=description, color=discord.Color.orange())
+        embed.add_field(name="Ожидается", value=f"<t:{int(job.payload['storm_at'])}:R>", inline=False)
+        await self.deliver(embed, 'storm_notification', 'reminder')
+    
+    async def send_announcement(self, job):
+        """Отправляет запланированное объявление (задача планировщика)"""
+        await self.wait_for_delivery()
+        embed = discord.Embed(title="Объявление", description=job.payload.get('text', ''), color=discord.Color.gold())
+        if job.payload.get('author'):
+            embed.set_footer(text=job.payload['author'])
+        await self.deliver(embed, 'announcement')
+    
+    @commands.command(name='announce_at', aliases=['запланировать_объявление'])
+    @admin_only()
+    async def announce_at(self, ctx, when: str, *, text: str):
+        """Планирует объявление
+        
+        Параметры:
+        when - время: +30m, +2h, +1d, ЧЧ:ММ (ближайшее) или ГГГГ-ММ-ДДTЧЧ:ММ
+        text - текст объявления
+        """
+        due = parse_when(when)
+        if due is None:
+            await ctx.send("❌ Не удалось разобрать время. Примеры: `+30m`, `+2h`, `18:00`, `2026-01-01T12:00`")
+            return
+        if due <= datetime.now():
+            await ctx.send("❌ Указанное время уже прошло")
+            return
+        
+        job = self.scheduler.schedule('announcement', due.timestamp(), {'text': text, 'author': str(ctx.author)})
+        await ctx.send(f"✅ Объявление `{job.job_id}` запланировано на <t:{int(job.due)}:f>")
+    
+    @commands.command(name='announcements', aliases=['объявления'])
+    @admin_only()
+    async def announcements(self, ctx):
+        """Показывает запланированные объявления и напоминание о шторме"""
+        jobs = self.scheduler.pending()
+        if not jobs:
+            await ctx.send("✅ Запланированных объявлений нет")
+            return
+        
+        embed = discord.Embed(title="Запланированные объявления", color=discord.Color.blue())
+        for job in jobs[:25]:
+            if job.kind == 'storm_reminder':
+                name, text = f"Напоминание о шторме `{job.job_id}`", f"Шторм ожидается <t:{int(job.payload['storm_at'])}:R>"
+            else:
+                name, text = f"Объявление `{job.job_id}`", job.payload.get('text', '')[:200]
+            embed.add_field(name=name, value=f"<t:{int(job.due)}:f>\n{text}", inline=False)
+        await ctx.send(embed=embed)
+    
+    @commands.command(name='cancel_announcement', aliases=['отменить_объявление'])
+    @admin_only()
+    async def cancel_announcement(self, ctx, job_id: str):
+        """Отменяет запланированное объявление или напоминание о шторме по ID"""
+        if self.scheduler.cancel(job_id):
+            await ctx.send(f"✅ Объявление `{job_id}` отменено")
+        else:
+            await ctx.send(f"❌ Объявление `{job_id}` не найдено")
+    
+    @commands.command(name='reload_routes', aliases=['перезагрузить_маршруты'])
+    @admin_only()
+    async def reload_routes(self, ctx):
+        """Перезагружает таблицу маршрутизации уведомлений из файла"""
+        try:
+            self.routes = self.load_routes()
+            self.channel_cache.clear()
+            
+            if not self.routes:
+                await ctx.send("✅ Маршруты не настроены, уведомления отправляются в канал из конфигурации.")
+                return
+            
+            embed = discord.Embed(title="Маршруты уведомлений", color=discord.Color.blue())
+            for notification_type, targets in self.routes.items():
+                lines = []
+                for target in targets:
+                    events = ", ".join(sorted(target.events)) if target.events else "все события"
+                    # Токен вебхука не показывается
+                    channel = f"<#{target.channel_id}>" if target.channel_id else "канал вебхука"
+                    webhook = ", вебхук" if target.webhook_url else ""
+                    lines.append(f"{channel} ({events}{webhook})")
+                embed.add_field(name=notification_type, value="\n".join(lines)[:1024], inline=False)
+            
+            await ctx.send("✅ Маршруты уведомлений перезагружены.", embed=embed)
+        except Exception as e:
+            logger.error(f"Ошибка при перезагрузке маршрутов уведомлений: {e}")
+            await ctx.send(f"❌ Произошла ошибка: {str(e)}")
+
+    @commands.hybrid_command(name='test_storm', aliases=['тест_шторм'])
+    @app_commands.describe(storm_type="start (начало), warning (предупреждение) или end (конец)")
     @admin_only()
     async def test_storm(self, ctx, storm_type="start"):
         """Отправляет тестовое уведомление о шторме
@@ -417,6 +1201,7 @@ class Notifications(commands.Cog):
             if storm_type == "warning":
                 test_data = {
                     "type": "storm_notification",
+                    "test": True,
                     "data": {
                         "is_active": False,
                         "is_warning": True,
@@ -427,6 +1212,7 @@ class Notifications(commands.Cog):
             elif storm_type == "end":
                 test_data = {
                     "type": "storm_notification",
+                    "test": True,
                     "data": {
                         "is_active": False,
                         "is_warning": False,
@@ -437,6 +1223,7 @@ class Notifications(commands.Cog):
             else:  # start по умолчанию
                 test_data = {
                     "type": "storm_notification",
+                    "test": True,
                     "data": {
                         "is_active": True,
                         "is_warning": False,
@@ -457,7 +1244,8 @@ class Notifications(commands.Cog):
             logger.error(f"Ошибка при отправке тестового уведомления: {e}")
             await ctx.send(f"❌ Произошла ошибка: {str(e)}")
 
-    @commands.command(name='test_season', aliases=['тест_сезон'])
+    @commands.hybrid_command(name='test_season', aliases=['тест_сезон'])
+    @app_commands.describe(season_type="spring (весна), summer (лето), autumn (осень) или winter (зима)")
     @admin_only()
     async def test_season(self, ctx, season_type="spring"):
         """Отправляет тестовое уведомление о смене сезона
@@ -482,6 +1270,7 @@ class Notifications(commands.Cog):
             # Формируем тестовые данные для уведомления
             test_data = {
                 "type": "season_notification",
+                "test": True,
                 "data": {
                     "season": season_type,
                     "time": "1 января 1 года, 12:00"
@@ -502,6 +1291,21 @@ class Notifications(commands.Cog):
             logger.error(f"Ошибка при отправке тестового уведомления о сезоне: {e}")
             await ctx.send(f"❌ Произошла ошибка: {str(e)}")
 
+    async def storm_type_autocomplete(self, interaction, current):
+        """Подсказывает типы тестовых уведомлений о шторме"""
+        values = STORM_TYPE_TRIE.complete(current or '')
+        return [app_commands.Choice(name=f"{value} ({TEST_STORM_TYPES[value]})", value=value) for value in values]
+    
+    async def season_type_autocomplete(self, interaction, current):
+        """Подсказывает сезоны по английскому или русскому названию"""
+        values = SEASON_TYPE_TRIE.complete(current or '')
+        return [app_commands.Choice(name=f"{value} ({TEST_SEASON_TYPES[value]})", value=value) for value in values]
+    
+    test_storm.autocomplete('storm_type')(storm_type_autocomplete)
+    test_season.autocomplete('season_type')(season_type_autocomplete)
+
 async def setup(bot):
     """Настройка cog"""
-    await bot.add_cog(Notifications(bot)) 
\ No newline at end of file
+    with startup_timer.measure('cog', 'Notifications'):
+        cog = Notifications(bot)
+    await bot.add_cog(cog) 
\ No newline at end of file
@@ -1,14 +1,17 @@
-import os
-import json
+import time
 import logging
 import asyncio
 import discord
+from discord import app_commands
 from discord.ext import commands, tasks
 from datetime import datetime
-import aiohttp
-import hashlib
-import requests
 from config import Config
+from utils.startup_timing import startup_timer
+from utils.hot_reload import get_cog_handoff
+from utils.health import get_health_state
+from utils.status_client import StatusClient
+from utils.availability import OutageDetector, AvailabilityLog, parse_period, format_duration
+from utils.storage import get_storage, default_server_status
 
 logger = logging.getLogger('discord_bot')
 
@@ -19,147 +22,244 @@ class ServerStatus(commands.Cog):
         self.bot = bot
         self.server_online = False
         self.player_count = 0
+        self.max_players = Config.DEFAULT_MAX_PLAYERS
         self.manual_maintenance_mode = False  # Флаг ручного режима техобслуживания
         self.maintenance_reason = ""  # Причина техобслуживания
         self.channel_update_lock = asyncio.Lock()
+        self.status_stream = None
+        self.stream_task = None
+        # Доступность сервера с гистерезисом и журнал ее переходов (загружаются в cog_load)
+        self.outage_detector = None
+        self.availability = None
+        self.availability_task = None
         
-        # Пути к файлам
-        self.BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        self.DATA_DIR = os.path.join(self.BASE_DIR, 'data')
-        self.SERVER_STATUS_FILE = os.path.join(self.DATA_DIR, 'server_status.json')
+        # Хранилище данных (JSON файлы или SQLite, см. STORAGE_BACKEND)
+        self.storage = get_storage(bot)
+        self.health = get_health_state(bot)
         
-        # Запуск задач
-        self.status_update_task.start()
+        # При горячей перезагрузке состояние, клиент API и поток принимаются от прежнего экземпляра
+        state = get_cog_handoff(bot).take('ServerStatus')
+        if state is not None:
+            self.adopt_state(state)
+        else:
+            self.create_clients()
+        
+        # Запуск задач (в режиме рабочего процесса статус опрашивает он)
+        if not Config.WORKER_MODE:
+            self.status_update_task.start()
+    
+    def create_clients(self):
+        """Создает клиент API статуса и (если включено) потоковое соединение"""
+        # Клиент API статуса с поддержкой ETag/304 и дельт
+        self.status_client = StatusClient(
+            Config.VS_SERVER_URL,
+            timeout=Config.REQUEST_TIMEOUT,
+            use_delta=Config.STATUS_DELTA_MODE
+        )
+        
+        # Потоковое соединение со статусом сервера (если включено, заменяет опрос)
+        if Config.STATUS_STREAM_ENABLED and not Config.WORKER_MODE:
+            # Модуль потокового канала нужен только в этом режиме, поэтому импортируется здесь
+            from utils.status_stream import StatusStream
+            stream_url = Config.VS_STREAM_URL or Config.VS_SERVER_URL.rstrip('/') + '/stream'
+            self.status_stream = StatusStream(
+                stream_url,
+                self.on_stream_event,
+                max_reconnect_delay=Config.Timers.RECONNECT_DELAY
+            )
     
-    def cog_unload(self):
+    def memory_structures(self):
+        """Долгоживущие структуры cog для отчета о памяти"""
+        return {
+            # Последний полный ответ API (включая список игроков), к которому применяются дельты
+            'status_snapshot': self.status_client.snapshot,
+            # Переходы доступности сервера для отчетов (по одному на отказ и восстановление)
+            'availability_transitions': self.availability.times if self.availability is not None else []
+        }
+    
+    def export_state(self):
+        """Состояние, передаваемое новому экземпляру cog при горячей перезагрузке"""
+        return {
+            'server_online': self.server_online,
+            'player_count': self.player_count,
+            'max_players': self.max_players,
+            'manual_maintenance_mode': self.manual_maintenance_mode,
+            'maintenance_reason': self.maintenance_reason,
+            # Клиент сохраняет ETag и последний снимок, поэтому первый опрос после перезагрузки остается условным
+            'status_client': self.status_client,
+            'status_stream': self.status_stream,
+            'stream_task': self.stream_task,
+            'outage_detector': self.outage_detector,
+            'availability': self.availability
+        }
+    
+    def adopt_state(self, state):
+        """Принимает состояние прежнего экземпляра cog"""
+        self.server_online = state['server_online']
+        self.player_count = state['player_count']
+        self.max_players = state['max_players']
+        self.manual_maintenance_mode = state['manual_maintenance_mode']
+        self.maintenance_reason = state['maintenance_reason']
+        self.status_client = state['status_client']
+        self.status_stream = state['status_stream']
+        self.stream_task = state['stream_task']
+        self.outage_detector = state.get('outage_detector')
+        self.availability = state.get('availability')
+        if self.status_stream:
+            # Открытое соединение не переподключается, меняется только обработчик событий
+            self.status_stream.on_event = self.on_stream_event
+        logger.warning("Состояние статуса сервера принято после перезагрузки модуля")
+    
+    @staticmethod
+    async def close_clients(state):
+        """Закрывает клиент API и потоковое соединение"""
+        if state['stream_task']:
+            state['stream_task'].cancel()
+        if state['status_stream']:
+            await state['status_stream'].close()
+        await state['status_client'].close()
+    
+    async def cog_load(self):
+        """Вызывается при загрузке cog"""
+        if self.availability is None:
+            with startup_timer.measure('data', 'availability'):
+                transitions, stored_status = await asyncio.gather(
+                    asyncio.to_thread(self.storage.load_availability),
+                    asyncio.to_thread(self.get_current_server_status)
+                )
+            self.availability = AvailabilityLog(transitions)
+            # До первых опросов считается, что сервер в последнем сохраненном состоянии
+            self.outage_detector = OutageDetector(
+                Config.OUTAGE_FAILURES,
+                Config.RECOVERY_SUCCESSES,
+                online=stored_status.get('server', {}).get('online', False)
+            )
+        if self.status_stream and self.stream_task is None:
+            self.stream_task = asyncio.create_task(self.run_status_stream())
+    
+    async def cog_unload(self):
         """Вызывается при выгрузке cog"""
         self.status_update_task.cancel()
+        
+        handoff = get_cog_handoff(self.bot)
+        if handoff.is_reloading('ServerStatus'):
+            handoff.stash('ServerStatus', self.export_state(), dispose=self.close_clients)
+            return
+        
+        # Пока бот остановлен, доступность сервера не отслеживается
+        self.record_availability(None)
+        await self.close_clients(self.export_state())
     
-    async def fetch_server_status(self):
-        """Получает информацию о статусе сервера"""
+    async def run_status_stream(self):
+        """Поддерживает потоковое соединение со статусом сервера"""
+        await self.bot.wait_until_ready()
+        await self.status_stream.run()
+    
+    async def on_stream_event(self, event_name, data):
+        """Обрабатывает события из потокового канала"""
+        if event_name == 'status':
+            self.health.mark_poll()
+            # Снимок статуса обрабатывается так же, как ответ на опрос
+            await self.update_server_status(StatusClient.normalize(data))
+        elif event_name == 'notification':
+            # Уведомления передаются в cog уведомлений в том же формате, что и элементы notification_batch
+            notifications_cog = self.bot.get_cog('Notifications')
+            if notifications_cog:
+                await notifications_cog.process_notification(data)
+    
+    async def apply_worker_status(self, data, success_age=None, not_modified=False):
+        """Принимает статус, полученный рабочим процессом
+        
+        data - нормализованный ответ API или None, если статус не изменился;
+        success_age - сколько секунд назад был последний успешный ответ API (None - ни разу);
+        not_modified - рабочий процесс получил ответ 304 на запрос к API.
+        """
+        if success_age is not None:
+            self.status_client.last_success = time.monotonic() - success_age
+            self.health.mark_poll(self.status_client.last_success)
+        if data is None:
+            # Ответ 304 - успешный опрос, которым может подтвердиться восстановление;
+            # без запроса к API (работает потоковый канал) детектор отказов не обновляется
+            if not_modified:
+                await self.update_server_status(not_modified=True)
+            return
+        self.status_client.snapshot = data
+        await self.update_server_status(data)
+    
+    def record_availability(self, online):
+        """Записывает переход доступности в журнал и хранилище"""
+        if self.availability is None or not self.availability.append(time.time(), online):
+            return
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(Config.VS_SERVER_URL, timeout=Config.REQUEST_TIMEOUT) as response:
-                    if response.status == 200:
-                        try:
-                            # Более надежный способ декодирования JSON
-                            content_type = response.headers.get('Content-Type', '').lower()
-                            logger.debug(f"Content-Type ответа: {content_type}")
-                            
-                            if 'application/json' in content_type:
-                                data = await response.json(content_type=None)
-                            else:
-                                # Считываем текст и пробуем вручную декодировать JSON
-                                text = await response.text()
-                                logger.info(f"Получен ответ не в формате JSON. Content-Type: {content_type}")
-                                logger.debug(f"Текст ответа: {text[:200]}")
-                                
-                                # Пытаемся парсить как JSON в любом случае
-                                try:
-                                    import json
-                                    data = json.loads(text)
-                                except json.JSONDecodeError as e:
-                                    logger.error(f"Не удалось распарсить ответ как JSON: {e}")
-                                    return {'online': False}
-                            
-                            # Полная диагностика данных от сервера
-                            logger.debug(f"Ответ от сервера: {data}")
-                            
-                            # Если в ответе есть игроки, но статус "offline", исправляем на "online"
-                            if (not data.get('online', False) and 
-                                (data.get('players') and len(data.get('players', [])) > 0 or 
-                                 data.get('playerCount', 0) > 0)):
-                                data['online'] = True
-                                logger.info("Сервер вернул статус 'offline', но есть игроки онлайн. Исправлено на 'online'.")
-                            
-                            return data
-                        except aiohttp.ClientResponseError as e:
-                            logger.error(f"Ошибка при декодировании JSON-ответа: {e}")
-                            return {'online': False}
-                    else:
-                        logger.info(f"Ошибка получения статуса сервера. Статус: {response.status}")
-                        return {'online': False}
-        except aiohttp.ClientConnectorError:
-            logger.info("Не удалось подключиться к серверу. Сервер оффлайн или недоступен.")
-            return {'online': False}
-        except asyncio.TimeoutError:
-            logger.info("Таймаут при получении статуса сервера.")
-            return {'online': False}
+            self.storage.append_availability(self.availability.times[-1], online)
         except Exception as e:
-            logger.error(f"Ошибка при получении статуса сервера: {e}")
-            return {'online': False}
+            logger.error(f"Ошибка при сохранении истории доступности: {e}")
     
-    def ensure_server_status_file(self):
-        """Создает файл статуса сервера, если он не существует"""
-        os.makedirs(self.DATA_DIR, exist_ok=True)
+    def record_poll(self, ok):
+        """Учитывает результат опроса сервера в детекторе отказов
         
-        if not os.path.exists(self.SERVER_STATUS_FILE):
-            server_status = {
-                "server": {
-                    "online": False,
-                    "player_count": 0,
-                    "max_players": Config.DEFAULT_MAX_PLAYERS,
-                    "last_checked": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "players": []
-                },
-                "manual_maintenance": {
-                    "active": False,
-                    "reason": ""
-                }
-            }
-            
-            with open(self.SERVER_STATUS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(server_status, f, ensure_ascii=False, indent=2)
-            
-            logger.warning(f"Создан файл статуса сервера: {self.SERVER_STATUS_FILE}")
+        Возвращает True, если результат совпадает с подтвержденным состоянием сервера
+        и его можно применять; неподтвержденный отказ или восстановление пропускаются.
+        """
+        previous = self.outage_detector.online
+        if self.outage_detector.observe(ok):
+            if previous is True:
+                logger.warning("Сервер перешел в оффлайн режим!")
+                self.availability_task = asyncio.create_task(self.announce_availability(False))
+            elif previous is False:
+                logger.warning("Сервер снова онлайн!")
+                # Длительность отказа берется из журнала до записи восстановления
+                downtime = time.time() - self.availability.times[-1] if self.availability.current is False else None
+                self.availability_task = asyncio.create_task(self.announce_availability(True, downtime))
+        # Отслеживание продолжается и после остановки бота или техобслуживания
+        self.record_availability(self.outage_detector.online)
+        return ok == self.outage_detector.online
+    
+    async def announce_availability(self, online, downtime=None):
+        """Отправляет уведомление об отказе или восстановлении сервера (маршрут server_availability)"""
+        notifications = self.bot.get_cog('Notifications')
+        if not Config.OUTAGE_NOTIFICATIONS or notifications is None:
+            return
+        if online:
+            embed = discord.Embed(
+                title="Сервер снова доступен",
+                description=f"🟢 **{Config.SERVER_NAME}** снова отвечает на запросы.",
+                color=discord.Color.green()
+            )
+            if downtime is not None:
+                embed.add_field(name="Был недоступен", value=format_duration(downtime), inline=False)
         else:
-            # Если файл существует, проверяем есть ли в нем поле manual_maintenance
-            try:
-                with open(self.SERVER_STATUS_FILE, 'r', encoding='utf-8') as f:
-                    server_status = json.load(f)
-                
-                # Если поля нет, добавляем его
-                if "manual_maintenance" not in server_status:
-                    server_status["manual_maintenance"] = {
-                        "active": False,
-                        "reason": ""
-                    }
-                    
-                    # Сохраняем обновленный статус
-                    with open(self.SERVER_STATUS_FILE, 'w', encoding='utf-8') as f:
-                        json.dump(server_status, f, ensure_ascii=False, indent=2)
-                    
-                    logger.warning(f"Добавлено поле manual_maintenance в файл статуса сервера")
-            except Exception as e:
-                logger.error(f"Ошибка при обработке файла статуса сервера: {e}")
+            embed = discord.Embed(
+                title="Сервер недоступен",
+                description=f"🔴 **{Config.SERVER_NAME}** не отвечает (неудачных опросов подряд: {Config.OUTAGE_FAILURES}).",
+                color=discord.Color.red()
+            )
+        try:
+            await notifications.deliver(embed, 'server_availability', 'recovery' if online else 'outage')
+        except Exception as e:
+            logger.error(f"Ошибка при отправке уведомления о доступности сервера: {e}")
+    
+    async def fetch_server_status(self):
+        """Получает информацию о статусе сервера
+        
+        Возвращает кортеж (данные, not_modified). Если сервер ответил 304 (состояние
+        не изменилось с прошлого запроса), возвращается (None, True). В режиме
+        рабочего процесса сервер здесь не опрашивается и возвращается (None, False).
+        """
+        if Config.WORKER_MODE:
+            # Статус опрашивает рабочий процесс, последний ответ уже применен в apply_worker_status
+            return None, False
+        data, changed = await self.status_client.fetch()
+        return (data, False) if changed else (None, True)
     
     def get_current_server_status(self):
-        """Получает текущий статус сервера из файла"""
+        """Получает текущий статус сервера из хранилища"""
         try:
-            # Убедимся, что файл статуса существует
-            self.ensure_server_status_file()
-            
-            # Читаем данные из файла
-            with open(self.SERVER_STATUS_FILE, 'r', encoding='utf-8') as f:
-                server_status = json.load(f)
-                
-            return server_status
+            return self.storage.load_status()
         except Exception as e:
             logger.error(f"Ошибка при получении текущего статуса сервера: {e}")
             # Возвращаем базовую структуру в случае ошибки
-            return {
-                "server": {
-                    "online": False,
-                    "player_count": 0,
-                    "max_players": Config.DEFAULT_MAX_PLAYERS,
-                    "last_checked": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "players": []
-                },
-                "manual_maintenance": {
-                    "active": False,
-                    "reason": ""
-                }
-            }
+            return default_server_status()
     
     def create_server_status_embed(self, server_info, maintenance_info=None):
         """Создает эмбед с информацией о статусе сервера"""
@@ -335,40 +435,58 @@ class ServerStatus(commands.Cog):
                 status=discord.Status.idle
             )
     
-    async def update_server_status(self):
-        """Обновляет информацию о статусе сервера"""
+    async def update_server_status(self, server_info=None, not_modified=False):
+        """Обновляет информацию о статусе сервера
+        
+        Если server_info передан (например, снимок из потокового канала), сервер не опрашивается.
+        not_modified - сервер уже ответил 304 на запрос (рабочему процессу), опрашивать его не нужно.
+        В детекторе отказов учитываются только настоящие ответы сервера: если статус не запрашивался
+        (команда в режиме рабочего процесса), возвращается сохраненный статус.
+        """
         # Проверяем режим технического обслуживания
         current_status = self.get_current_server_status()
         maintenance_active = current_status.get('manual_maintenance', {}).get('active', False)
+        # Во время техобслуживания сервер не опрашивается, и это не считается неготовностью бота
+        self.health.poll_paused = maintenance_active
         
         if maintenance_active:
             logger.warning(f"Режим тех.обслуживания активен: {current_status.get('manual_maintenance', {})}")
+            # Время техобслуживания не входит в расчет доступности
+            self.record_availability(None)
             # Проверяем, что классовые переменные тоже установлены правильно
             self.manual_maintenance_mode = True
             self.maintenance_reason = current_status.get('manual_maintenance', {}).get('reason', '')
             return current_status
         
         try:
-            # Получаем текущий статус сервера
-            current_status = self.get_current_server_status()
-            
             # Получаем информацию о сервере из API
-            server_info = await self.fetch_server_status()
-            
-            # Логируем текущий статус
-            # logger.info(f"Текущий статус: online={current_status.get('server', {}).get('online', False)}, " +
-            #             f"player_count={current_status.get('server', {}).get('player_count', 0)}")
+            if server_info is None and not not_modified:
+                server_info, not_modified = await self.fetch_server_status()
+                if self.status_client.last_success is not None:
+                    self.health.mark_poll(self.status_client.last_success)
             
-            # Проверяем изменение статуса онлайн
             prev_online = current_status.get('server', {}).get('online', False)
-            curr_online = server_info.get('online', False)
-            
-            if not prev_online and curr_online:
-                logger.warning("Сервер снова онлайн!")
-                # TODO: Отправить уведомление о восстановлении сервера
-            elif prev_online and not curr_online:
-                logger.warning("Сервер перешел в оффлайн режим!")
-                # TODO: Отправить уведомление о недоступности сервера
+            prev_player_count = current_status.get('server', {}).get('player_count', 0)
+            
+            if server_info is None and not not_modified:
+                # Сервер не опрашивался: показываем сохраненный статус
+                return current_status
+            if server_info is None:
+                # Сервер ответил 304 - это успешный опрос, которым может подтвердиться восстановление
+                applied = self.record_poll(True)
+                if applied and not prev_online and self.status_client.snapshot is not None:
+                    server_info = self.status_client.snapshot
+                else:
+                    # Состояние не изменилось, пропускаем всю обработку
+                    if 'server' in current_status:
+                        current_status['server']['last_checked'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    return current_status
+            elif not self.record_poll(server_info.get('online', False)):
+                # Единичный таймаут или первый ответ после отказа: состояние еще не подтверждено,
+                # поэтому сохраненный статус (игроки, онлайн) не меняется
+                if 'server' in current_status:
+                    current_status['server']['last_checked'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                return current_status
             
             # Обновляем информацию о статусе
             if 'server' not in current_status:
@@ -409,10 +527,16 @@ class ServerStatus(commands.Cog):
             # Обновляем глобальные переменные
             self.server_online = server_info.get('online', False)
             self.player_count = player_count
+            self.max_players = current_status['server']['max_players']
             
-            # Сохраняем обновленный статус в файл
-            with open(self.SERVER_STATUS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(current_status, f, ensure_ascii=False, indent=2)
+            # Сохраняем обновленный статус (только раздел server, без перезаписи остальных данных)
+            self.storage.save_status_section('server', current_status['server'])
+            if 'player_count_changed' in current_status:
+                self.storage.save_status_section('player_count_changed', player_count_changed)
+            
+            # В историю попадают только изменения доступности и количества игроков
+            if prev_online != current_status['server']['online'] or prev_player_count != player_count:
+                self.storage.append_status_history(current_status['server']['online'], player_count)
             
             # Обновляем статус бота
             await self.update_bot_presence(current_status)
@@ -426,6 +550,11 @@ class ServerStatus(commands.Cog):
     @tasks.loop(seconds=15)  # Обновление каждые 15 секунд
     async def status_update_task(self):
         """Задача для обновления статуса сервера"""
+        # Пока работает потоковое соединение, статус приходит без опроса
+        if self.status_stream and self.status_stream.connected:
+            self.health.mark_poll()
+            return
+        
         try:
             await self.update_server_status()
         except Exception as e:
@@ -437,10 +566,13 @@ class ServerStatus(commands.Cog):
         await self.bot.wait_until_ready()
         logger.warning("Задача обновления статуса сервера запущена")
     
-    @commands.command(name='status', aliases=['статус'])
+    @commands.hybrid_command(name='status', aliases=['статус'])
     async def status(self, ctx):
         """Отображает текущий статус сервера"""
         try:
+            # Опрос сервера может занять больше 3 секунд, отведенных на ответ слэш-команде
+            await ctx.defer()
+            
             # Получаем статус сервера
             server_info = await self.update_server_status()
             
@@ -456,7 +588,42 @@ class ServerStatus(commands.Cog):
             logger.error(f"Ошибка при выполнении команды status: {e}")
             await ctx.send("❌ Произошла ошибка при получении статуса сервера.")
 
-    @commands.command(name='maintenance', aliases=['тех_работы'])
+    @commands.command(name='availability', aliases=['доступность'])
+    async def availability_report(self, ctx, period: str = None):
+        """Показывает доступность сервера за период (по умолчанию за сутки, неделю и 30 дней)
+
+        Параметры:
+        period - период: 30m, 12h, 7d (также м, ч, д)
+        """
+        if period is None:
+            periods = [('Сутки', 86400), ('Неделя', 7 * 86400), ('30 дней', 30 * 86400)]
+        else:
+            seconds = parse_period(period)
+            if seconds is None:
+                await ctx.send("❌ Некорректный период. Примеры: `12h`, `7d`, `30м`")
+                return
+            periods = [(f"Последние {period}", seconds)]
+
+        if not self.availability or not self.availability.times:
+            await ctx.send("❌ История доступности сервера пока пуста.")
+            return
+
+        now = time.time()
+        embed = discord.Embed(title=f"Доступность сервера: {Config.SERVER_NAME}", color=discord.Color.blue())
+        for name, seconds in periods:
+            up, down, percent, outages = self.availability.report(now - seconds, now)
+            if percent is None:
+                value = "Нет данных"
+            else:
+                value = f"**{percent:.2f}%**"
+                if down:
+                    value += f"\nНедоступен: {format_duration(down)}, отказов: {outages}"
+            embed.add_field(name=name, value=value, inline=True)
+        embed.set_footer(text=f"Отслеживается с {datetime.fromtimestamp(self.availability.times[0]).strftime('%Y-%m-%d %H:%M')}. Время техобслуживания и остановки бота не учитывается")
+        await ctx.send(embed=embed)
+
+    @commands.hybrid_command(name='maintenance', aliases=['тех_работы'])
+    @app_commands.describe(reason="Причина тех. работ (без причины режим выключается)")
     @commands.has_permissions(administrator=True)
     async def maintenance(self, ctx, *, reason=None):
         """Включает или выключает режим технического обслуживания сервера.
@@ -467,25 +634,7 @@ class ServerStatus(commands.Cog):
         """
         try:
             # Получаем текущий статус сервера
-            current_status = None
-            if os.path.exists(self.SERVER_STATUS_FILE):
-                with open(self.SERVER_STATUS_FILE, 'r', encoding='utf-8') as f:
-                    current_status = json.load(f)
-            
-            if not current_status:
-                current_status = {
-                    "server": {
-                        "online": False,
-                        "player_count": 0,
-                        "max_players": Config.DEFAULT_MAX_PLAYERS,
-                        "last_checked": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        "players": []
-                    },
-                    "manual_maintenance": {
-                        "active": False,
-                        "reason": ""
-                    }
-                }
+            current_status = self.get_current_server_status()
             
             # Если в структуре нет раздела для ручного техобслуживания, добавляем его
             if "manual_maintenance" not in current_status:
@@ -510,9 +659,8 @@ class ServerStatus(commands.Cog):
                 self.manual_maintenance_mode = False
                 self.maintenance_reason = ""
                 
-                # Сохраняем изменения в файл
-                with open(self.SERVER_STATUS_FILE, 'w', encoding='utf-8') as f:
-                    json.dump(current_status, f, ensure_ascii=False, indent=2)
+                # Сохраняем изменения в хранилище
+                self.storage.save_maintenance(current_status["manual_maintenance"]["active"], current_status["manual_maintenance"]["reason"])
                 
                 # Обновляем статус бота
                 await self.update_bot_presence(current_status)
@@ -526,9 +674,8 @@ class ServerStatus(commands.Cog):
                 self.manual_maintenance_mode = True
                 self.maintenance_reason = reason
                 
-                # Сохраняем изменения в файл
-                with open(self.SERVER_STATUS_FILE, 'w', encoding='utf-8') as f:
-                    json.dump(current_status, f, ensure_ascii=False, indent=2)
+                # Сохраняем изменения в хранилище
+                self.storage.save_maintenance(current_status["manual_maintenance"]["active"], current_status["manual_maintenance"]["reason"])
                 
                 # Обновляем статус бота
                 await self.update_bot_presence(current_status)
@@ -550,4 +697,6 @@ class ServerStatus(commands.Cog):
 
 async def setup(bot):
     """Настройка cog"""
-    await bot.add_cog(ServerStatus(bot)) 
\ No newline at end of file
+    with startup_timer.measure('cog', 'ServerStatus'):
+        cog = ServerStatus(bot)
+    await bot.add_cog(cog) 
\ No newline at end of file
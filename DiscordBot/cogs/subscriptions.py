@@ -0,0 +1,251 @@
+import asyncio
+import logging
+import discord
+from discord.ext import commands
+from config import Config
+from utils.startup_timing import startup_timer
+from utils.rate_limit import TokenBucket
+from utils.storage import get_storage
+
+logger = logging.getLogger('discord_bot')
+
+# Темы подписки: тема -> (русское название, тип маршрута уведомлений)
+SUBSCRIPTION_TOPICS = {
+    'storm': ('шторм', 'storm_notification'),
+    'season': ('сезон', 'season_notification'),
+    'announcement': ('объявления', 'announcement')
+}
+# Поиск темы по английскому или русскому названию и по типу маршрута
+TOPIC_NAMES = {name: topic for topic, (name_ru, _) in SUBSCRIPTION_TOPICS.items() for name in (topic, name_ru)}
+ROUTE_TOPICS = {route_type: topic for topic, (_, route_type) in SUBSCRIPTION_TOPICS.items()}
+
+
+def parse_role_ids(value):
+    """Разбирает SUBSCRIPTION_ROLE_IDS вида "storm:123,season:456" в {тема: ID роли}"""
+    roles = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        name, _, role_id = item.partition(':')
+        topic = TOPIC_NAMES.get(name.strip().lower())
+        if topic is None or not role_id.strip().isdigit():
+            logger.error(f"Некорректный элемент SUBSCRIPTION_ROLE_IDS: {item}")
+            continue
+        roles[topic] = int(role_id)
+    return roles
+
+
+class Subscriptions(commands.Cog):
+    """Cog подписок игроков на уведомления: личные сообщения или упоминание роли"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.storage = get_storage(bot)
+
+        # Подписки по теме: тема -> {ID пользователя: запись подписки} (загружаются в cog_load)
+        self.subscribers = {topic: {} for topic in SUBSCRIPTION_TOPICS}
+        # Темы, о которых сообщается упоминанием роли в канале, а не личными сообщениями
+        self.role_ids = parse_role_ids(Config.SUBSCRIPTION_ROLE_IDS)
+
+        # Общий лимит запросов рассылки и отдельные лимиты тем, чтобы рассылка одной темы
+        # не занимала весь общий лимит. Запросы идут равномерно, без начального всплеска:
+        # вместе с остальными запросами бота они не превышают общий лимит Discord (50 в секунду)
+        self.global_bucket = TokenBucket(Config.SUBSCRIPTION_RATE, capacity=1)
+        self.topic_buckets = {topic: TokenBucket(Config.SUBSCRIPTION_TOPIC_RATE, capacity=1) for topic in SUBSCRIPTION_TOPICS}
+
+    async def cog_load(self):
+        """Вызывается при загрузке cog: загружает подписки в отдельном потоке"""
+        with startup_timer.measure('data', 'subscriptions'):
+            rows = await asyncio.to_thread(self.storage.load_subscriptions)
+        for row in rows:
+            if row['topic'] in self.subscribers:
+                self.subscribers[row['topic']][row['user_id']] = row
+
+    def memory_structures(self):
+        """Долгоживущие структуры cog для отчета о памяти"""
+        return {'subscribers': self.subscribers}
+
+    def role_for(self, route_type):
+        """ID роли, которую нужно упомянуть в уведомлении маршрута, или None"""
+        return self.role_ids.get(ROUTE_TOPICS.get(route_type))
+
+    async def notify(self, route_type, embed):
+        """Рассылает эмбед подписчикам темы личными сообщениями
+
+        Отправки идут параллельно (не более SUBSCRIPTION_CONCURRENCY одновременно) с общим
+        ограничением SUBSCRIPTION_RATE запросов и ограничением темы SUBSCRIPTION_TOPIC_RATE
+        сообщений в секунду.
+        Подписки, на которые SUBSCRIPTION_MAX_FAILURES раз подряд не удалось доставить
+        сообщение (закрыты личные сообщения, пользователь удален), удаляются.
+        Возвращает количество доставленных сообщений.
+        """
+        topic = ROUTE_TOPICS.get(route_type)
+        if topic is None or topic in self.role_ids:
+            return 0
+        subscriptions = list(self.subscribers[topic].values())
+        if not subscriptions:
+            return 0
+
+        semaphore = asyncio.Semaphore(max(1, Config.SUBSCRIPTION_CONCURRENCY))
+        topic_bucket = self.topic_buckets[topic]
+
+        async def send_one(subscription):
+            async with semaphore:
+                await topic_bucket.acquire()
+                return await self.send_direct(subscription, embed)
+
+        results = await asyncio.gather(*(send_one(subscription) for subscription in subscriptions))
+
+        # Пока шла рассылка, пользователь мог отписаться (или подписаться заново с новой записью):
+        # сохраняются только записи, которые по-прежнему хранятся в памяти, иначе отписка
+        # отменилась бы при сохранении измененной записи
+        current = self.subscribers[topic]
+        changed = [
+            subscription for subscription, (_, dirty) in zip(subscriptions, results)
+            if dirty and current.get(subscription['user_id']) is subscription
+        ]
+        dead = [
+            subscription for subscription in changed
+            if subscription['failures'] >= Config.SUBSCRIPTION_MAX_FAILURES
+        ]
+        for subscription in dead:
+            self.subscribers[topic].pop(subscription['user_id'], None)
+        try:
+            if dead:
+                await asyncio.to_thread(self.storage.delete_subscriptions, [(topic, item['user_id']) for item in dead])
+            alive = [subscription for subscription in changed if subscription not in dead]
+            if alive:
+                await asyncio.to_thread(self.storage.save_subscriptions, alive)
+        except Exception as e:
+            logger.error(f"Ошибка при сохранении подписок: {e}")
+
+        delivered = sum(1 for ok, _ in results if ok)
+        logger.warning(
+            f"Рассылка подписчикам темы {topic}: доставлено {delivered} из {len(subscriptions)}"
+            + (f", удалено недоступных подписок: {len(dead)}" if dead else ""),
+            extra={'event': route_type}
+        )
+        return delivered
+
+    async def send_direct(self, subscription, embed):
+        """Отправляет личное сообщение подписчику; возвращает (доставлено, запись изменилась)"""
+        dirty = False
+        try:
+            if subscription.get('dm_channel_id'):
+                # Канал личных сообщений сохранен в подписке: отправка обходится одним запросом
+                channel = self.bot.get_partial_messageable(subscription['dm_channel_id'], type=discord.ChannelType.private)
+            else:
+                await self.global_bucket.acquire()
+                channel = await self.bot.create_dm(discord.Object(id=subscription['user_id']))
+                subscription['dm_channel_id'] = channel.id
+                dirty = True
+            await self.global_bucket.acquire()
+            await channel.send(embed=embed)
+        except (discord.Forbidden, discord.NotFound) as e:
+            # Пользователь закрыл личные сообщения, заблокировал бота или удален
+            if isinstance(e, discord.NotFound):
+                subscription['dm_channel_id'] = None
+            subscription['failures'] = subscription.get('failures', 0) + 1
+            return False, True
+        except discord.HTTPException as e:
+            # Временная ошибка Discord не считается отказом подписчика
+            logger.error(f"Ошибка HTTP при отправке личного сообщения пользователю {subscription['user_id']}: {e}")
+            return False, dirty
+
+        if subscription.get('failures'):
+            subscription['failures'] = 0
+            dirty = True
+        return True, dirty
+
+    def describe_topics(self):
+        return ", ".join(f"`{name_ru}`" for name_ru, _ in SUBSCRIPTION_TOPICS.values())
+
+    @commands.command(name='subscribe', aliases=['подписка'])
+    async def subscribe(self, ctx, topic_name: str = None):
+        """Подписывает на уведомления темы (без параметра показывает ваши подписки)
+
+        Параметры:
+        topic_name - тема: шторм, сезон, объявления
+        """
+        if topic_name is None:
+            topics = [
+                SUBSCRIPTION_TOPICS[topic][0] for topic in SUBSCRIPTION_TOPICS
+                if ctx.author.id in self.subscribers[topic]
+                or (topic in self.role_ids and any(role.id == self.role_ids[topic] for role in getattr(ctx.author, 'roles', [])))
+            ]
+            current = ", ".join(f"`{name}`" for name in topics) if topics else "нет"
+            await ctx.send(f"Ваши подписки: {current}. Доступные темы: {self.describe_topics()}. Пример: `!подписка шторм`")
+            return
+
+        topic = TOPIC_NAMES.get(topic_name.lower())
+        if topic is None:
+            await ctx.send(f"❌ Неизвестная тема. Доступные темы: {self.describe_topics()}")
+            return
+        name_ru = SUBSCRIPTION_TOPICS[topic][0]
+
+        if topic in self.role_ids:
+            # Подписка ролью: уведомление в канале упоминает роль
+            if ctx.guild is None:
+                await ctx.send("❌ Подписка на эту тему оформляется на сервере, а не в личных сообщениях")
+                return
+            try:
+                await ctx.author.add_roles(discord.Object(id=self.role_ids[topic]), reason=f"Подписка на тему {name_ru}")
+            except discord.HTTPException as e:
+                logger.error(f"Не удалось выдать роль подписки {self.role_ids[topic]}: {e}")
+                await ctx.send("❌ Не удалось выдать роль подписки. Проверьте права бота на управление ролями.")
+                return
+            await ctx.send(f"✅ Вы подписаны на тему `{name_ru}`: уведомления будут упоминать вашу роль")
+            return
+
+        if ctx.author.id in self.subscribers[topic]:
+            await ctx.send(f"✅ Вы уже подписаны на тему `{name_ru}`")
+            return
+
+        # Подтверждение в личных сообщениях заодно проверяет, что они открыты
+        try:
+            confirmation = await ctx.author.send(f"✅ Вы подписались на уведомления: `{name_ru}`. Отписаться: `!отписка {name_ru}`")
+        except discord.HTTPException:
+            await ctx.send("❌ Не удалось отправить вам личное сообщение. Разрешите личные сообщения от участников сервера и повторите.")
+            return
+
+        subscription = {'topic': topic, 'user_id': ctx.author.id, 'dm_channel_id': confirmation.channel.id, 'failures': 0}
+        self.subscribers[topic][ctx.author.id] = subscription
+        await asyncio.to_thread(self.storage.save_subscriptions, [subscription])
+        if ctx.guild is not None:
+            await ctx.send(f"✅ Вы подписаны на тему `{name_ru}`")
+
+    @commands.command(name='unsubscribe', aliases=['отписка'])
+    async def unsubscribe(self, ctx, topic_name: str):
+        """Отписывает от уведомлений темы
+
+        Параметры:
+        topic_name - тема: шторм, сезон, объявления
+        """
+        topic = TOPIC_NAMES.get(topic_name.lower())
+        if topic is None:
+            await ctx.send(f"❌ Неизвестная тема. Доступные темы: {self.describe_topics()}")
+            return
+        name_ru = SUBSCRIPTION_TOPICS[topic][0]
+
+        if topic in self.role_ids:
+            if ctx.guild is None:
+                await ctx.send("❌ Отписка от этой темы оформляется на сервере, а не в личных сообщениях")
+                return
+            try:
+                await ctx.author.remove_roles(discord.Object(id=self.role_ids[topic]), reason=f"Отписка от темы {name_ru}")
+            except discord.HTTPException as e:
+                logger.error(f"Не удалось снять роль подписки {self.role_ids[topic]}: {e}")
+                await ctx.send("❌ Не удалось снять роль подписки. Проверьте права бота на управление ролями.")
+                return
+            await ctx.send(f"✅ Вы отписаны от темы `{name_ru}`")
+            return
+
+        if self.subscribers[topic].pop(ctx.author.id, None) is None:
+            await ctx.send(f"❌ Вы не подписаны на тему `{name_ru}`")
+            return
+        await asyncio.to_thread(self.storage.delete_subscriptions, [(topic, ctx.author.id)])
+        await ctx.send(f"✅ Вы отписаны от темы `{name_ru}`")
+
+async def setup(bot):
+    """Настройка cog"""
+    with startup_timer.measure('cog', 'Subscriptions'):
+        cog = Subscriptions(bot)
+    await bot.add_cog(cog)
@@ -10,14 +10,56 @@ class Config:
     DISCORD_TOKEN = os.getenv('DISCORD_TOKEN', '')
     VS_SERVER_URL = os.getenv('VS_SERVER_URL', 'http://localhost:8080/status/')
     REQUEST_TIMEOUT = int(os.getenv('REQUEST_TIMEOUT', '30'))
+    # Запрашивать у сервера только изменения списка игроков (дельты) вместо полного статуса
+    STATUS_DELTA_MODE = bool(os.getenv('STATUS_DELTA_MODE', 'True').lower() in ('true', '1', 't'))
+    # Получать статус и уведомления через постоянное потоковое соединение (SSE) вместо опроса
+    STATUS_STREAM_ENABLED = bool(os.getenv('STATUS_STREAM_ENABLED', 'False').lower() in ('true', '1', 't'))
+    # URL потокового канала (по умолчанию VS_SERVER_URL + 'stream')
+    VS_STREAM_URL = os.getenv('VS_STREAM_URL', '')
     
     # Значение максимального количества игроков по умолчанию
     DEFAULT_MAX_PLAYERS = int(os.getenv('DEFAULT_MAX_PLAYERS', '32'))
     
     # ID канала Discord для отправки уведомлений о шторме
     NOTIFICATION_CHANNEL_ID = int(os.getenv('NOTIFICATION_CHANNEL_ID', '0'))
+    # Вебхук канала NOTIFICATION_CHANNEL_ID (для маршрутов задается в notification_routes.json)
+    NOTIFICATION_WEBHOOK_URL = os.getenv('NOTIFICATION_WEBHOOK_URL', '')
+    # Способ доставки уведомлений: bot - от имени бота, webhook - через вебхуки каналов,
+    # auto - от имени бота, а через вебхуки, пока нет соединения со шлюзом Discord
+    NOTIFICATION_DELIVERY = os.getenv('NOTIFICATION_DELIVERY', 'bot').lower()
+    # Только принимать уведомления и доставлять их через вебхуки, не подключаясь к Discord
+    # (не нужен DISCORD_TOKEN; команды, статус сервера и подписки не работают)
+    INGESTION_ONLY = bool(os.getenv('INGESTION_ONLY', 'False').lower() in ('true', '1', 't'))
     # Порт для HTTP сервера, который будет принимать уведомления от игрового сервера
     NOTIFICATION_PORT = int(os.getenv('NOTIFICATION_PORT', '8081'))
+    # Максимальное количество одновременных отправок одного уведомления в разные каналы
+    # (маршруты уведомлений настраиваются в data/notification_routes.json)
+    NOTIFICATION_FANOUT_LIMIT = int(os.getenv('NOTIFICATION_FANOUT_LIMIT', '5'))
+    # Общий с StatusMod секрет для подписи уведомлений (HMAC-SHA256); пустое значение отключает проверку
+    # В StatusMod задается переменной окружения STATUSMOD_SECRET игрового сервера
+    NOTIFICATION_SECRET = os.getenv('NOTIFICATION_SECRET', '')
+    # Максимальный размер тела запроса с уведомлениями (в байтах)
+    NOTIFICATION_MAX_BODY = int(os.getenv('NOTIFICATION_MAX_BODY', '262144'))
+    # Максимальное количество одновременных соединений с HTTP сервером уведомлений
+    NOTIFICATION_MAX_CONNECTIONS = int(os.getenv('NOTIFICATION_MAX_CONNECTIONS', '16'))
+    # Объявлять о входе и выходе игроков (маршрут player_activity); входы и выходы
+    # за PLAYER_ANNOUNCE_WINDOW секунд объединяются в одно сообщение
+    PLAYER_ANNOUNCEMENTS = bool(os.getenv('PLAYER_ANNOUNCEMENTS', 'False').lower() in ('true', '1', 't'))
+    # Подписки игроков на уведомления (!подписка): не более SUBSCRIPTION_RATE личных сообщений
+    # в секунду всего и SUBSCRIPTION_TOPIC_RATE для одной темы, одновременно SUBSCRIPTION_CONCURRENCY отправок
+    SUBSCRIPTION_RATE = float(os.getenv('SUBSCRIPTION_RATE', '40'))
+    SUBSCRIPTION_TOPIC_RATE = float(os.getenv('SUBSCRIPTION_TOPIC_RATE', '20'))
+    SUBSCRIPTION_CONCURRENCY = int(os.getenv('SUBSCRIPTION_CONCURRENCY', '10'))
+    # Количество недоставленных подряд личных сообщений, после которого подписка удаляется
+    SUBSCRIPTION_MAX_FAILURES = int(os.getenv('SUBSCRIPTION_MAX_FAILURES', '3'))
+    # Роли подписки вида "storm:ID,season:ID,announcement:ID": для этих тем вместо личных
+    # сообщений уведомление в канале упоминает роль, а !подписка выдает ее
+    SUBSCRIPTION_ROLE_IDS = os.getenv('SUBSCRIPTION_ROLE_IDS', '')
+    # Принимать уведомления и опрашивать статус сервера в отдельном рабочем процессе,
+    # чтобы нагрузка на прием не задерживала соединение со шлюзом Discord
+    WORKER_MODE = bool(os.getenv('WORKER_MODE', 'False').lower() in ('true', '1', 't'))
+    # Количество необработанных уведомлений, при котором /readyz сообщает о неготовности
+    HEALTH_MAX_QUEUE = int(os.getenv('HEALTH_MAX_QUEUE', '100'))
     SERVER_NAME = os.getenv('SERVER_NAME', 'Vintage Story Server')
     
     # ID роли администратора, которая будет иметь доступ к специальным командам
@@ -26,6 +68,44 @@ class Config:
     # ID канала для информационного табло статуса сервера
     STATUS_CHANNEL_ID = int(os.getenv('STATUS_CHANNEL_ID', '0'))
     
+    # Гистерезис доступности сервера: сервер считается недоступным после OUTAGE_FAILURES
+    # неудачных опросов подряд и снова доступным после RECOVERY_SUCCESSES успешных подряд
+    OUTAGE_FAILURES = int(os.getenv('OUTAGE_FAILURES', '3'))
+    RECOVERY_SUCCESSES = int(os.getenv('RECOVERY_SUCCESSES', '2'))
+    # Уведомлять об отказе и восстановлении сервера (маршрут server_availability)
+    OUTAGE_NOTIFICATIONS = bool(os.getenv('OUTAGE_NOTIFICATIONS', 'True').lower() in ('true', '1', 't'))
+    
+    # Хранилище данных: json - файлы в каталоге data/, sqlite - база SQLite
+    # (при первом запуске с пустой базой данные импортируются из JSON файлов)
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'json')
+    # Путь к базе SQLite (относительные пути считаются от каталога бота)
+    SQLITE_PATH = os.getenv('SQLITE_PATH', 'data/bot.db')
+    
+    # ID сервера Discord для синхронизации слэш-команд (0 - глобально для всех серверов).
+    # Команды сервера обновляются сразу, глобальные - с задержкой до часа
+    COMMAND_SYNC_GUILD_ID = int(os.getenv('COMMAND_SYNC_GUILD_ID', '0'))
+    
+    # Адреса REST API и шлюза Discord; пустые значения - настоящий Discord.
+    # Для сквозных и нагрузочных тестов указываются адреса локальной замены (tools/fake_discord.py)
+    DISCORD_API_BASE = os.getenv('DISCORD_API_BASE', '')
+    DISCORD_GATEWAY_URL = os.getenv('DISCORD_GATEWAY_URL', '')
+    
+    # Журналирование
+    # Уровень: DEBUG, INFO, WARNING, ERROR, CRITICAL (меняется во время работы командой log_level)
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'ERROR')
+    LOG_FILE = os.getenv('LOG_FILE', 'discord_bot.log')
+    # Формат записей: text - строки, json - JSON по строке на запись (с полями cog и event)
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+    # Ротация файла журнала: size - по размеру (LOG_MAX_BYTES), time - по времени (LOG_ROTATION_WHEN)
+    LOG_ROTATION = os.getenv('LOG_ROTATION', 'size')
+    LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+    LOG_ROTATION_WHEN = os.getenv('LOG_ROTATION_WHEN', 'midnight')
+    # Количество хранимых архивных файлов журнала
+    LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', '5'))
+    
+    # Отслеживать выделения памяти (tracemalloc) с момента запуска; замедляет работу бота
+    MEMORY_TRACEMALLOC = bool(os.getenv('MEMORY_TRACEMALLOC', 'False').lower() in ('true', '1', 't'))
+    
     # Настройки оповещений
     # Включить расширенные оповещения (True - использовать случайные сообщения из JSON, False - использовать базовые сообщения)
     USE_EXTENDED_NOTIFICATIONS = bool(os.getenv('USE_EXTENDED_NOTIFICATIONS', 'True').lower() in ('true', '1', 't'))
@@ -51,6 +131,37 @@ class Config:
         
         # Время ожидания перед повторной попыткой подключения к серверу (в секундах)
         RECONNECT_DELAY = int(os.getenv('RECONNECT_DELAY', '60'))
+        
+        # Время, в течение которого можно листать страницы гайда или списка (в секундах)
+        PAGINATOR_TIMEOUT = int(os.getenv('PAGINATOR_TIMEOUT', '180'))
+        
+        # Интервал проверки хранилища сообщений на изменения (в секундах, 0 - отключить)
+        MESSAGE_CATALOG_CHECK = int(os.getenv('MESSAGE_CATALOG_CHECK', '5'))
+        
+        # Допустимое время запуска до события on_ready (в секундах); превышение записывается в лог
+        STARTUP_BUDGET = float(os.getenv('STARTUP_BUDGET', '10'))
+        
+        # Время на обработку уже принятых уведомлений при остановке бота (в секундах)
+        # Должно быть меньше TimeoutStopSec службы systemd (по умолчанию 90 секунд)
+        SHUTDOWN_DRAIN_TIMEOUT = float(os.getenv('SHUTDOWN_DRAIN_TIMEOUT', '20'))
+        
+        # Максимальный возраст последнего успешного получения статуса сервера для /readyz (в секундах)
+        HEALTH_MAX_POLL_AGE = float(os.getenv('HEALTH_MAX_POLL_AGE', '120'))
+        # Время без такта цикла событий, после которого /healthz считает бота зависшим (в секундах)
+        HEALTH_LOOP_STALL = float(os.getenv('HEALTH_LOOP_STALL', '30'))
+        
+        # Время на получение строки запроса и заголовков уведомления (в секундах)
+        NOTIFICATION_HEADER_TIMEOUT = float(os.getenv('NOTIFICATION_HEADER_TIMEOUT', '5'))
+        # Время на получение тела запроса с уведомлением (в секундах)
+        NOTIFICATION_BODY_TIMEOUT = float(os.getenv('NOTIFICATION_BODY_TIMEOUT', '10'))
+        # Допустимое расхождение метки времени подписанного уведомления с часами бота (в секундах)
+        NOTIFICATION_SIGNATURE_MAX_AGE = int(os.getenv('NOTIFICATION_SIGNATURE_MAX_AGE', '300'))
+        
+        # Окно объединения входов и выходов игроков в одно объявление (в секундах)
+        PLAYER_ANNOUNCE_WINDOW = float(os.getenv('PLAYER_ANNOUNCE_WINDOW', '10'))
+        
+        # За сколько игровых суток до шторма отправлять напоминание по прогнозу StatusMod (0 - отключить)
+        STORM_REMINDER_DAYS = float(os.getenv('STORM_REMINDER_DAYS', '1'))
 
 # Проверяем наличие токена Discord
 if not Config.DISCORD_TOKEN:
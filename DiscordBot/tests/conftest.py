@@ -0,0 +1,23 @@
+"""Общие настройки тестов: модули бота импортируются из каталога DiscordBot"""
+import os
+import sys
+import socket
+import importlib.util
+
+BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BOT_DIR not in sys.path:
+    sys.path.insert(0, BOT_DIR)
+
+# Без собственного config.py модули бота используют настройки по умолчанию из config.example.py
+if not os.path.exists(os.path.join(BOT_DIR, 'config.py')) and 'config' not in sys.modules:
+    spec = importlib.util.spec_from_file_location('config', os.path.join(BOT_DIR, 'config.example.py'))
+    config = importlib.util.module_from_spec(spec)
+    sys.modules['config'] = config
+    spec.loader.exec_module(config)
+
+
+def free_port():
+    """Возвращает свободный TCP порт на 127.0.0.1"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
@@ -0,0 +1,132 @@
+"""Сквозной тест: bot.py против tools/fake_discord.py и tools/status_stub.py без Discord и игрового сервера
+
+Бот запускается отдельным процессом из копии каталога DiscordBot во временной папке,
+чтобы файлы в data/ и журнал не попадали в рабочую копию репозитория.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import subprocess
+import urllib.request
+
+import pytest
+
+pytest.importorskip('discord')
+
+from conftest import BOT_DIR, free_port
+from tools.fake_discord import FakeDiscordServer
+from tools.status_stub import StatusState, StatusStubServer
+
+NOTIFICATION_CHANNEL_ID = 111
+STATUS_CHANNEL_ID = 222
+ADMIN_ROLE_ID = 333
+SEND_ROUTE = '/channels/{channel_id}/messages'
+
+
+def wait_until(predicate, timeout=30, interval=0.1):
+    """Ждет, пока predicate() вернет непустое значение; возвращает его или None по таймауту"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = predicate()
+        if result:
+            return result
+        time.sleep(interval)
+    return None
+
+
+def presence_calls(fake):
+    return fake.log.calls(kind='gateway', method='PRESENCE_UPDATE')
+
+
+def presence_name(call):
+    return call.payload['activities'][0]['name']
+
+
+def notification_sends(fake):
+    return [call for call in fake.log.calls(kind='http', method='POST', route=SEND_ROUTE)
+            if call.path.endswith(f"/channels/{NOTIFICATION_CHANNEL_ID}/messages")]
+
+
+@pytest.fixture
+def environment(tmp_path):
+    """Замена Discord, симулятор API статуса и запущенный против них бот"""
+    bot_dir = tmp_path / 'DiscordBot'
+    shutil.copytree(BOT_DIR, bot_dir, ignore=shutil.ignore_patterns('__pycache__', 'tests', 'benchmarks', '*.db*'))
+    shutil.copy(bot_dir / 'config.example.py', bot_dir / 'config.py')
+
+    fake = FakeDiscordServer(port=free_port(), channel_ids=[NOTIFICATION_CHANNEL_ID, STATUS_CHANNEL_ID],
+                             admin_role_id=ADMIN_ROLE_ID).start()
+    stub = StatusStubServer(port=0, state=StatusState(['Alice'])).start()
+    notification_port = free_port()
+
+    env = dict(
+        os.environ,
+        DISCORD_TOKEN='fake',
+        DISCORD_API_BASE=fake.api_base,
+        DISCORD_GATEWAY_URL=fake.gateway_url,
+        VS_SERVER_URL=stub.url,
+        STATUS_STREAM_ENABLED='True',
+        NOTIFICATION_CHANNEL_ID=str(NOTIFICATION_CHANNEL_ID),
+        STATUS_CHANNEL_ID=str(STATUS_CHANNEL_ID),
+        ADMIN_ROLE_ID=str(ADMIN_ROLE_ID),
+        NOTIFICATION_PORT=str(notification_port),
+        NOTIFICATION_COOLDOWN='0',
+        REQUEST_TIMEOUT='2',
+        LOG_LEVEL='WARNING',
+        LOG_FILE=str(tmp_path / 'bot.log'),
+    )
+    bot = subprocess.Popen([sys.executable, 'bot.py'], cwd=bot_dir, env=env,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        yield fake, stub, notification_port
+    finally:
+        bot.terminate()
+        try:
+            bot.wait(30)
+        except subprocess.TimeoutExpired:
+            bot.kill()
+            bot.wait()
+        fake.stop()
+        stub.stop()
+    assert bot.returncode == 0, (tmp_path / 'bot.log').read_text(encoding='utf-8')[-4000:]
+
+
+def post_notification(port, notification_type, data):
+    body = json.dumps({'type': notification_type, 'data': data}).encode('utf-8')
+    request = urllib.request.Request(f"http://127.0.0.1:{port}/status/notification", data=body, method='POST')
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return response.status
+
+
+def test_notification_and_status_update_reach_discord_in_order(environment):
+    fake, stub, notification_port = environment
+    max_players = stub.state.max_players
+
+    # Бот вошел в шлюз и получил статус сервера из потокового канала
+    online = wait_until(lambda: [call for call in presence_calls(fake)
+                                 if presence_name(call).endswith(f": 1/{max_players} игроков")])
+    assert online, [presence_name(call) for call in presence_calls(fake)]
+    assert presence_name(presence_calls(fake)[0]).endswith("Подключение к серверу...")
+
+    # Уведомление о шторме -> channel.send в канал уведомлений
+    assert post_notification(notification_port, 'storm_notification', {
+        'type': 'storm_notification', 'is_active': True, 'is_warning': False, 'message': '', 'time': '12:00'
+    }) == 200
+    sends = wait_until(lambda: notification_sends(fake))
+    assert sends, "уведомление не отправлено в канал"
+    assert len(sends) == 1
+    assert sends[0].status == 200
+    assert sends[0].payload['embeds'][0]['title'] == "Штормовое предупреждение"
+
+    # Изменение статуса на сервере -> change_presence с новым количеством игроков
+    stub.state.update(players=['Alice', 'Bob'])
+    updated = wait_until(lambda: [call for call in presence_calls(fake)
+                                  if presence_name(call).endswith(f": 2/{max_players} игроков")])
+    assert updated, [presence_name(call) for call in presence_calls(fake)]
+    assert updated[0].payload['status'] == 'online'
+
+    # Порядок вызовов: вход, статус онлайн, отправка уведомления, новый статус
+    assert presence_calls(fake)[0].seq < online[0].seq < sends[0].seq < updated[0].seq
+    assert len(notification_sends(fake)) == 1
@@ -0,0 +1,43 @@
+"""Каталог сообщений: подмена снимка и дерева ключей автодополнения"""
+import pytest
+
+from utils.message_catalog import MessageCatalog
+from utils.storage import JsonStorage, MESSAGE_FILES, write_json_file
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    write_json_file(tmp_path / MESSAGE_FILES['storm'], {'storm_start': ['Шторм!'], 'storm_custom': ['Свой шторм']})
+    write_json_file(tmp_path / MESSAGE_FILES['season'], {})
+    catalog = MessageCatalog(JsonStorage(str(tmp_path)), check_interval=0)
+    catalog.ensure_loaded()
+    return catalog
+
+
+def test_complete_keys_include_known_and_stored_keys(catalog):
+    assert catalog.complete_keys('storm', 'storm_c') == ['storm_custom']
+    # Известные ключи подсказываются, даже если сообщений для них нет
+    assert catalog.complete_keys('season', 'su') == ['summer']
+
+
+def test_reload_publishes_new_trie_without_changing_the_old_one(catalog):
+    published = catalog.key_tries['storm']
+
+    catalog.storage.replace_messages('storm', {'storm_other': ['Другой шторм']})
+    assert catalog.reload('storm', force=True)
+
+    # Читатель, получивший дерево до перезагрузки, обходит его без изменений
+    assert catalog.key_tries['storm'] is not published
+    assert published.complete('storm_c') == ['storm_custom']
+    assert published.complete('storm_o') == []
+
+    assert catalog.complete_keys('storm', 'storm_c') == []
+    assert catalog.complete_keys('storm', 'storm_o') == ['storm_other']
+    assert catalog.complete_keys('storm', 'storm_s') == ['storm_start']
+
+
+def test_add_message_adds_key_to_completion(catalog):
+    assert catalog.add_message('season', 'harvest', 'Время урожая')
+
+    assert catalog.complete_keys('season', 'har') == ['harvest']
+    assert catalog.choice('season', 'harvest') == 'Время урожая'
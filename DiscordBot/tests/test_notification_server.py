@@ -0,0 +1,110 @@
+"""Прием уведомлений NotificationServer: размер тела и подпись проверяются до чтения тела"""
+import json
+import time
+import threading
+import http.client
+
+import pytest
+
+from cogs.notifications import create_notifications_server, sign_notification
+
+SECRET = 'test-secret'
+BODY = json.dumps({'type': 'storm_notification', 'data': {'type': 'storm_notification'}}).encode('utf-8')
+
+
+class AcceptingCog:
+    """Замена cog уведомлений: запоминает принятые уведомления"""
+
+    def __init__(self):
+        self.received = []
+
+    def submit(self, notification):
+        self.received.append(notification)
+        return True
+
+
+@pytest.fixture
+def server():
+    server = create_notifications_server('127.0.0.1', 0, AcceptingCog())
+    server.secret = SECRET
+    server.max_body = 1024
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def post(server, headers, body=BODY):
+    """Отправляет POST /status/notification с заданными заголовками; возвращает (статус, ответ)"""
+    connection = http.client.HTTPConnection(*server.server_address[:2], timeout=5)
+    try:
+        connection.putrequest('POST', '/status/notification')
+        headers = dict({'Content-Length': str(len(body))}, **headers)
+        for name, value in headers.items():
+            connection.putheader(name, value.encode('latin-1'))
+        connection.endheaders()
+        if body:
+            connection.send(body)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def signed_headers(body=BODY, timestamp=None, secret=SECRET):
+    timestamp = str(int(time.time()) if timestamp is None else timestamp)
+    return {'X-Timestamp': timestamp, 'X-Signature': 'sha256=' + sign_notification(secret, timestamp, body)}
+
+
+def test_valid_signature_is_accepted(server):
+    status, response = post(server, signed_headers())
+
+    assert status == 200
+    assert response == {'status': 'success'}
+    assert server.notifications_cog.received == [json.loads(BODY)]
+
+
+def test_uppercase_signature_is_accepted(server):
+    headers = signed_headers()
+    headers['X-Signature'] = 'sha256=' + headers['X-Signature'][len('sha256='):].upper()
+
+    assert post(server, headers)[0] == 200
+
+
+def test_wrong_signature_is_rejected(server):
+    status, response = post(server, signed_headers(secret='other-secret'))
+
+    assert (status, response) == (401, {'error': 'Invalid signature'})
+    assert server.notifications_cog.received == []
+
+
+@pytest.mark.parametrize('headers, error', [
+    ({}, 'Signature required'),
+    ({'X-Signature': 'sha256=' + '0' * 64}, 'Signature required'),
+    ({'X-Timestamp': str(int(time.time()))}, 'Signature required'),
+], ids=['no-headers', 'no-timestamp', 'no-signature'])
+def test_missing_signature_or_timestamp_is_rejected(server, headers, error):
+    assert post(server, headers) == (401, {'error': error})
+
+
+@pytest.mark.parametrize('timestamp', [int(time.time()) - 3600, int(time.time()) + 3600, 'yesterday'],
+                         ids=['past', 'future', 'not-a-number'])
+def test_stale_timestamp_is_rejected(server, timestamp):
+    assert post(server, signed_headers(timestamp=timestamp)) == (401, {'error': 'Stale timestamp'})
+
+
+@pytest.mark.parametrize('signature', ['ÿ' * 64, 'ÿ' + '0' * 63, '0' * 63, '0' * 65, 'z' * 64],
+                         ids=['non-ascii', 'non-ascii-prefix', 'short', 'long', 'not-hex'])
+def test_malformed_signature_is_rejected(server, signature):
+    headers = {'X-Timestamp': str(int(time.time())), 'X-Signature': 'sha256=' + signature}
+
+    assert post(server, headers) == (401, {'error': 'Invalid signature'})
+    assert server.notifications_cog.received == []
+
+
+def test_oversized_body_is_rejected_before_reading(server):
+    # Тело не отправляется: сервер отвечает по заголовку Content-Length
+    headers = dict(signed_headers(), **{'Content-Length': str(server.max_body + 1)})
+
+    assert post(server, headers, body=b'') == (413, {'error': 'Payload too large'})
@@ -0,0 +1,97 @@
+"""Условные запросы (ETag/304) и дельты StatusClient против tools/status_stub.py"""
+import asyncio
+
+import pytest
+
+from tools.status_stub import StatusState, StatusStubServer
+from utils.status_client import StatusClient
+
+
+@pytest.fixture
+def stub():
+    server = StatusStubServer(port=0, state=StatusState(['Alice', 'Bob'])).start()
+    yield server
+    server.stop()
+
+
+def run_client(client, *steps):
+    """Выполняет шаги (корутины от клиента) по очереди и закрывает сессию клиента"""
+    async def scenario():
+        try:
+            return [await step(client) for step in steps]
+        finally:
+            await client.close()
+    return asyncio.run(scenario())
+
+
+async def fetch(client):
+    return await client.fetch()
+
+
+def test_second_fetch_is_not_modified(stub):
+    client = StatusClient(stub.url, timeout=5)
+    (first, first_changed), (second, second_changed) = run_client(client, fetch, fetch)
+
+    assert first_changed is True
+    assert first['players'] == ['Alice', 'Bob']
+    assert client.etag == stub.state.etag
+
+    # 304: клиент возвращает сохраненный снимок и сообщает, что ничего не изменилось
+    assert second_changed is False
+    assert second is first
+    assert stub.not_modified_count == 1
+    assert client.last_success is not None
+
+
+def test_changed_state_is_fetched_as_delta(stub, monkeypatch):
+    deltas = []
+    apply_delta = StatusClient.apply_delta
+
+    def record_delta(self, delta):
+        deltas.append(delta)
+        return apply_delta(self, delta)
+
+    monkeypatch.setattr(StatusClient, 'apply_delta', record_delta)
+
+    async def change_players(client):
+        stub.state.update(players=['Alice', 'Carol'])
+
+    client = StatusClient(stub.url, timeout=5, use_delta=True)
+    results = run_client(client, fetch, change_players, fetch)
+    data, changed = results[2]
+
+    assert changed is True
+    assert len(deltas) == 1
+    assert deltas[0]['added'] == ['Carol']
+    assert deltas[0]['removed'] == ['Bob']
+    # Состояние после применения дельты совпадает с полным ответом сервера
+    assert data == stub.state.payload()
+    assert client.version == stub.state.version
+
+
+def test_delta_mode_disabled_fetches_full_status(stub, monkeypatch):
+    monkeypatch.setattr(StatusClient, 'apply_delta', lambda self, delta: pytest.fail("дельта не запрашивалась"))
+
+    async def change_players(client):
+        stub.state.update(players=['Carol'])
+
+    client = StatusClient(stub.url, timeout=5, use_delta=False)
+    results = run_client(client, fetch, change_players, fetch)
+    data, changed = results[2]
+
+    assert changed is True
+    assert data == stub.state.payload()
+
+
+def test_apply_delta_keeps_player_order():
+    client = StatusClient('http://127.0.0.1:1/status/')
+    client.snapshot = {'online': True, 'playerCount': 3, 'players': ['Alice', 'Bob', 'Carol'], 'version': '1-1'}
+
+    data = client.apply_delta({
+        'delta': True, 'baseVersion': '1-1', 'version': '1-2', 'online': True,
+        'added': ['Dave', 'Alice'], 'removed': ['Bob']
+    })
+
+    assert data == {'online': True, 'playerCount': 3, 'players': ['Alice', 'Carol', 'Dave'], 'version': '1-2'}
+    # Снимок, к которому применялась дельта, не изменяется
+    assert client.snapshot['players'] == ['Alice', 'Bob', 'Carol']
@@ -0,0 +1,154 @@
+"""Потоковый канал StatusStream против tools/status_stub.py: Last-Event-ID, снимок, переподключение"""
+import types
+import asyncio
+
+import pytest
+
+from tools.status_stub import STREAM_HISTORY_SIZE, StatusState, StatusStubServer
+from utils import status_stream
+from utils.status_stream import StatusStream
+
+STORM = {'type': 'storm_notification', 'is_active': True, 'is_warning': False, 'message': '', 'time': 'x'}
+
+
+def stream_url(server):
+    return server.url + 'stream'
+
+
+class Recorder:
+    """Обработчик событий потока, запоминающий их по порядку"""
+
+    def __init__(self):
+        self.events = []
+        self.changed = asyncio.Event()
+
+    async def __call__(self, event_name, data):
+        self.events.append((event_name, data))
+        self.changed.set()
+
+    async def wait_for(self, count, timeout=5):
+        async def wait():
+            while len(self.events) < count:
+                self.changed.clear()
+                await self.changed.wait()
+        await asyncio.wait_for(wait(), timeout)
+
+
+async def receive_then_disconnect(stream, recorder, server, count):
+    """Слушает поток, пока не придут count событий, затем останавливает сервер и ждет обрыва"""
+    listen = asyncio.create_task(stream.listen())
+    await recorder.wait_for(count)
+    await asyncio.to_thread(server.stop)
+    assert await asyncio.wait_for(listen, 5) is True
+    assert stream.connected is True
+
+
+async def reconnect(stream, recorder, state, count):
+    """Подключается к новому серверу с тем же состоянием и принимает count событий"""
+    server = StatusStubServer(port=0, state=state).start()
+    stream.url = stream_url(server)
+    listen = asyncio.create_task(stream.listen())
+    try:
+        await recorder.wait_for(count)
+    finally:
+        await asyncio.to_thread(server.stop)
+        await asyncio.wait_for(listen, 5)
+        await stream.close()
+    return server
+
+
+@pytest.fixture
+def state():
+    state = StatusState(['Alice'])
+    # Событие в истории нужно, чтобы у начального снимка был ID для Last-Event-ID
+    state.update(players=['Alice', 'Bob'])
+    return state
+
+
+def test_resume_delivers_only_missed_events(state):
+    recorder = Recorder()
+
+    async def scenario():
+        server = StatusStubServer(port=0, state=state).start()
+        stream = StatusStream(stream_url(server), recorder)
+        await receive_then_disconnect(stream, recorder, server, 1)
+        assert stream.last_event_id == state.events[-1][0]
+
+        # Пока клиент отключен, сервер публикует события
+        state.update(players=['Alice', 'Bob', 'Carol'])
+        notification_id = state.publish_notification('storm_notification', STORM)
+
+        resumed = await reconnect(stream, recorder, state, 3)
+        return stream, resumed, notification_id
+
+    stream, resumed, notification_id = asyncio.run(scenario())
+
+    assert [name for name, _ in recorder.events] == ['status', 'status', 'notification']
+    assert recorder.events[0][1]['players'] == ['Alice', 'Bob']
+    assert recorder.events[1][1]['players'] == ['Alice', 'Bob', 'Carol']
+    assert recorder.events[2][1]['type'] == 'storm_notification'
+    assert stream.last_event_id == notification_id
+    assert resumed.stream_connections == 1
+
+
+def test_evicted_history_falls_back_to_snapshot(state):
+    recorder = Recorder()
+
+    async def scenario():
+        server = StatusStubServer(port=0, state=state).start()
+        stream = StatusStream(stream_url(server), recorder)
+        await receive_then_disconnect(stream, recorder, server, 1)
+        missed_from = stream.last_event_id
+
+        # Пропущенных событий больше, чем хранит история: ID клиента из нее вытеснен
+        state.update(players=['Carol'])
+        for _ in range(STREAM_HISTORY_SIZE):
+            state.publish_notification('storm_notification', STORM)
+        assert state.events_after(missed_from) is None
+
+        await reconnect(stream, recorder, state, 2)
+        # Дослать больше нечего: после снимка новых событий не приходит
+        await asyncio.sleep(0.2)
+        return stream
+
+    stream = asyncio.run(scenario())
+
+    assert [name for name, _ in recorder.events] == ['status', 'status']
+    assert recorder.events[1][1]['players'] == ['Carol']
+    assert stream.last_event_id == state.events[-1][0]
+
+
+def test_reconnect_backoff(state, monkeypatch):
+    delays = []
+    recorder = Recorder()
+    server = StatusStubServer(port=0, state=state).start()
+
+    async def stop_after_first_event(event_name, data):
+        await recorder(event_name, data)
+        await asyncio.to_thread(server.stop)
+
+    async def sleep(delay):
+        delays.append(delay)
+        if len(delays) == 5:
+            raise asyncio.CancelledError()
+        await asyncio.sleep(0)
+
+    # Задержки переподключения перехватываются, чтобы тест не ждал их на самом деле
+    monkeypatch.setattr(status_stream, 'asyncio', types.SimpleNamespace(
+        sleep=sleep, CancelledError=asyncio.CancelledError, TimeoutError=asyncio.TimeoutError
+    ))
+
+    async def scenario():
+        stream = StatusStream(stream_url(server), stop_after_first_event, max_reconnect_delay=8)
+        try:
+            await asyncio.wait_for(stream.run(), 15)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            await stream.close()
+
+    asyncio.run(scenario())
+
+    assert len(recorder.events) == 1
+    # После полученных событий переподключение быстрое, затем задержка удваивается до максимума
+    assert delays == [1, 2, 4, 8, 8]
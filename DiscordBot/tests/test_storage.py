@@ -0,0 +1,158 @@
+"""Хранилища данных: импорт JSON в SQLite, выгрузка в JSON и порядок разделов гайдов"""
+import os
+import shutil
+import threading
+
+import pytest
+
+from utils.storage import (
+    DATA_DIR, MESSAGE_FILES, GUIDES_FILE, STATUS_FILE, SCHEDULE_FILE, SUBSCRIPTIONS_FILE, AVAILABILITY_FILE,
+    JsonStorage, SQLiteStorage, StorageBackend, write_json_file
+)
+
+
+def load_all(storage):
+    """Все данные хранилища в виде, не зависящем от его типа"""
+    guides = storage.load_guides()
+    # В JSON у гайда без разделов может не быть ключа sections
+    for guide in guides['guides']:
+        guide.setdefault('sections', [])
+    return {
+        'guides': guides,
+        'messages': {kind: storage.load_messages(kind) for kind in MESSAGE_FILES},
+        'status': storage.load_status(),
+        'jobs': storage.load_scheduled_jobs(),
+        'subscriptions': sorted(storage.load_subscriptions(), key=lambda item: (item['topic'], item['user_id'])),
+        'availability': storage.load_availability(),
+    }
+
+
+@pytest.fixture
+def json_dir(tmp_path):
+    """Каталог данных: файлы из data/ и задачи, подписки и доступность"""
+    source = tmp_path / 'json'
+    source.mkdir()
+    for file_name in [GUIDES_FILE, STATUS_FILE, *MESSAGE_FILES.values()]:
+        shutil.copy(os.path.join(DATA_DIR, file_name), source / file_name)
+    write_json_file(source / SCHEDULE_FILE, {"jobs": [
+        {"id": "storm_reminder", "due": 1800000000.0, "kind": "storm_reminder", "payload": {"minutes": 10}}
+    ]})
+    write_json_file(source / SUBSCRIPTIONS_FILE, {"subscriptions": [
+        {"topic": "storm", "user_id": 42, "dm_channel_id": 4200, "failures": 0},
+        {"topic": "season", "user_id": 7, "dm_channel_id": None, "failures": 2},
+    ]})
+    write_json_file(source / AVAILABILITY_FILE, {"transitions": [
+        {"at": 1700000000.0, "online": True}, {"at": 1700000600.0, "online": False}, {"at": 1700000900.0, "online": None}
+    ]})
+    return source
+
+
+@pytest.fixture
+def sqlite_storage(tmp_path, json_dir):
+    storage = SQLiteStorage(str(tmp_path / 'bot.db'), import_dir=str(json_dir))
+    yield storage
+    storage.close()
+
+
+def test_sqlite_imports_json_data(json_dir, sqlite_storage):
+    assert sqlite_storage.get_meta('json_imported') is not None
+    assert load_all(sqlite_storage) == load_all(JsonStorage(str(json_dir)))
+
+
+def test_import_runs_once(tmp_path, json_dir, sqlite_storage):
+    sqlite_storage.delete_guide(sqlite_storage.load_guides()['guides'][0]['id'])
+    guides = sqlite_storage.load_guides()
+    sqlite_storage.close()
+
+    # Повторное открытие базы не импортирует JSON заново поверх изменений
+    reopened = SQLiteStorage(str(tmp_path / 'bot.db'), import_dir=str(json_dir))
+    try:
+        assert reopened.load_guides() == guides
+    finally:
+        reopened.close()
+
+
+def test_export_json_round_trip(tmp_path, sqlite_storage):
+    sqlite_storage.insert_guide({'id': 9999, 'title': 'Новый', 'description': 'Описание', 'icon': '🛠️'})
+    sqlite_storage.insert_section(9999, 0, {'title': 'Раздел', 'content': 'Текст'})
+    sqlite_storage.insert_message('storm', 'storm_start', 'Шторм!')
+    sqlite_storage.save_maintenance(True, 'Обновление')
+    expected = load_all(sqlite_storage)
+
+    export_dir = tmp_path / 'export'
+    sqlite_storage.export_json(str(export_dir))
+    assert load_all(JsonStorage(str(export_dir))) == expected
+
+    reimported = SQLiteStorage(str(tmp_path / 'reimported.db'), import_dir=str(export_dir))
+    try:
+        assert load_all(reimported) == expected
+    finally:
+        reimported.close()
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def storage(request, tmp_path):
+    if request.param == 'json':
+        write_json_file(tmp_path / GUIDES_FILE, {"guides": []})
+        yield JsonStorage(str(tmp_path))
+        return
+    storage = SQLiteStorage(str(tmp_path / 'bot.db'), import_dir=None)
+    yield storage
+    storage.close()
+
+
+def test_insert_section_positions_match_list_insert(storage):
+    storage.insert_guide({'id': 1, 'title': 'Гайд'})
+    expected = []
+    for index, title in [(0, 'b'), (0, 'a'), (5, 'd'), (2, 'c'), (-1, 'c2'), (-10, 'first'), (100, 'last')]:
+        section = {'title': title, 'content': ''}
+        storage.insert_section(1, index, section)
+        expected.insert(index, section)
+
+    assert storage.load_guides()['guides'][0]['sections'] == expected
+
+
+def test_sections_stay_with_their_guide(storage):
+    storage.insert_guide({'id': 1, 'title': 'Первый'})
+    storage.insert_guide({'id': 2, 'title': 'Второй'})
+    storage.insert_section(2, 0, {'title': '2a', 'content': ''})
+    storage.insert_section(1, 0, {'title': '1a', 'content': ''})
+    storage.insert_section(2, 0, {'title': '2b', 'content': ''})
+    storage.delete_guide(1)
+
+    guides = storage.load_guides()['guides']
+    assert [guide['id'] for guide in guides] == [2]
+    assert [section['title'] for section in guides[0]['sections']] == ['2b', '2a']
+
+
+def test_sqlite_readers_do_not_see_uncommitted_changes(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / 'bot.db'), import_dir=None)
+    storage.insert_guide({'id': 1, 'title': 'Гайд'})
+    for index, title in enumerate('abc'):
+        storage.insert_section(1, index, {'title': title, 'content': ''})
+    expected = storage.load_guides()
+    results = []
+    reader = threading.Thread(target=lambda: results.append(storage.load_guides()))
+
+    # Незавершенная транзакция другого потока (как сдвиг позиций в insert_section) откатывается
+    with pytest.raises(RuntimeError):
+        with storage.transaction():
+            storage.execute("UPDATE sections SET position = -(position + 1) WHERE guide_id = 1")
+            storage.execute("INSERT INTO sections (guide_id, position, title, content) VALUES (1, 0, 'x', '')")
+            reader.start()
+            reader.join(0.2)
+            assert reader.is_alive()
+            raise RuntimeError("откат")
+
+    reader.join(5)
+    storage.close()
+    assert results == [expected]
+
+
+def test_backend_without_all_operations_cannot_be_created():
+    class PartialStorage(StorageBackend):
+        def load_guides(self):
+            return {"guides": []}
+
+    with pytest.raises(TypeError):
+        PartialStorage()
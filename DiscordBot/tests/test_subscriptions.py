@@ -0,0 +1,79 @@
+"""Рассылка подписчикам: изменения подписок во время рассылки не отменяются при сохранении"""
+import types
+import asyncio
+
+import discord
+import pytest
+
+from cogs.subscriptions import Subscriptions
+from utils.storage import JsonStorage
+
+
+class FakeChannel:
+    def __init__(self, channel_id, on_send):
+        self.id = channel_id
+        self.on_send = on_send
+
+    async def send(self, embed=None):
+        await self.on_send()
+
+
+@pytest.fixture
+def cog(tmp_path):
+    bot = types.SimpleNamespace(storage=JsonStorage(str(tmp_path)))
+    cog = Subscriptions(bot)
+    cog.role_ids = {}
+    return cog
+
+
+def subscribe(cog, user_id):
+    subscription = {'topic': 'storm', 'user_id': user_id, 'dm_channel_id': None, 'failures': 0}
+    cog.subscribers['storm'][user_id] = subscription
+    cog.storage.save_subscriptions([subscription])
+    return subscription
+
+
+def stored_users(cog):
+    return sorted(item['user_id'] for item in cog.storage.load_subscriptions())
+
+
+def test_unsubscribe_during_fan_out_is_kept(cog):
+    subscribe(cog, 1)
+    subscribe(cog, 2)
+
+    async def unsubscribe_first():
+        # Пользователь 1 отписывается (!отписка), пока рассылка еще идет
+        if cog.subscribers['storm'].pop(1, None) is not None:
+            await asyncio.to_thread(cog.storage.delete_subscriptions, [('storm', 1)])
+
+    async def create_dm(user):
+        return FakeChannel(1000 + user.id, unsubscribe_first)
+
+    cog.bot.create_dm = create_dm
+    delivered = asyncio.run(cog.notify('storm_notification', discord.Embed(title="Шторм")))
+
+    assert delivered == 2
+    assert stored_users(cog) == [2]
+    # Запись оставшегося подписчика сохранена с полученным каналом личных сообщений
+    assert cog.storage.load_subscriptions()[0]['dm_channel_id'] == 1002
+
+
+def test_resubscribe_during_fan_out_keeps_new_subscription(cog):
+    subscribe(cog, 1)
+    renewed = []
+
+    async def resubscribe_then_fail():
+        # Пользователь отписывается и подписывается заново, а отправка по старой записи не удается
+        cog.subscribers['storm'].pop(1)
+        renewed.append(subscribe(cog, 1))
+        raise discord.Forbidden(types.SimpleNamespace(status=403, reason='Forbidden'), 'Cannot send messages to this user')
+
+    async def create_dm(user):
+        return FakeChannel(1001, resubscribe_then_fail)
+
+    cog.bot.create_dm = create_dm
+    asyncio.run(cog.notify('storm_notification', discord.Embed(title="Шторм")))
+
+    # Неудача старой записи не записывается поверх новой подписки
+    assert cog.subscribers['storm'][1] is renewed[0]
+    assert cog.storage.load_subscriptions() == [{'topic': 'storm', 'user_id': 1, 'dm_channel_id': None, 'failures': 0}]
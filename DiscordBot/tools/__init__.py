@@ -0,0 +1 @@
+# Пакет со вспомогательными инструментами для разработки и тестирования бота
@@ -0,0 +1,737 @@
+"""Локальная замена Discord API для сквозных и нагрузочных тестов бота без токена и сервера Discord
+
+Реализует ту часть REST API и шлюза (gateway), которой пользуется бот:
+- GET /users/@me, /oauth2/applications/@me, /gateway, /gateway/bot - вход бота;
+- GET /channels/{id}, POST/GET /channels/{id}/messages, GET/PATCH/DELETE
+  /channels/{id}/messages/{id}, POST /channels/{id}/typing - каналы и сообщения;
+- GET/PUT /applications/{id}/commands (и команды сервера) - синхронизация слэш-команд;
+- POST /users/@me/channels - личные сообщения, PUT/DELETE /guilds/{id}/members/{id}/roles/{id} - роли;
+- POST /webhooks/{id}/{token} - сообщения через вебхук (без токена бота и входа в шлюз);
+- шлюз: HELLO, HEARTBEAT/ACK, IDENTIFY -> READY + GUILD_CREATE, RESUME, PRESENCE_UPDATE.
+
+Ответы REST API содержат заголовки X-RateLimit-* с лимитами по маршрутам (как у Discord,
+5 сообщений за 5 секунд в канал) и общим лимитом 50 запросов в секунду; при превышении
+лимита возвращается 429 с retry_after (для общего лимита - с global: true). Вебхуки
+ограничиваются отдельно (5 сообщений за 2 секунды на вебхук) и в общий лимит бота не входят.
+
+Каждый вызов бота (запрос REST или сообщение шлюза) и каждое событие, отправленное боту,
+записываются в журнал с порядковым номером, временем и длительностью обработки. Тесты
+проверяют по журналу количество вызовов, их задержки и порядок.
+
+Бот подключается к замене через .env:
+    DISCORD_API_BASE=http://127.0.0.1:8090/api/v10
+    DISCORD_GATEWAY_URL=ws://127.0.0.1:8090/gateway
+
+Запуск (каналы и роль администратора должны совпадать с .env бота):
+    python tools/fake_discord.py --port 8090 --channel 111 --channel 222 --admin-role 333 --record calls.jsonl
+"""
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+import threading
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timezone
+
+from aiohttp import web, WSMsgType
+
+API_VERSION = 10
+
+# Интервал heartbeat, который шлюз сообщает клиенту (в миллисекундах)
+HEARTBEAT_INTERVAL = 41250
+
+# Лимиты маршрутов: (метод, шаблон маршрута) -> (запросов, окно в секундах)
+DEFAULT_RATE_LIMITS = {
+    ('POST', '/channels/{channel_id}/messages'): (5, 5.0),
+    ('PATCH', '/channels/{channel_id}/messages/{message_id}'): (5, 5.0),
+    ('PUT', '/applications/{application_id}/commands'): (2, 60.0),
+    ('POST', '/webhooks/{webhook_id}/{webhook_token}'): (5, 2.0),
+}
+# Лимит маршрутов, не указанных в DEFAULT_RATE_LIMITS
+DEFAULT_ROUTE_LIMIT = (50, 1.0)
+# Общий лимит бота на все маршруты (как у Discord); None отключает его
+GLOBAL_RATE_LIMIT = (50, 1.0)
+
+# Количество сообщений, которые хранит замена (для GET и PATCH)
+MESSAGE_HISTORY_SIZE = 1000
+
+# Названия кодов операций шлюза для журнала
+GATEWAY_OPCODES = {
+    0: 'DISPATCH', 1: 'HEARTBEAT', 2: 'IDENTIFY', 3: 'PRESENCE_UPDATE', 4: 'VOICE_STATE_UPDATE',
+    6: 'RESUME', 7: 'RECONNECT', 8: 'REQUEST_GUILD_MEMBERS', 9: 'INVALID_SESSION', 10: 'HELLO', 11: 'HEARTBEAT_ACK'
+}
+
+DISCORD_EPOCH = 1420070400000
+
+# Запись журнала вызовов
+# kind: 'http' - запрос REST API, 'gateway' - сообщение бота в шлюз, 'event' - событие шлюза, отправленное боту
+# method: HTTP метод или название операции шлюза (IDENTIFY, PRESENCE_UPDATE, ...) / события (READY, MESSAGE_CREATE, ...)
+# route: шаблон маршрута REST API (для шлюза None), path: фактический путь
+# started_at: время получения вызова (time.time()), duration: длительность обработки в секундах
+CallRecord = namedtuple('CallRecord', ['seq', 'kind', 'method', 'route', 'path', 'status', 'started_at', 'duration', 'payload'])
+
+
+def iso_now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class CallLog:
+    """Потокобезопасный журнал вызовов бота"""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.records = []
+        self.sequence = 0
+
+    def begin(self):
+        """Выдает порядковый номер вызову в момент его получения
+
+        Запись добавляется после обработки (когда известны статус и длительность),
+        а порядок записей определяется этим номером. Поэтому событие, отправленное
+        боту во время обработки запроса, в журнале оказывается после самого запроса.
+        """
+        with self.condition:
+            self.sequence += 1
+            return self.sequence
+
+    def record(self, kind, method, route, path, status, started_at, duration, payload=None, seq=None):
+        with self.condition:
+            if seq is None:
+                self.sequence += 1
+                seq = self.sequence
+            record = CallRecord(seq, kind, method, route, path, status, started_at, duration, payload)
+            self.records.append(record)
+            self.condition.notify_all()
+            return record
+
+    def calls(self, kind=None, method=None, route=None):
+        """Возвращает записи, отфильтрованные по виду, методу и маршруту, в порядке поступления"""
+        with self.condition:
+            records = sorted(self.records, key=lambda record: record.seq)
+        return [
+            record for record in records
+            if (kind is None or record.kind == kind)
+            and (method is None or record.method == method)
+            and (route is None or record.route == route)
+        ]
+
+    def count(self, **filters):
+        return len(self.calls(**filters))
+
+    def latencies(self, **filters):
+        """Длительности обработки вызовов (в секундах) в порядке поступления"""
+        return [record.duration for record in self.calls(**filters)]
+
+    def wait_for(self, count=1, timeout=10.0, **filters):
+        """Ждет, пока в журнале появится не менее count подходящих записей; возвращает их или None по таймауту"""
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while True:
+                records = [
+                    record for record in self.records
+                    if all(getattr(record, name) == value for name, value in filters.items() if value is not None)
+                ]
+                if len(records) >= count:
+                    return records
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.condition.wait(remaining)
+
+    def clear(self):
+        with self.condition:
+            self.records.clear()
+
+    def dump(self, path):
+        """Сохраняет журнал в файл (одна запись JSON на строку)"""
+        with self.condition:
+            records = list(self.records)
+        with open(path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record._asdict(), ensure_ascii=False, default=str) + '\n')
+        return len(records)
+
+
+class RateLimiter:
+    """Лимиты запросов с фиксированным окном по маршруту и его основному параметру (канал, приложение)"""
+
+    def __init__(self, limits=None, default=DEFAULT_ROUTE_LIMIT, global_limit=GLOBAL_RATE_LIMIT):
+        self.limits = dict(DEFAULT_RATE_LIMITS if limits is None else limits)
+        self.default = default
+        self.global_limit = global_limit
+        # ключ бакета -> [начало окна, количество запросов]
+        self.windows = {}
+        self.global_window = (0.0, 0)
+
+    def hit_global(self):
+        """Учитывает запрос в общем лимите; возвращает (разрешен, секунд до сброса)"""
+        if self.global_limit is None:
+            return True, 0.0
+        limit, window = self.global_limit
+        now = time.monotonic()
+        started, used = self.global_window
+        if now - started >= window:
+            started, used = now, 0
+        reset_after = max(0.0, window - (now - started))
+        if used >= limit:
+            return False, reset_after
+        self.global_window = (started, used + 1)
+        return True, reset_after
+
+    def hit(self, method, route, major):
+        """Учитывает запрос; возвращает (разрешен, лимит, осталось, секунд до сброса, имя бакета)"""
+        limit, window = self.limits.get((method, route), self.default)
+        bucket = hashlib.sha1(f"{method} {route}".encode('utf-8')).hexdigest()[:16]
+        key = (bucket, major)
+        now = time.monotonic()
+        started, used = self.windows.get(key, (now, 0))
+        if now - started >= window:
+            started, used = now, 0
+        reset_after = max(0.0, window - (now - started))
+        if used >= limit:
+            return False, limit, 0, reset_after, bucket
+        used += 1
+        self.windows[key] = (started, used)
+        return True, limit, limit - used, reset_after, bucket
+
+
+class FakeDiscordState:
+    """Пользователь бота, сервер с каналами и ролями, сообщения и слэш-команды"""
+
+    def __init__(self, guild_id=100000000000000001, channel_ids=(), admin_role_id=None):
+        self.sequence = 0
+        self.bot_user = {
+            'id': '100000000000000002', 'username': 'FakeBot', 'discriminator': '0',
+            'global_name': None, 'avatar': None, 'bot': True, 'flags': 0
+        }
+        self.tester = {
+            'id': '100000000000000003', 'username': 'Tester', 'discriminator': '0',
+            'global_name': 'Tester', 'avatar': None, 'bot': False, 'flags': 0
+        }
+        self.application = {
+            'id': self.bot_user['id'], 'name': 'FakeBot', 'description': '', 'icon': None,
+            'bot_public': False, 'bot_require_code_grant': False, 'verify_key': '0' * 64,
+            'owner': self.tester, 'flags': 0
+        }
+        self.guild_id = str(guild_id)
+        self.admin_role_id = str(admin_role_id) if admin_role_id else None
+        self.channels = OrderedDict()
+        for channel_id in channel_ids or [guild_id + 10]:
+            self.add_channel(channel_id)
+        # Каналы личных сообщений по ID канала и ID каналов по ID пользователя
+        self.dm_channels = {}
+        self.dm_channel_ids = {}
+        # Пользователи, закрывшие личные сообщения (отправка им возвращает 403)
+        self.closed_dm_user_ids = set()
+        # Выданные роли: ID пользователя -> множество ID ролей
+        self.member_roles = {}
+        # Вебхуки: ID вебхука -> (токен, ID канала)
+        self.webhooks = {}
+        self.messages = OrderedDict()
+        self.commands = {}
+
+    def snowflake(self):
+        self.sequence += 1
+        return str(((int(time.time() * 1000) - DISCORD_EPOCH) << 22) | (self.sequence & 0x3FFFFF))
+
+    def add_channel(self, channel_id, name=None):
+        channel_id = str(channel_id)
+        self.channels[channel_id] = {
+            'id': channel_id, 'type': 0, 'guild_id': self.guild_id, 'name': name or f"channel-{len(self.channels) + 1}",
+            'position': len(self.channels), 'permission_overwrites': [], 'nsfw': False,
+            'parent_id': None, 'topic': None, 'last_message_id': None, 'rate_limit_per_user': 0
+        }
+        return self.channels[channel_id]
+
+    def add_webhook(self, channel_id):
+        """Создает вебхук канала; возвращает (ID вебхука, токен)"""
+        webhook_id = self.snowflake()
+        token = hashlib.sha256(webhook_id.encode()).hexdigest()[:32]
+        self.webhooks[webhook_id] = (token, str(channel_id))
+        return webhook_id, token
+
+    def find_channel(self, channel_id):
+        """Текстовый канал сервера или канал личных сообщений по ID"""
+        return self.channels.get(channel_id) or self.dm_channels.get(channel_id)
+
+    def open_dm(self, user_id):
+        """Возвращает канал личных сообщений с пользователем, создавая его при первом обращении"""
+        user_id = str(user_id)
+        channel_id = self.dm_channel_ids.get(user_id)
+        if channel_id is not None:
+            return self.dm_channels[channel_id]
+        user = {'id': user_id, 'username': f"user-{user_id}", 'discriminator': '0', 'global_name': None, 'avatar': None, 'bot': False, 'flags': 0}
+        channel = {'id': self.snowflake(), 'type': 1, 'recipients': [user], 'last_message_id': None, 'flags': 0}
+        self.dm_channels[channel['id']] = channel
+        self.dm_channel_ids[user_id] = channel['id']
+        return channel
+
+    def roles(self):
+        roles = [{
+            'id': self.guild_id, 'name': '@everyone', 'color': 0, 'hoist': False, 'position': 0,
+            'permissions': '2248473465835073', 'managed': False, 'mentionable': False, 'flags': 0
+        }]
+        if self.admin_role_id:
+            roles.append({
+                'id': self.admin_role_id, 'name': 'Admin', 'color': 0, 'hoist': False, 'position': 1,
+                'permissions': '8', 'managed': False, 'mentionable': False, 'flags': 0
+            })
+        return roles
+
+    def member(self, user, roles=()):
+        return {'user': user, 'roles': list(roles), 'joined_at': iso_now(), 'deaf': False, 'mute': False, 'flags': 0}
+
+    def guild(self):
+        admin_roles = [self.admin_role_id] if self.admin_role_id else []
+        members = [self.member(self.bot_user), self.member(self.tester, admin_roles)]
+        return {
+            'id': self.guild_id, 'name': 'Fake Guild', 'icon': None, 'owner_id': self.tester['id'],
+            'roles': self.roles(), 'emojis': [], 'stickers': [], 'features': [],
+            'member_count': len(members), 'members': members, 'channels': list(self.channels.values()),
+            'threads': [], 'presences': [], 'voice_states': [], 'stage_instances': [],
+            'guild_scheduled_events': [], 'soundboard_sounds': [], 'large': False, 'unavailable': False,
+            'joined_at': iso_now(), 'premium_tier': 0, 'verification_level': 0,
+            'default_message_notifications': 0, 'explicit_content_filter': 0, 'mfa_level': 0,
+            'nsfw_level': 0, 'preferred_locale': 'ru', 'system_channel_flags': 0
+        }
+
+    def create_message(self, channel_id, data, author=None, roles=None):
+        message_id = self.snowflake()
+        channel = self.find_channel(channel_id)
+        message = {
+            'id': message_id, 'channel_id': channel_id,
+            'author': author or self.bot_user, 'content': data.get('content') or '',
+            'embeds': data.get('embeds') or ([data['embed']] if data.get('embed') else []),
+            'components': data.get('components') or [], 'attachments': [], 'mentions': [],
+            'mention_roles': [], 'mention_everyone': False, 'pinned': False, 'tts': False,
+            'timestamp': iso_now(), 'edited_timestamp': None, 'type': 0, 'flags': 0
+        }
+        if channel.get('guild_id'):
+            # Как у Discord: у сообщений в личных сообщениях поля guild_id нет
+            message['guild_id'] = channel['guild_id']
+        if roles is not None and channel.get('guild_id'):
+            message['member'] = {'roles': list(roles), 'joined_at': iso_now(), 'deaf': False, 'mute': False, 'flags': 0}
+        self.messages[message_id] = message
+        while len(self.messages) > MESSAGE_HISTORY_SIZE:
+            self.messages.popitem(last=False)
+        channel['last_message_id'] = message_id
+        return message
+
+
+class GatewaySession:
+    """Подключение бота к шлюзу"""
+
+    def __init__(self, ws, session_id):
+        self.ws = ws
+        self.session_id = session_id
+        self.sequence = 0
+
+
+def json_response(data, status=200):
+    # discord.py разбирает тело как JSON только при Content-Type ровно "application/json" (без charset)
+    return web.Response(body=json.dumps(data, ensure_ascii=False).encode('utf-8'), status=status, content_type='application/json')
+
+
+def discord_error(status, message, code=0):
+    return json_response({'message': message, 'code': code}, status=status)
+
+
+class FakeDiscordServer:
+    """REST API и шлюз Discord в фоновом потоке с собственным циклом событий"""
+
+    def __init__(self, host='127.0.0.1', port=8090, channel_ids=(), admin_role_id=None,
+                 latency=0.0, rate_limits=None, token=None):
+        self.host = host
+        self.port = port
+        self.state = FakeDiscordState(channel_ids=channel_ids, admin_role_id=admin_role_id)
+        self.log = CallLog()
+        self.rate_limiter = RateLimiter(rate_limits)
+        # Искусственная задержка ответа REST API (в секундах), имитирующая сеть до Discord
+        self.latency = latency
+        # Если задан, запросы с другим токеном получают 401
+        self.token = token
+        self.sessions = []
+        # Последний статус бота из PRESENCE_UPDATE
+        self.presence = None
+        self.loop = None
+        self.runner = None
+        self.thread = None
+        self.started = threading.Event()
+        self.error = None
+
+    @property
+    def api_base(self):
+        return f"http://{self.host}:{self.port}/api/v{API_VERSION}"
+
+    @property
+    def gateway_url(self):
+        return f"ws://{self.host}:{self.port}/gateway"
+
+    def build_app(self):
+        app = web.Application(middlewares=[self.record_middleware])
+        prefix = f"/api/v{API_VERSION}"
+        app.add_routes([
+            web.get(prefix + '/users/@me', self.get_current_user),
+            web.get(prefix + '/oauth2/applications/@me', self.get_application),
+            web.get(prefix + '/applications/@me', self.get_application),
+            web.get(prefix + '/gateway', self.get_gateway),
+            web.get(prefix + '/gateway/bot', self.get_gateway),
+            web.get(prefix + '/channels/{channel_id}', self.get_channel),
+            web.get(prefix + '/channels/{channel_id}/messages', self.get_messages),
+            web.post(prefix + '/channels/{channel_id}/messages', self.create_message),
+            web.get(prefix + '/channels/{channel_id}/messages/{message_id}', self.get_message),
+            web.patch(prefix + '/channels/{channel_id}/messages/{message_id}', self.edit_message),
+            web.delete(prefix + '/channels/{channel_id}/messages/{message_id}', self.delete_message),
+            web.post(prefix + '/channels/{channel_id}/typing', self.trigger_typing),
+            web.get(prefix + '/applications/{application_id}/commands', self.get_commands),
+            web.put(prefix + '/applications/{application_id}/commands', self.put_commands),
+            web.get(prefix + '/applications/{application_id}/guilds/{guild_id}/commands', self.get_commands),
+            web.put(prefix + '/applications/{application_id}/guilds/{guild_id}/commands', self.put_commands),
+            web.post(prefix + '/users/@me/channels', self.create_dm),
+            web.put(prefix + '/guilds/{guild_id}/members/{user_id}/roles/{role_id}', self.add_member_role),
+            web.delete(prefix + '/guilds/{guild_id}/members/{user_id}/roles/{role_id}', self.remove_member_role),
+            web.post(prefix + '/webhooks/{webhook_id}/{webhook_token}', self.execute_webhook),
+            web.get('/gateway', self.gateway),
+            web.route('*', prefix + '/{tail:.*}', self.not_supported),
+        ])
+        return app
+
+    # Запуск и остановка
+
+    def start(self):
+        """Запускает сервер в фоновом потоке и ждет, пока он начнет принимать соединения"""
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        if not self.started.wait(10):
+            raise RuntimeError("Замена Discord API не запустилась")
+        if self.error is not None:
+            raise self.error
+        return self
+
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.runner = web.AppRunner(self.build_app(), handle_signals=False)
+        try:
+            self.loop.run_until_complete(self.runner.setup())
+            site = web.TCPSite(self.runner, self.host, self.port, reuse_address=True)
+            self.loop.run_until_complete(site.start())
+        except Exception as e:
+            # Например, порт занят: ошибка передается в start()
+            self.error = e
+            self.started.set()
+            self.loop.run_until_complete(self.runner.cleanup())
+            self.loop.close()
+            return
+        self.started.set()
+        self.loop.run_forever()
+        self.loop.run_until_complete(self.runner.cleanup())
+        self.loop.close()
+
+    def stop(self):
+        """Закрывает подключения к шлюзу и останавливает сервер"""
+        if self.loop is None or self.error is not None:
+            return
+        asyncio.run_coroutine_threadsafe(self.close_sessions(), self.loop).result(10)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(10)
+
+    async def close_sessions(self, code=1000):
+        for session in list(self.sessions):
+            await session.ws.close(code=code)
+
+    # Управление из тестов (вызываются из любого потока)
+
+    def inject_message(self, channel_id, content, admin=True):
+        """Отправляет боту MESSAGE_CREATE от тестового пользователя (например, префиксную команду)"""
+        async def dispatch():
+            roles = [self.state.admin_role_id] if admin and self.state.admin_role_id else []
+            message = self.state.create_message(str(channel_id), {'content': content}, self.state.tester, roles)
+            await self.broadcast('MESSAGE_CREATE', message)
+            return message
+        return asyncio.run_coroutine_threadsafe(dispatch(), self.loop).result(10)
+
+    def add_webhook(self, channel_id):
+        """Создает вебхук канала; возвращает его адрес (для NOTIFICATION_WEBHOOK_URL или маршрута)"""
+        webhook_id, token = self.state.add_webhook(channel_id)
+        return f"{self.api_base}/webhooks/{webhook_id}/{token}"
+
+    def close_dms(self, *user_ids):
+        """Закрывает личные сообщения пользователей: отправка им будет возвращать 403"""
+        self.state.closed_dm_user_ids.update(str(user_id) for user_id in user_ids)
+
+    def request_reconnect(self):
+        """Просит бота переподключиться к шлюзу (операция RECONNECT), как при обслуживании шлюза Discord"""
+        async def reconnect():
+            for session in list(self.sessions):
+                await self.send_gateway(session, {'op': 7, 'd': None}, 'RECONNECT')
+        asyncio.run_coroutine_threadsafe(reconnect(), self.loop).result(10)
+
+    # REST API
+
+    @web.middleware
+    async def record_middleware(self, request, handler):
+        started_at = time.time()
+        started = time.perf_counter()
+        resource = request.match_info.route.resource
+        route = resource.canonical if resource is not None else request.path
+        route = route.replace(f"/api/v{API_VERSION}", '', 1)
+        if route == '/{tail}':
+            route = request.path.replace(f"/api/v{API_VERSION}", '', 1)
+        payload = None
+        if request.can_read_body:
+            try:
+                payload = await request.json()
+            except ValueError:
+                payload = None
+
+        if route == '/gateway':
+            # Подключение к шлюзу записывается по сообщениям, а не как запрос
+            return await handler(request)
+
+        seq = self.log.begin()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        headers = {}
+        # Вебхук авторизуется токеном в адресе и не входит в общий лимит бота
+        webhook = 'webhook_id' in request.match_info
+        if not webhook and self.token is not None and request.headers.get('Authorization') != f"Bot {self.token}":
+            response = discord_error(401, '401: Unauthorized')
+        else:
+            major = (request.match_info.get('channel_id') or request.match_info.get('application_id')
+                     or request.match_info.get('webhook_id'))
+            global_allowed, global_reset_after = (True, 0.0) if webhook else self.rate_limiter.hit_global()
+            allowed, limit, remaining, reset_after, bucket = (
+                self.rate_limiter.hit(request.method, route, major) if global_allowed else (False, 0, 0, 0.0, None)
+            )
+            headers = {
+                'X-RateLimit-Limit': str(limit),
+                'X-RateLimit-Remaining': str(remaining),
+                'X-RateLimit-Reset': f"{time.time() + reset_after:.3f}",
+                'X-RateLimit-Reset-After': f"{reset_after:.3f}",
+                'X-RateLimit-Bucket': bucket
+            } if global_allowed else {'X-RateLimit-Global': 'true'}
+            if not global_allowed:
+                response = json_response(
+                    {'message': 'You are being rate limited.', 'retry_after': round(global_reset_after, 3), 'global': True},
+                    status=429
+                )
+                headers['Retry-After'] = f"{global_reset_after:.3f}"
+                headers['X-RateLimit-Scope'] = 'global'
+            elif allowed:
+                response = await handler(request)
+            else:
+                response = json_response(
+                    {'message': 'You are being rate limited.', 'retry_after': round(reset_after, 3), 'global': False},
+                    status=429
+                )
+                headers['Retry-After'] = f"{reset_after:.3f}"
+                headers['X-RateLimit-Scope'] = 'user'
+        response.headers.update(headers)
+
+        self.log.record('http', request.method, route, request.path, response.status,
+                        started_at, time.perf_counter() - started, payload, seq)
+        return response
+
+    async def get_current_user(self, request):
+        return json_response(self.state.bot_user)
+
+    async def get_application(self, request):
+        return json_response(self.state.application)
+
+    async def get_gateway(self, request):
+        return json_response({
+            'url': self.gateway_url, 'shards': 1,
+            'session_start_limit': {'total': 1000, 'remaining': 1000, 'reset_after': 0, 'max_concurrency': 1}
+        })
+
+    def find_channel(self, request):
+        return self.state.find_channel(request.match_info['channel_id'])
+
+    async def get_channel(self, request):
+        channel = self.find_channel(request)
+        if channel is None:
+            return discord_error(404, 'Unknown Channel', 10003)
+        return json_response(channel)
+
+    async def get_messages(self, request):
+        channel = self.find_channel(request)
+        if channel is None:
+            return discord_error(404, 'Unknown Channel', 10003)
+        limit = int(request.query.get('limit', 50))
+        messages = [message for message in reversed(self.state.messages.values()) if message['channel_id'] == channel['id']]
+        return json_response(messages[:limit])
+
+    async def create_message(self, request):
+        channel = self.find_channel(request)
+        if channel is None:
+            return discord_error(404, 'Unknown Channel', 10003)
+        if channel['type'] == 1 and channel['recipients'][0]['id'] in self.state.closed_dm_user_ids:
+            return discord_error(403, 'Cannot send messages to this user', 50007)
+        data = await request.json() if request.can_read_body else {}
+        message = self.state.create_message(channel['id'], data)
+        await self.broadcast('MESSAGE_CREATE', message)
+        return json_response(message)
+
+    async def get_message(self, request):
+        message = self.state.messages.get(request.match_info['message_id'])
+        if message is None or message['channel_id'] != request.match_info['channel_id']:
+            return discord_error(404, 'Unknown Message', 10008)
+        return json_response(message)
+
+    async def edit_message(self, request):
+        message = self.state.messages.get(request.match_info['message_id'])
+        if message is None or message['channel_id'] != request.match_info['channel_id']:
+            return discord_error(404, 'Unknown Message', 10008)
+        data = await request.json() if request.can_read_body else {}
+        for field in ('content', 'embeds', 'components', 'flags'):
+            if field in data:
+                message[field] = data[field] if data[field] is not None else ([] if field != 'content' else '')
+        message['edited_timestamp'] = iso_now()
+        await self.broadcast('MESSAGE_UPDATE', message)
+        return json_response(message)
+
+    async def delete_message(self, request):
+        message = self.state.messages.pop(request.match_info['message_id'], None)
+        if message is None:
+            return discord_error(404, 'Unknown Message', 10008)
+        await self.broadcast('MESSAGE_DELETE', {'id': message['id'], 'channel_id': message['channel_id'], 'guild_id': self.state.guild_id})
+        return web.Response(status=204)
+
+    async def trigger_typing(self, request):
+        return web.Response(status=204)
+
+    async def get_commands(self, request):
+        scope = request.match_info.get('guild_id', 'global')
+        return json_response(self.state.commands.get(scope, []))
+
+    async def put_commands(self, request):
+        scope = request.match_info.get('guild_id', 'global')
+        commands = []
+        for command in await request.json():
+            command = dict(command, id=self.state.snowflake(), application_id=self.state.application['id'], version=self.state.snowflake())
+            if scope != 'global':
+                command['guild_id'] = scope
+            commands.append(command)
+        self.state.commands[scope] = commands
+        return json_response(commands)
+
+    async def create_dm(self, request):
+        data = await request.json()
+        return json_response(self.state.open_dm(data['recipient_id']))
+
+    async def add_member_role(self, request):
+        self.state.member_roles.setdefault(request.match_info['user_id'], set()).add(request.match_info['role_id'])
+        return web.Response(status=204)
+
+    async def remove_member_role(self, request):
+        self.state.member_roles.get(request.match_info['user_id'], set()).discard(request.match_info['role_id'])
+        return web.Response(status=204)
+
+    async def execute_webhook(self, request):
+        webhook_id = request.match_info['webhook_id']
+        token, channel_id = self.state.webhooks.get(webhook_id, (None, None))
+        if token is None or request.match_info['webhook_token'] != token:
+            return discord_error(404, 'Unknown Webhook', 10015)
+        data = await request.json() if request.can_read_body else {}
+        author = {'id': webhook_id, 'username': 'Webhook', 'discriminator': '0000', 'avatar': None, 'bot': True, 'flags': 0}
+        message = self.state.create_message(channel_id, data, author)
+        message['webhook_id'] = webhook_id
+        await self.broadcast('MESSAGE_CREATE', message)
+        if request.query.get('wait', '').lower() != 'true':
+            return web.Response(status=204)
+        return json_response(message)
+
+    async def not_supported(self, request):
+        # Вызов записывается в журнал, чтобы тест увидел обращение к неподдерживаемому маршруту
+        return discord_error(404, f"404: Not Found ({request.method} {request.path} не поддерживается заменой)")
+
+    # Шлюз
+
+    async def gateway(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        session = GatewaySession(ws, self.state.snowflake())
+        self.sessions.append(session)
+        try:
+            await self.send_gateway(session, {'op': 10, 'd': {'heartbeat_interval': HEARTBEAT_INTERVAL}}, 'HELLO')
+            async for message in ws:
+                if message.type != WSMsgType.TEXT:
+                    continue
+                seq = self.log.begin()
+                started_at = time.time()
+                started = time.perf_counter()
+                data = json.loads(message.data)
+                op = data.get('op')
+                await self.handle_gateway(session, op, data.get('d'))
+                payload = data.get('d')
+                if isinstance(payload, dict) and 'token' in payload:
+                    payload = dict(payload, token='***')
+                self.log.record('gateway', GATEWAY_OPCODES.get(op, str(op)), None, '/gateway', None,
+                                started_at, time.perf_counter() - started, payload, seq)
+        finally:
+            self.sessions.remove(session)
+        return ws
+
+    async def handle_gateway(self, session, op, data):
+        if op == 1:
+            await self.send_gateway(session, {'op': 11}, 'HEARTBEAT_ACK')
+        elif op == 2:
+            await self.dispatch(session, 'READY', {
+                'v': API_VERSION, 'user': self.state.bot_user,
+                'guilds': [{'id': self.state.guild_id, 'unavailable': True}],
+                'session_id': session.session_id, 'resume_gateway_url': self.gateway_url,
+                'application': {'id': self.state.application['id'], 'flags': 0}
+            })
+            await self.dispatch(session, 'GUILD_CREATE', self.state.guild())
+        elif op == 6:
+            session.session_id = data.get('session_id') or session.session_id
+            session.sequence = data.get('seq') or 0
+            await self.dispatch(session, 'RESUMED', {})
+        elif op == 3:
+            self.presence = data
+
+    async def send_gateway(self, session, payload, name):
+        started_at = time.time()
+        await session.ws.send_str(json.dumps(payload, ensure_ascii=False))
+        if name not in ('HEARTBEAT_ACK',):
+            self.log.record('event', name, None, '/gateway', None, started_at, 0.0, payload.get('d'))
+
+    async def dispatch(self, session, event, data):
+        session.sequence += 1
+        await self.send_gateway(session, {'op': 0, 't': event, 's': session.sequence, 'd': data}, event)
+
+    async def broadcast(self, event, data):
+        for session in list(self.sessions):
+            await self.dispatch(session, event, data)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Локальная замена Discord API для тестов бота")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--channel', action='append', type=int, default=[], help="ID текстового канала (можно несколько)")
+    parser.add_argument('--admin-role', type=int, default=None, help="ID роли администратора тестового пользователя")
+    parser.add_argument('--latency', type=float, default=0.0, help="Задержка ответа REST API в секундах")
+    parser.add_argument('--record', default=None, help="Файл для сохранения журнала вызовов (JSON Lines)")
+    args = parser.parse_args(argv)
+
+    server = FakeDiscordServer(args.host, args.port, args.channel, args.admin_role, args.latency).start()
+    print(f"DISCORD_API_BASE={server.api_base}")
+    print(f"DISCORD_GATEWAY_URL={server.gateway_url}")
+    print(f"Каналы: {', '.join(server.state.channels)}")
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        if args.record:
+            count = server.log.dump(args.record)
+            print(f"Записано вызовов: {count} ({args.record})")
+
+
+if __name__ == "__main__":
+    main()
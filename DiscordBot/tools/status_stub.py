@@ -0,0 +1,315 @@
+"""Локальная замена API статуса StatusMod для проверки бота без игрового сервера
+
+Реализует тот же протокол, что и мод:
+- GET /status/ возвращает полный статус сервера, заголовок ETag и поле version;
+- запрос с If-None-Match, совпадающим с текущим ETag, получает ответ 304 без тела;
+- запрос с параметром since=<версия> получает только добавленных и ушедших игроков
+  (если версия еще хранится в истории), иначе полный статус;
+- GET /status/stream открывает потоковый канал (Server-Sent Events) со снимками статуса
+  (event: status) и уведомлениями (event: notification). Клиент, передавший Last-Event-ID,
+  получает только пропущенные события, иначе начинает с полного снимка статуса.
+
+Запуск в режиме симулятора (игроки случайно заходят и выходят):
+    python tools/status_stub.py --port 8080 --simulate
+"""
+import json
+import time
+import random
+import argparse
+import threading
+import http.server
+from collections import OrderedDict, deque
+from urllib.parse import urlparse, parse_qs
+
+# Количество версий, для которых хранится список игроков (для дельт)
+VERSION_HISTORY_SIZE = 64
+
+# Количество последних событий потокового канала, доступных для возобновления
+STREAM_HISTORY_SIZE = 256
+
+# Интервал keepalive-комментариев в потоке (в секундах)
+STREAM_KEEPALIVE_INTERVAL = 30.0
+
+
+class StatusState:
+    """Состояние симулируемого сервера с версионированием"""
+
+    def __init__(self, players=None, max_players=32):
+        self.lock = threading.Lock()
+        # Эпоха отличает версии разных запусков, чтобы после перезапуска не было ложных 304
+        self.epoch = str(int(time.time() * 1000))
+        self.counter = 0
+        self.players = list(players or [])
+        self.max_players = max_players
+        self.temporal_storm = False
+        self.pretty_date = "1 января 1 года, 12:00"
+        self.history = OrderedDict()
+        # События потокового канала: (id, имя события, JSON)
+        self.condition = threading.Condition(self.lock)
+        self.sequence = 0
+        self.events = deque(maxlen=STREAM_HISTORY_SIZE)
+        self.bump()
+
+    @property
+    def version(self):
+        return f"{self.epoch}-{self.counter}"
+
+    @property
+    def etag(self):
+        return f'"{self.version}"'
+
+    def bump(self):
+        """Увеличивает версию и запоминает список игроков для этой версии"""
+        self.counter += 1
+        self.history[self.version] = list(self.players)
+        while len(self.history) > VERSION_HISTORY_SIZE:
+            self.history.popitem(last=False)
+
+    def update(self, players=None, temporal_storm=None, pretty_date=None, max_players=None):
+        """Изменяет состояние сервера; версия меняется только при реальных изменениях"""
+        with self.lock:
+            changed = False
+            if players is not None and list(players) != self.players:
+                self.players = list(players)
+                changed = True
+            if temporal_storm is not None and temporal_storm != self.temporal_storm:
+                self.temporal_storm = temporal_storm
+                changed = True
+            if pretty_date is not None and pretty_date != self.pretty_date:
+                self.pretty_date = pretty_date
+                changed = True
+            if max_players is not None and max_players != self.max_players:
+                self.max_players = max_players
+                changed = True
+            if changed:
+                self.bump()
+                self.publish_locked("status", self.snapshot_locked())
+            return changed
+
+    def snapshot_locked(self):
+        """Полный снимок статуса (вызывается под блокировкой)"""
+        return {
+            "online": True,
+            "playerCount": len(self.players),
+            "maxPlayers": self.max_players,
+            "players": list(self.players),
+            "prettyDate": self.pretty_date,
+            "temporalStorm": "Активен" if self.temporal_storm else "Неактивен",
+            "version": self.version
+        }
+
+    def publish_locked(self, name, data):
+        """Добавляет событие в историю потока и будит подключенных клиентов"""
+        self.sequence += 1
+        event_id = f"{self.epoch}-{self.sequence}"
+        self.events.append((event_id, name, json.dumps(data, ensure_ascii=False)))
+        self.condition.notify_all()
+        return event_id
+
+    def publish_notification(self, notification_type, data):
+        """Публикует уведомление в потоковый канал (в формате элементов notification_batch)"""
+        with self.lock:
+            return self.publish_locked("notification", {
+                "type": notification_type,
+                "data": data,
+                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+            })
+
+    def events_after(self, last_event_id):
+        """Возвращает события после указанного ID или None, если ID уже вытеснен из истории"""
+        ids = [event[0] for event in self.events]
+        if last_event_id not in ids:
+            return None
+        return list(self.events)[ids.index(last_event_id) + 1:]
+
+    def payload(self, since=None):
+        """Формирует ответ: дельту относительно since или полный статус"""
+        with self.lock:
+            data = self.snapshot_locked()
+            base_players = self.history.get(since) if since else None
+            if base_players is None:
+                return data
+
+            del data["players"]
+            current = set(self.players)
+            base = set(base_players)
+            data["delta"] = True
+            data["baseVersion"] = since
+            data["added"] = [player for player in self.players if player not in base]
+            data["removed"] = [player for player in base_players if player not in current]
+            return data
+
+
+class StatusStubHandler(http.server.BaseHTTPRequestHandler):
+    """Обработчик запросов к симулируемому API статуса"""
+
+    def do_GET(self):
+        state = self.server.state
+        url = urlparse(self.path)
+        if not url.path.startswith("/status"):
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        if url.path.rstrip('/').endswith('/stream'):
+            self.serve_stream(state)
+            return
+
+        self.server.request_count += 1
+        if self.headers.get('If-None-Match') == state.etag:
+            self.server.not_modified_count += 1
+            self.send_response(304)
+            self.send_header('ETag', state.etag)
+            self.end_headers()
+            return
+
+        since = parse_qs(url.query).get('since', [None])[0]
+        body = json.dumps(state.payload(since), ensure_ascii=False).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', state.etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def write_frame(self, event_id, name, data):
+        frame = ""
+        if event_id:
+            frame += f"id: {event_id}\n"
+        frame += f"event: {name}\ndata: {data}\n\n"
+        self.wfile.write(frame.encode('utf-8'))
+        self.wfile.flush()
+
+    def serve_stream(self, state):
+        """Держит соединение открытым и отправляет события по мере появления"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.server.stream_connections += 1
+
+        try:
+            last_id = self.headers.get('Last-Event-ID')
+            with state.lock:
+                pending = state.events_after(last_id) if last_id else None
+                if pending is None:
+                    # Новый клиент или история уже вытеснена: начинаем с полного снимка статуса
+                    last_id = state.events[-1][0] if state.events else None
+                    snapshot = json.dumps(state.snapshot_locked(), ensure_ascii=False)
+                    pending = [(last_id, "status", snapshot)]
+
+            while not self.server.stopping:
+                for event_id, name, data in pending:
+                    self.write_frame(event_id, name, data)
+                last_id = pending[-1][0] if pending else last_id
+
+                with state.lock:
+                    state.condition.wait_for(
+                        lambda: self.server.stopping or (state.events and state.events[-1][0] != last_id),
+                        timeout=self.server.keepalive_interval
+                    )
+                    pending = state.events_after(last_id) if last_id else list(state.events)
+                    if pending is None:
+                        pending = list(state.events)
+
+                if not pending:
+                    self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StatusStubServer(http.server.ThreadingHTTPServer):
+    """HTTP сервер, имитирующий API статуса StatusMod"""
+
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=8080, state=None, handler=StatusStubHandler):
+        super().__init__((host, port), handler)
+        self.state = state or StatusState()
+        self.request_count = 0
+        self.not_modified_count = 0
+        self.stream_connections = 0
+        self.keepalive_interval = STREAM_KEEPALIVE_INTERVAL
+        self.stopping = False
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/status/"
+
+    def start(self):
+        """Запускает сервер в фоновом потоке"""
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Останавливает сервер"""
+        with self.state.lock:
+            self.stopping = True
+            self.state.condition.notify_all()
+        self.shutdown()
+        self.server_close()
+
+
+def simulate(state, interval):
+    """Случайно добавляет и удаляет игроков, имитируя активность на сервере"""
+    names = ["Alice", "Bob", "Carol", "Dave", "Eve", "Frank", "Grace", "Heidi"]
+    while True:
+        time.sleep(interval)
+        players = list(state.players)
+        if players and random.random() < 0.5:
+            players.remove(random.choice(players))
+        else:
+            candidates = [name for name in names if name not in players]
+            if candidates:
+                players.append(random.choice(candidates))
+        state.update(players=players)
+        print(f"[{state.version}] Игроки онлайн: {', '.join(players) or 'нет'}")
+
+        # Изредка меняем состояние шторма и публикуем уведомление в потоковый канал
+        if random.random() < 0.1:
+            storm_active = not state.temporal_storm
+            state.update(temporal_storm=storm_active)
+            state.publish_notification("шторме", {
+                "type": "storm_notification",
+                "is_active": storm_active,
+                "is_warning": False,
+                "message": "",
+                "time": state.pretty_date
+            })
+            print(f"Шторм {'начался' if storm_active else 'закончился'}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Локальная замена API статуса StatusMod")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--players', default='', help="Список игроков через запятую")
+    parser.add_argument('--simulate', action='store_true', help="Имитировать вход и выход игроков")
+    parser.add_argument('--interval', type=float, default=30.0, help="Интервал симуляции в секундах")
+    args = parser.parse_args(argv)
+
+    players = [name.strip() for name in args.players.split(',') if name.strip()]
+    server = StatusStubServer(args.host, args.port, StatusState(players))
+    print(f"API статуса доступно по адресу {server.url}")
+    server.start()
+    try:
+        if args.simulate:
+            simulate(server.state, args.interval)
+        else:
+            server.thread.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Перенос данных бота между JSON файлами и базой SQLite
+
+Импорт JSON файлов каталога data/ в базу (по умолчанию база из SQLITE_PATH):
+    python -m tools.storage_migrate import [--source data] [--db data/bot.db] [--force]
+
+Выгрузка базы обратно в JSON файлы (формат каталога data/):
+    python -m tools.storage_migrate export --target backup/ [--db data/bot.db]
+
+Без --force импорт выполняется только в пустую базу. С --force данные в базе
+заменяются содержимым JSON файлов (история статуса сохраняется).
+Запускать из каталога DiscordBot, пока бот остановлен.
+"""
+import sys
+import argparse
+from utils.storage import DATA_DIR, SQLiteStorage, resolve_sqlite_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Перенос данных бота между JSON файлами и SQLite")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help="Импортировать JSON файлы в базу SQLite")
+    import_parser.add_argument('--source', default=DATA_DIR, help="Каталог с JSON файлами")
+    import_parser.add_argument('--db', default=None, help="Путь к базе SQLite")
+    import_parser.add_argument('--force', action='store_true', help="Заменить данные в непустой базе")
+
+    export_parser = subparsers.add_parser('export', help="Выгрузить базу SQLite в JSON файлы")
+    export_parser.add_argument('--target', required=True, help="Каталог для JSON файлов")
+    export_parser.add_argument('--db', default=None, help="Путь к базе SQLite")
+
+    args = parser.parse_args(argv)
+    # Автоматический импорт при открытии отключен, чтобы импорт выполнялся только явно
+    storage = SQLiteStorage(resolve_sqlite_path(args.db), import_dir=None)
+    try:
+        if args.command == 'import':
+            if storage.import_json(args.source, force=args.force):
+                print(f"Данные из {args.source} импортированы в {storage.db_path}")
+            else:
+                print(f"База {storage.db_path} уже содержит данные. Используйте --force для замены.")
+        else:
+            storage.export_json(args.target)
+            print(f"Данные из {storage.db_path} выгружены в {args.target}")
+    finally:
+        storage.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2 @@
+# Пакет со вспомогательными модулями бота
+# Модули не являются cogs и используются несколькими cogs совместно
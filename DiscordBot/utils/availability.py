@@ -0,0 +1,142 @@
+import re
+import time
+from bisect import bisect_right
+
+# Единицы периода отчета о доступности (в секундах)
+PERIOD_UNITS = {'m': 60, 'м': 60, 'h': 3600, 'ч': 3600, 'd': 86400, 'д': 86400}
+
+
+def parse_period(value):
+    """Разбирает период вида 30m, 12h, 7d (также м, ч, д); возвращает секунды или None"""
+    match = re.fullmatch(r'(\d+)([mhdмчд])', value.strip().lower())
+    if not match or int(match.group(1)) <= 0:
+        return None
+    return int(match.group(1)) * PERIOD_UNITS[match.group(2)]
+
+
+def format_duration(seconds):
+    """Форматирует длительность: 2 дн. 3 ч., 3 ч. 15 мин., 15 мин., меньше минуты"""
+    minutes = int(seconds) // 60
+    days, minutes = divmod(minutes, 1440)
+    hours, minutes = divmod(minutes, 60)
+    if days:
+        return f"{days} дн. {hours} ч."
+    if hours:
+        return f"{hours} ч. {minutes} мин."
+    return f"{minutes} мин." if minutes else "меньше минуты"
+
+
+class OutageDetector:
+    """Определение доступности сервера с гистерезисом
+
+    Сервер считается недоступным только после down_after неудачных опросов подряд,
+    а снова доступным - после up_after успешных подряд, поэтому единичный таймаут
+    не переключает состояние. online: True, False или None (еще не определено).
+    """
+
+    def __init__(self, down_after=3, up_after=2, online=None):
+        self.down_after = max(1, down_after)
+        self.up_after = max(1, up_after)
+        self.online = online
+        self.failures = 0
+        self.successes = 0
+
+    def observe(self, ok):
+        """Учитывает результат опроса; возвращает True, если состояние изменилось"""
+        if ok:
+            self.successes += 1
+            self.failures = 0
+            if self.online is not True and self.successes >= self.up_after:
+                self.online = True
+                return True
+        else:
+            self.failures += 1
+            self.successes = 0
+            if self.online is not False and self.failures >= self.down_after:
+                self.online = False
+                return True
+        return False
+
+
+class AvailabilityLog:
+    """Интервалы доступности сервера для отчетов о доступности (SLA)
+
+    Хранит только переходы состояния (время, online), где online: True - доступен,
+    False - недоступен, None - не отслеживается (бот остановлен, техобслуживание).
+    Для каждого перехода запоминаются накопленные суммы времени доступности
+    и недоступности с начала журнала и число отказов, поэтому доступность за любой
+    период считается двоичным поиском границ, без просмотра всех интервалов.
+    Добавление перехода дополняет суммы за O(1).
+    """
+
+    def __init__(self, transitions=()):
+        self.times = []
+        self.states = []
+        # Накопленные секунды доступности и недоступности к моменту каждого перехода
+        self.up_totals = []
+        self.down_totals = []
+        # Количество переходов в состояние "недоступен" до каждого перехода включительно
+        self.outage_counts = []
+        for at, online in transitions:
+            self.append(at, online)
+
+    @property
+    def current(self):
+        """Последнее записанное состояние (None, если журнал пуст)"""
+        return self.states[-1] if self.states else None
+
+    def append(self, at, online):
+        """Записывает переход; возвращает False, если состояние не изменилось"""
+        if self.states and self.states[-1] == online:
+            return False
+        if self.times:
+            # Часы могли сдвинуться назад - интервалы не должны быть отрицательными
+            at = max(at, self.times[-1])
+            elapsed = at - self.times[-1]
+            previous = self.states[-1]
+            self.up_totals.append(self.up_totals[-1] + (elapsed if previous is True else 0.0))
+            self.down_totals.append(self.down_totals[-1] + (elapsed if previous is False else 0.0))
+            self.outage_counts.append(self.outage_counts[-1] + (1 if online is False else 0))
+        else:
+            self.up_totals.append(0.0)
+            self.down_totals.append(0.0)
+            self.outage_counts.append(1 if online is False else 0)
+        self.times.append(at)
+        self.states.append(online)
+        return True
+
+    def totals_at(self, moment):
+        """Накопленные (доступность, недоступность) в секундах с начала журнала до moment"""
+        index = bisect_right(self.times, moment) - 1
+        if index < 0:
+            return 0.0, 0.0
+        elapsed = moment - self.times[index]
+        state = self.states[index]
+        return (
+            self.up_totals[index] + (elapsed if state is True else 0.0),
+            self.down_totals[index] + (elapsed if state is False else 0.0)
+        )
+
+    def outages_between(self, start, end):
+        """Количество отказов, пришедшихся на интервал (включая продолжающийся с его начала)"""
+        start_index = bisect_right(self.times, start) - 1
+        end_index = bisect_right(self.times, end) - 1
+        if end_index < 0:
+            return 0
+        if start_index < 0:
+            return self.outage_counts[end_index]
+        ongoing = 1 if self.states[start_index] is False else 0
+        return self.outage_counts[end_index] - self.outage_counts[start_index] + ongoing
+
+    def report(self, start, end=None):
+        """Доступность за период: (секунды доступности, секунды недоступности, процент или None, число отказов)
+
+        Время, когда сервер не отслеживался, в расчет процента не входит.
+        """
+        end = min(end if end is not None else time.time(), time.time())
+        start = min(start, end)
+        up_end, down_end = self.totals_at(end)
+        up_start, down_start = self.totals_at(start)
+        up, down = up_end - up_start, down_end - down_start
+        percent = 100.0 * up / (up + down) if up + down > 0 else None
+        return up, down, percent, self.outages_between(start, end)
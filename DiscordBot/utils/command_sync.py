@@ -0,0 +1,64 @@
+import os
+import json
+import hashlib
+import logging
+import discord
+from config import Config
+from utils.storage import DATA_DIR, read_json_file, write_json_file
+
+logger = logging.getLogger('discord_bot')
+
+# Файл с хэшами последних синхронизированных деревьев команд (по областям синхронизации)
+SYNC_STATE_FILE = os.path.join(DATA_DIR, 'command_sync.json')
+
+
+def get_sync_guild():
+    """Сервер для синхронизации команд (COMMAND_SYNC_GUILD_ID) или None для глобальной синхронизации"""
+    return discord.Object(id=Config.COMMAND_SYNC_GUILD_ID) if Config.COMMAND_SYNC_GUILD_ID else None
+
+
+def command_tree_hash(tree, guild=None):
+    """Хэш сигнатур всех слэш-команд дерева (имена, описания, параметры и их типы)"""
+    payload = [command.to_dict(tree) for command in tree.get_commands(guild=guild)]
+    payload.sort(key=lambda command: (command.get('type', 1), command['name']))
+    serialized = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+
+def load_sync_state():
+    try:
+        return read_json_file(SYNC_STATE_FILE) or {}
+    except Exception as e:
+        logger.error(f"Ошибка при чтении состояния синхронизации команд: {e}")
+        return {}
+
+
+async def sync_command_tree(bot, force=False):
+    """Синхронизирует слэш-команды с Discord, только если их сигнатуры изменились
+
+    Глобальная синхронизация - медленный вызов API с жесткими лимитами, поэтому
+    при перезапуске без изменений команд она пропускается. Возвращает True,
+    если синхронизация была выполнена.
+    """
+    guild = get_sync_guild()
+    if guild is not None:
+        bot.tree.copy_global_to(guild=guild)
+
+    scope = str(guild.id) if guild is not None else 'global'
+    if Config.DISCORD_API_BASE:
+        # Синхронизация с локальной заменой Discord не должна отменять синхронизацию с настоящим Discord
+        scope = f"{scope}@{Config.DISCORD_API_BASE}"
+    digest = command_tree_hash(bot.tree, guild)
+    state = load_sync_state()
+    if not force and state.get(scope) == digest:
+        logger.info(f"Слэш-команды не изменились ({scope}), синхронизация пропущена")
+        return False
+
+    synced = await bot.tree.sync(guild=guild)
+    state[scope] = digest
+    try:
+        write_json_file(SYNC_STATE_FILE, state)
+    except Exception as e:
+        logger.error(f"Ошибка при сохранении состояния синхронизации команд: {e}")
+    logger.warning(f"Синхронизировано слэш-команд: {len(synced)} ({scope})")
+    return True
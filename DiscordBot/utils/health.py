@@ -0,0 +1,96 @@
+import time
+import asyncio
+from config import Config
+
+
+class HealthState:
+    """Кэшированное состояние бота для эндпоинтов /healthz и /readyz
+
+    Значения обновляются там, где меняется состояние (события шлюза, опрос
+    сервера, очередь уведомлений), а проверки только читают поля. Поэтому
+    запросы супервизора и балансировщика не выполняют ввода-вывода и не
+    обращаются к циклу событий.
+    """
+
+    def __init__(self, max_poll_age=120, max_queue=100, loop_stall=30, heartbeat_interval=5):
+        self.max_poll_age = max_poll_age
+        self.max_queue = max_queue
+        self.loop_stall = loop_stall
+        self.heartbeat_interval = heartbeat_interval
+
+        self.started_at = time.monotonic()
+        self.gateway_ready = False
+        # Режим только приема уведомлений (INGESTION_ONLY): шлюз и опрос статуса не используются
+        self.ingestion_only = False
+        self.draining = False
+        # Время последнего успешного получения статуса (опрос, ответ 304 или событие потока)
+        self.last_poll = None
+        # Опрос приостановлен намеренно (режим техобслуживания)
+        self.poll_paused = False
+        self.queue_depth = 0
+        # Последний такт цикла событий: если он давно не обновлялся, цикл завис
+        self.last_heartbeat = None
+        self.heartbeat_task = None
+
+    def mark_poll(self, at=None):
+        self.last_poll = at if at is not None else time.monotonic()
+
+    def start_heartbeat(self):
+        """Запускает задачу, отмечающую, что цикл событий обрабатывает задачи"""
+        if self.heartbeat_task is None:
+            self.heartbeat_task = asyncio.get_running_loop().create_task(self.run_heartbeat())
+
+    def stop_heartbeat(self):
+        if self.heartbeat_task is not None:
+            self.heartbeat_task.cancel()
+            self.heartbeat_task = None
+
+    async def run_heartbeat(self):
+        while True:
+            self.last_heartbeat = time.monotonic()
+            await asyncio.sleep(self.heartbeat_interval)
+
+    def liveness(self):
+        """Проверка /healthz: процесс жив и цикл событий не завис"""
+        now = time.monotonic()
+        heartbeat_age = now - (self.last_heartbeat if self.last_heartbeat is not None else self.started_at)
+        alive = heartbeat_age <= self.loop_stall
+        return alive, {
+            'status': 'ok' if alive else 'stalled',
+            'uptime': round(now - self.started_at, 1),
+            'event_loop_lag': round(heartbeat_age, 1)
+        }
+
+    def readiness(self):
+        """Проверка /readyz: бот подключен к Discord, получает статус сервера и успевает обрабатывать уведомления"""
+        now = time.monotonic()
+        poll_age = now - (self.last_poll if self.last_poll is not None else self.started_at)
+        checks = {
+            'gateway': {'ok': self.gateway_ready or self.ingestion_only},
+            'shutdown': {'ok': not self.draining},
+            'status_poll': {
+                'ok': self.poll_paused or self.ingestion_only or poll_age <= self.max_poll_age,
+                'age': round(poll_age, 1) if self.last_poll is not None else None,
+                'paused': self.poll_paused
+            },
+            'notification_queue': {
+                'ok': self.queue_depth < self.max_queue,
+                'depth': self.queue_depth,
+                'limit': self.max_queue
+            }
+        }
+        ready = all(check['ok'] for check in checks.values())
+        return ready, {'status': 'ready' if ready else 'not_ready', 'checks': checks}
+
+
+def get_health_state(bot):
+    """Возвращает общее для бота состояние здоровья, создавая его при первом обращении"""
+    health = getattr(bot, 'health', None)
+    if health is None:
+        health = HealthState(
+            max_poll_age=Config.Timers.HEALTH_MAX_POLL_AGE,
+            max_queue=Config.HEALTH_MAX_QUEUE,
+            loop_stall=Config.Timers.HEALTH_LOOP_STALL
+        )
+        bot.health = health
+    return health
@@ -0,0 +1,78 @@
+import inspect
+import logging
+
+logger = logging.getLogger('discord_bot')
+
+
+class CogHandoff:
+    """Передача состояния от выгружаемого экземпляра cog новому при горячей перезагрузке
+
+    Во время перезагрузки cog_unload старого экземпляра не освобождает ресурсы
+    (сокет HTTP сервера, HTTP сессии, кэши), а откладывает их вызовом stash().
+    Новый экземпляр забирает их через take(). Если новый экземпляр не забрал
+    состояние (например, его код больше не поддерживает передачу), ресурсы
+    освобождаются функцией dispose, переданной в stash().
+    """
+
+    def __init__(self):
+        # Имена cogs, которые сейчас перезагружаются
+        self.reloading = set()
+        # Имя cog -> (состояние, функция освобождения ресурсов)
+        self.states = {}
+
+    def is_reloading(self, cog_name):
+        return cog_name in self.reloading
+
+    def stash(self, cog_name, state, dispose=None):
+        """Сохраняет состояние выгружаемого cog для нового экземпляра"""
+        self.states[cog_name] = (state, dispose)
+
+    def take(self, cog_name):
+        """Возвращает переданное состояние cog (или None) и удаляет его из хранилища"""
+        state, _ = self.states.pop(cog_name, (None, None))
+        return state
+
+    async def discard(self, cog_name):
+        """Освобождает ресурсы состояния, которое не забрал новый экземпляр"""
+        state, dispose = self.states.pop(cog_name, (None, None))
+        if state is None:
+            return
+        logger.warning(f"Состояние cog {cog_name} не было передано новому экземпляру и будет освобождено")
+        if dispose is None:
+            return
+        try:
+            result = dispose(state)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.error(f"Ошибка при освобождении состояния cog {cog_name}: {e}", exc_info=e)
+
+
+def get_cog_handoff(bot):
+    """Возвращает общее для бота хранилище передаваемого состояния"""
+    handoff = getattr(bot, 'cog_handoff', None)
+    if handoff is None:
+        handoff = CogHandoff()
+        bot.cog_handoff = handoff
+    return handoff
+
+
+async def hot_reload_extension(bot, extension):
+    """Перезагружает расширение с передачей состояния его cogs новым экземплярам
+
+    Если новый код не загрузился, discord.py восстанавливает старый модуль,
+    и состояние забирает восстановленный экземпляр. Возвращает имена перезагруженных cogs.
+    """
+    if extension not in bot.extensions:
+        raise ValueError(f"Расширение {extension} не загружено")
+
+    handoff = get_cog_handoff(bot)
+    cog_names = [name for name, cog in bot.cogs.items() if type(cog).__module__ == extension]
+    handoff.reloading.update(cog_names)
+    try:
+        await bot.reload_extension(extension)
+    finally:
+        handoff.reloading.difference_update(cog_names)
+        for cog_name in cog_names:
+            await handoff.discard(cog_name)
+    return cog_names
@@ -0,0 +1,126 @@
+import copy
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+from datetime import datetime
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+# Фоновый поток, который записывает журнал в файл и консоль
+_listener = None
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Обработчик, который только кладет запись в очередь
+
+    Стандартный QueueHandler форматирует запись целиком в потоке вызова.
+    Здесь в потоке вызова только подставляются аргументы сообщения и
+    сериализуется трейс исключения (после выхода из except объекты стека
+    уже не нужны), а форматирование выполняет фоновый поток. Поэтому
+    JSON формат получает трейс отдельным полем.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Форматирует запись как одну строку JSON
+
+    Поля cog и event берутся из extra={'cog': ..., 'event': ...}; если cog
+    не указан, для записей из модулей cogs/ подставляется имя модуля.
+    """
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'function': record.funcName
+        }
+        cog = getattr(record, 'cog', None)
+        if cog is None and 'cogs' in record.pathname.replace('\\', '/').split('/'):
+            cog = record.module
+        if cog is not None:
+            entry['cog'] = cog
+        event = getattr(record, 'event', None)
+        if event is not None:
+            entry['event'] = event
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def create_file_handler(path, rotation='size', max_bytes=10 * 1024 * 1024, backup_count=5, when='midnight'):
+    """Создает обработчик файла журнала с ротацией по размеру (size) или по времени (time)"""
+    if rotation == 'time':
+        return logging.handlers.TimedRotatingFileHandler(path, when=when, backupCount=backup_count, encoding='utf-8')
+    return logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+
+
+def configure_logging(level='ERROR', path='discord_bot.log', log_format='text', rotation='size',
+                      max_bytes=10 * 1024 * 1024, backup_count=5, when='midnight'):
+    """Настраивает журналирование через очередь
+
+    Вызывающий поток (в том числе цикл событий) только кладет запись в очередь,
+    запись в файл и консоль выполняет фоновый поток QueueListener.
+    """
+    global _listener
+    stop_logging()
+
+    formatter = JsonLinesFormatter() if log_format == 'json' else logging.Formatter(LOG_FORMAT)
+    handlers = [
+        create_file_handler(path, rotation, max_bytes, backup_count, when),
+        logging.StreamHandler()
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_DeferredQueueHandler(log_queue))
+    set_log_level(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """Останавливает фоновый поток, дописав все записи из очереди, и закрывает файлы"""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+def set_log_level(level):
+    """Меняет уровень журналирования во время работы; возвращает установленный уровень"""
+    level = str(level).upper()
+    if level not in LOG_LEVELS:
+        raise ValueError(f"Неизвестный уровень журналирования: {level}")
+    logging.getLogger().setLevel(level)
+    return level
+
+
+def get_log_level():
+    return logging.getLevelName(logging.getLogger().getEffectiveLevel())
@@ -0,0 +1,132 @@
+import sys
+import tracemalloc
+from collections import OrderedDict, deque
+
+# Типы, которые не содержат ссылок на другие объекты
+_ATOMIC_TYPES = (str, bytes, int, float, bool, type(None))
+_SEQUENCE_TYPES = (list, tuple, set, frozenset, deque)
+
+# Ограничение обхода одной структуры, чтобы отчет оставался дешевым
+DEEP_SIZEOF_LIMIT = 200000
+
+
+class BoundedDict(OrderedDict):
+    """Словарь с ограниченным числом записей
+
+    При переполнении вытесняются записи, к которым дольше всего не обращались
+    (запись через [] и чтение через get() считаются обращением).
+    Используется для кэшей и таблиц, ключи которых приходят извне.
+    """
+
+    def __init__(self, maxsize=1024, *args, **kwargs):
+        self.maxsize = max(1, maxsize)
+        # Количество вытесненных записей (для отчета о памяти)
+        self.evictions = 0
+        super().__init__(*args, **kwargs)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        if key in self:
+            self.move_to_end(key)
+            return super().__getitem__(key)
+        return default
+
+
+def deep_sizeof(obj, seen=None, limit=DEEP_SIZEOF_LIMIT):
+    """Приблизительный размер объекта вместе с содержимым (в байтах)
+
+    Обходятся встроенные контейнеры и объекты модулей бота (utils.*). Объекты
+    библиотек (каналы Discord, сессии aiohttp, задачи) учитываются только
+    собственным размером, иначе через них обход ушел бы во все состояние клиента.
+    Общий набор seen позволяет не считать дважды объекты, входящие в несколько структур.
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    visited = 0
+    while stack and visited < limit:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        visited += 1
+        total += sys.getsizeof(current, 0)
+
+        if isinstance(current, _ATOMIC_TYPES):
+            continue
+        try:
+            if isinstance(current, dict):
+                for key, value in list(current.items()):
+                    stack.append(key)
+                    stack.append(value)
+            elif isinstance(current, _SEQUENCE_TYPES):
+                stack.extend(list(current))
+            elif type(current).__module__.startswith('utils.'):
+                if hasattr(current, '__dict__'):
+                    stack.append(vars(current))
+                for slot in getattr(type(current), '__slots__', ()):
+                    if hasattr(current, slot):
+                        stack.append(getattr(current, slot))
+        except RuntimeError:
+            # Структура изменилась во время обхода (например, из потока HTTP сервера) - пропускаем ее содержимое
+            continue
+    return total
+
+
+def describe_structure(obj, seen=None):
+    """Возвращает (количество записей или None, приблизительный размер в байтах)"""
+    try:
+        entries = len(obj)
+    except TypeError:
+        entries = None
+    return entries, deep_sizeof(obj, seen)
+
+
+def process_memory():
+    """Возвращает (текущий RSS, пиковый RSS) процесса в байтах; недоступные значения - None"""
+    rss = None
+    try:
+        with open('/proc/self/status', 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    rss = int(line.split()[1]) * 1024
+                    break
+    except OSError:
+        pass
+
+    peak = None
+    try:
+        import resource
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux возвращает килобайты, macOS - байты
+        peak = max_rss if sys.platform == 'darwin' else max_rss * 1024
+    except ImportError:
+        # Windows: модуль resource недоступен
+        pass
+    return rss, peak
+
+
+def tracemalloc_summary(limit=5):
+    """Текущий и пиковый объем памяти, отслеживаемой tracemalloc, и крупнейшие места выделения"""
+    if not tracemalloc.is_tracing():
+        return None
+    current, peak = tracemalloc.get_traced_memory()
+    statistics = tracemalloc.take_snapshot().statistics('lineno')[:limit]
+    top = [(str(stat.traceback[0]), stat.size, stat.count) for stat in statistics]
+    return current, peak, top
+
+
+def format_bytes(size):
+    if size is None:
+        return "недоступно"
+    for unit in ("Б", "КБ", "МБ"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "Б" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} ГБ"
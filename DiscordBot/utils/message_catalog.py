@@ -0,0 +1,217 @@
+import asyncio
+import logging
+import threading
+from config import Config
+from utils.startup_timing import startup_timer
+from utils.templates import TemplateError, ShuffleBag, compile_template, literal_template
+from utils.storage import MESSAGE_FILES, get_storage
+from utils.trie import PrefixTrie
+from utils.memory import BoundedDict
+
+logger = logging.getLogger('discord_bot')
+
+# Ключи, которые использует модуль уведомлений (подсказываются, даже если сообщений для них еще нет)
+KNOWN_MESSAGE_KEYS = {
+    'storm': ('storm_warning', 'storm_start', 'storm_end', 'storm_reminder'),
+    'season': ('spring', 'summer', 'autumn', 'winter')
+}
+
+# Количество хранимых мешков выбора сообщений (по одному на пару тип/ключ)
+BAG_CACHE_LIMIT = 256
+
+
+class MessageCatalog:
+    """Общий каталог сообщений о штормах и сезонах для всех cogs
+
+    Каталог хранит неизменяемый снимок: тип -> {ключ: кортеж сообщений}.
+    При внешнем изменении данных в хранилище (для JSON - по mtime файла)
+    или при редактировании через команды
+    новый снимок собирается целиком и подменяется одной операцией присваивания,
+    поэтому читатели никогда не блокируются и не видят частично обновленных данных.
+    Сообщения хранятся уже скомпилированными шаблонами, а выбор идет через
+    мешок без повторов (ShuffleBag) отдельно для каждого ключа.
+    """
+
+    def __init__(self, storage, check_interval=None):
+        self.storage = storage
+        self.check_interval = check_interval if check_interval is not None else Config.Timers.MESSAGE_CATALOG_CHECK
+
+        # Текущий снимок и метки изменения данных, из которых он собран
+        self.snapshot = {kind: {} for kind in MESSAGE_FILES}
+        self.tokens = {}
+        # Версия каталога (увеличивается при каждой подмене снимка)
+        self.version = 0
+        # Мешки выбора сообщений: (тип, ключ) -> ShuffleBag
+        self.bags = BoundedDict(BAG_CACHE_LIMIT)
+        # Префиксные деревья ключей по типам для автодополнения (пересобираются при подмене снимка)
+        self.key_tries = {kind: self.build_key_trie(kind, ()) for kind in MESSAGE_FILES}
+
+        # Блокировка нужна только писателям; читатели работают со снимком без блокировок
+        self.write_lock = threading.Lock()
+        # Первая загрузка выполняется один раз, даже если ее одновременно запросили несколько cogs
+        self.load_lock = threading.Lock()
+        self.loaded = False
+        self.watch_task = None
+        self.users = 0
+
+    @staticmethod
+    def compile_message(kind, key, text):
+        """Компилирует сообщение; ошибочный шаблон выводится как обычный текст"""
+        try:
+            return compile_template(text)
+        except TemplateError as e:
+            logger.warning(f"Ошибка в шаблоне сообщения {kind}/{key}, используется текст без подстановок: {e}")
+            return literal_template(str(text))
+
+    @classmethod
+    def build_entries(cls, kind, messages):
+        """Преобразует содержимое файла в неизменяемую структуру {ключ: кортеж шаблонов}"""
+        entries = {}
+        for key, value in messages.items():
+            values = value if isinstance(value, list) else [value]
+            templates = tuple(cls.compile_message(kind, key, text) for text in values if text)
+            if templates:
+                entries[key] = templates
+        return entries
+
+    @staticmethod
+    def build_key_trie(kind, keys):
+        """Строит дерево ключей типа для автодополнения: известные ключи и ключи из данных"""
+        key_trie = PrefixTrie()
+        for key in (*KNOWN_MESSAGE_KEYS.get(kind, ()), *keys):
+            key_trie.add(key, key)
+        return key_trie
+
+    def swap(self, kind, entries):
+        """Подменяет снимок каталога новым, в котором заменены сообщения одного типа
+
+        Вызывается и из рабочего потока (watch), поэтому дерево ключей не изменяется на месте,
+        а строится заново и публикуется вместе со снимком: автодополнение в цикле событий
+        обходит либо прежнее, либо новое дерево целиком.
+        """
+        snapshot = dict(self.snapshot)
+        snapshot[kind] = entries
+        key_tries = dict(self.key_tries)
+        key_tries[kind] = self.build_key_trie(kind, entries)
+        self.snapshot = snapshot
+        self.key_tries = key_tries
+        self.version += 1
+
+    def reload(self, kind, force=False):
+        """Перезагружает сообщения типа, если данные изменились; возвращает True при обновлении"""
+        token = self.storage.messages_token(kind)
+        if not force and token == self.tokens.get(kind):
+            return False
+
+        with self.write_lock:
+            messages = self.storage.load_messages(kind)
+            if messages is None:
+                # Файл поврежден или удален - оставляем последний корректный снимок
+                self.tokens[kind] = token
+                return False
+            self.swap(kind, self.build_entries(kind, messages))
+            self.tokens[kind] = token
+        return True
+
+    def ensure_loaded(self):
+        """Загружает сообщения при первом обращении (вызывается из cog_load в отдельном потоке)"""
+        with self.load_lock:
+            if self.loaded:
+                return
+            with startup_timer.measure('data', 'message_catalog'):
+                self.reload_all(force=True)
+            self.loaded = True
+
+    def reload_all(self, force=False):
+        """Перезагружает все типы сообщений; возвращает список обновленных типов"""
+        return [kind for kind in MESSAGE_FILES if self.reload(kind, force=force)]
+
+    def kinds(self):
+        return list(MESSAGE_FILES)
+
+    def complete_keys(self, kind, prefix, limit=25):
+        """Возвращает ключи сообщений типа, начинающиеся с prefix"""
+        key_trie = self.key_tries.get(kind)
+        return key_trie.complete(prefix, limit=limit) if key_trie is not None else []
+
+    def memory_structures(self):
+        """Долгоживущие структуры каталога для отчета о памяти"""
+        return {
+            'snapshot': self.snapshot,
+            'bags': self.bags,
+            'key_tries': self.key_tries
+        }
+
+    def get(self, kind):
+        """Возвращает сообщения типа в виде {ключ: кортеж шаблонов} (только для чтения)"""
+        return self.snapshot.get(kind, {})
+
+    def choice(self, kind, key, context=None):
+        """Возвращает отрисованное сообщение по ключу или None, если сообщений нет
+
+        Сообщения одного ключа не повторяются, пока не будут показаны все.
+        """
+        entries = self.snapshot.get(kind, {}).get(key)
+        if not entries:
+            return None
+
+        # Мешок пересоздается, только если сообщения ключа изменились
+        bag = self.bags.get((kind, key))
+        if bag is None or bag.items is not entries:
+            bag = ShuffleBag(entries)
+            self.bags[(kind, key)] = bag
+        return bag.draw().render(context)
+
+    def update(self, kind, change):
+        """Применяет изменение к хранилищу и сразу публикует новый снимок"""
+        try:
+            with self.write_lock:
+                change()
+                messages = self.storage.load_messages(kind)
+                self.swap(kind, self.build_entries(kind, messages or {}))
+                self.tokens[kind] = self.storage.messages_token(kind)
+            return True
+        except Exception as e:
+            logger.error(f"Ошибка при сохранении сообщений типа {kind}: {e}")
+            return False
+
+    def add_message(self, kind, key, text):
+        """Добавляет сообщение; в хранилище записывается только новая запись"""
+        return self.update(kind, lambda: self.storage.insert_message(kind, key, text))
+
+    def remove_messages(self, kind, key, index=None):
+        """Удаляет сообщение по индексу или все сообщения ключа"""
+        return self.update(kind, lambda: self.storage.delete_messages(kind, key, index))
+
+    async def watch(self):
+        """Периодически проверяет хранилище на внешние изменения и перезагружает измененные типы"""
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                updated = await asyncio.to_thread(self.reload_all)
+                if updated:
+                    logger.info(f"Каталог сообщений обновлен из хранилища: {', '.join(updated)}")
+            except Exception as e:
+                logger.error(f"Ошибка при проверке изменений сообщений: {e}")
+
+    def acquire(self):
+        """Регистрирует cog, использующий каталог, и запускает наблюдение за файлами"""
+        self.users += 1
+        if self.watch_task is None and self.check_interval > 0:
+            self.watch_task = asyncio.get_running_loop().create_task(self.watch())
+
+    def release(self):
+        """Снимает регистрацию cog; наблюдение останавливается, когда каталог никому не нужен"""
+        self.users = max(0, self.users - 1)
+        if self.users == 0 and self.watch_task is not None:
+            self.watch_task.cancel()
+            self.watch_task = None
+
+
+def get_message_catalog(bot):
+    """Возвращает общий для всех cogs каталог сообщений, создавая его при первом обращении"""
+    catalog = getattr(bot, 'message_catalog', None)
+    if catalog is None:
+        catalog = MessageCatalog(get_storage(bot))
+        bot.message_catalog = catalog
+    return catalog
@@ -0,0 +1,223 @@
+import logging
+from collections import OrderedDict
+import discord
+from config import Config
+
+logger = logging.getLogger('discord_bot')
+
+# Ограничения Discord для эмбедов
+EMBED_TOTAL_LIMIT = 6000
+EMBED_FIELDS_LIMIT = 25
+EMBED_TITLE_LIMIT = 256
+EMBED_DESCRIPTION_LIMIT = 4096
+EMBED_FIELD_NAME_LIMIT = 256
+EMBED_FIELD_VALUE_LIMIT = 1024
+EMBED_FOOTER_LIMIT = 2048
+
+# Место, резервируемое в подвале под номер страницы
+PAGE_INDICATOR_RESERVE = len(" • Страница 99999/99999")
+
+# Количество отрисованных страниц, хранимых в кэше одного пагинатора
+PAGE_CACHE_SIZE = 8
+
+
+def split_text(text, limit):
+    """Делит текст на части не длиннее limit, по возможности по границам строк и слов"""
+    text = text or ''
+    chunks = []
+    while len(text) > limit:
+        cut = text.rfind('\n', 0, limit + 1)
+        if cut < limit // 2:
+            cut = text.rfind(' ', 0, limit + 1)
+        if cut < limit // 2:
+            cut = limit
+        chunks.append(text[:cut].rstrip() or '\u200b')
+        text = text[cut:].lstrip()
+    if text or not chunks:
+        chunks.append(text)
+    return chunks
+
+
+class EmbedContent:
+    """Содержимое, которое нужно вывести постранично
+
+    fields - список кортежей (название, значение) или (название, значение, inline).
+    """
+
+    def __init__(self, title, description='', fields=None, footer='', color=None, image_url=None):
+        self.title = (title or '')[:EMBED_TITLE_LIMIT]
+        self.description = description or ''
+        self.fields = fields or []
+        self.footer = (footer or '')[:EMBED_FOOTER_LIMIT - PAGE_INDICATOR_RESERVE]
+        self.color = color if color is not None else discord.Color.blue()
+        self.image_url = image_url
+
+
+def build_layout(content):
+    """Раскладывает содержимое по страницам с учетом всех ограничений Discord
+
+    Возвращает список страниц; страница - это кортеж (описание, список полей).
+    Учитываются только длины строк, поэтому раскладка дешевле отрисовки эмбедов.
+    """
+    # Бюджет символов одной страницы за вычетом заголовка и подвала с номером страницы
+    budget = EMBED_TOTAL_LIMIT - len(content.title) - len(content.footer) - PAGE_INDICATOR_RESERVE
+
+    blocks = []
+    if content.description:
+        for chunk in split_text(content.description, min(EMBED_DESCRIPTION_LIMIT, budget)):
+            blocks.append(('description', chunk))
+
+    for field in content.fields:
+        name, value = field[0], field[1]
+        inline = field[2] if len(field) > 2 else False
+        name = (name or '\u200b')[:EMBED_FIELD_NAME_LIMIT]
+        for i, chunk in enumerate(split_text(value or '\u200b', EMBED_FIELD_VALUE_LIMIT)):
+            chunk_name = name if i == 0 else f"{name} (продолжение)"[:EMBED_FIELD_NAME_LIMIT]
+            blocks.append(('field', (chunk_name, chunk or '\u200b', inline)))
+
+    pages = []
+    description = None
+    fields = []
+    size = 0
+    for kind, block in blocks:
+        block_size = len(block) if kind == 'description' else len(block[0]) + len(block[1])
+        page_started = description is not None or fields
+        # Описание может быть только в начале страницы
+        if page_started and (
+            kind == 'description'
+            or len(fields) >= EMBED_FIELDS_LIMIT
+            or size + block_size > budget
+        ):
+            pages.append((description, fields))
+            description, fields, size = None, [], 0
+
+        if kind == 'description':
+            description = block
+        else:
+            fields.append(block)
+        size += block_size
+
+    if description is not None or fields or not pages:
+        pages.append((description, fields))
+    return pages
+
+
+class Paginator(discord.ui.View):
+    """Постраничный вывод длинного содержимого с кнопками "назад"/"вперед"
+
+    Раскладка по страницам строится один раз для каждой версии содержимого,
+    а эмбед страницы отрисовывается только при ее запросе и кэшируется
+    по ключу (версия содержимого, страница). По истечении таймаута кнопки
+    отключаются, а содержимое и кэш освобождаются.
+    """
+
+    def __init__(self, content_provider, version_provider=None, author_id=None, timeout=None):
+        super().__init__(timeout=timeout if timeout is not None else Config.Timers.PAGINATOR_TIMEOUT)
+        # content_provider() возвращает EmbedContent, version_provider() - текущую версию содержимого
+        self.content_provider = content_provider
+        self.version_provider = version_provider or (lambda: 0)
+        self.author_id = author_id
+        self.message = None
+
+        self.page = 0
+        self.version = None
+        self.content = None
+        self.layout = None
+        self.cache = OrderedDict()
+
+    @property
+    def page_count(self):
+        return len(self.layout) if self.layout else 0
+
+    def ensure_layout(self):
+        """Перестраивает раскладку, если содержимое изменилось"""
+        version = self.version_provider()
+        if self.layout is None or version != self.version:
+            self.content = self.content_provider()
+            self.layout = build_layout(self.content)
+            self.version = version
+            self.page = min(self.page, len(self.layout) - 1)
+
+    def render(self, page):
+        """Возвращает эмбед страницы, отрисовывая его только при первом запросе"""
+        key = (self.version, page)
+        embed = self.cache.get(key)
+        if embed is not None:
+            self.cache.move_to_end(key)
+            return embed
+
+        content = self.content
+        description, fields = self.layout[page]
+        embed = discord.Embed(title=content.title, description=description, color=content.color)
+        for name, value, inline in fields:
+            embed.add_field(name=name, value=value, inline=inline)
+
+        if page == 0 and content.image_url:
+            embed.set_image(url=content.image_url)
+
+        if self.page_count > 1:
+            indicator = f"Страница {page + 1}/{self.page_count}"
+            embed.set_footer(text=f"{content.footer} • {indicator}" if content.footer else indicator)
+        elif content.footer:
+            embed.set_footer(text=content.footer)
+
+        self.cache[key] = embed
+        while len(self.cache) > PAGE_CACHE_SIZE:
+            self.cache.popitem(last=False)
+        return embed
+
+    def update_buttons(self):
+        self.previous_page.disabled = self.page <= 0
+        self.next_page.disabled = self.page >= self.page_count - 1
+
+    async def start(self, ctx):
+        """Отправляет первую страницу; кнопки добавляются только если страниц больше одной"""
+        self.ensure_layout()
+        if self.page_count <= 1:
+            embed = self.render(0)
+            self.release()
+            self.stop()
+            return await ctx.send(embed=embed)
+
+        self.update_buttons()
+        self.message = await ctx.send(embed=self.render(self.page), view=self)
+        return self.message
+
+    async def show_page(self, interaction, page):
+        self.ensure_layout()
+        self.page = max(0, min(page, self.page_count - 1))
+        self.update_buttons()
+        await interaction.response.edit_message(embed=self.render(self.page), view=self)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction, button):
+        await self.show_page(interaction, self.page - 1)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction, button):
+        await self.show_page(interaction, self.page + 1)
+
+    async def interaction_check(self, interaction):
+        """Листать страницы может только автор команды"""
+        if self.author_id is not None and interaction.user.id != self.author_id:
+            await interaction.response.send_message("❌ Листать страницы может только автор команды.", ephemeral=True)
+            return False
+        return True
+
+    def release(self):
+        """Освобождает содержимое и кэш страниц"""
+        self.cache.clear()
+        self.content = None
+        self.layout = None
+        self.content_provider = None
+        self.version_provider = None
+
+    async def on_timeout(self):
+        """Отключает кнопки и освобождает память после таймаута"""
+        self.release()
+        if self.message is not None:
+            try:
+                await self.message.edit(view=None)
+            except discord.HTTPException as e:
+                logger.debug(f"Не удалось убрать кнопки пагинатора: {e}")
+            self.message = None
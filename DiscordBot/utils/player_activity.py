@@ -0,0 +1,65 @@
+import discord
+
+# Сколько имен показывать в объявлении, остальные заменяются на "и еще N"
+PLAYER_NAMES_SHOWN = 3
+
+
+class PlayerActivity:
+    """Накопитель входов и выходов игроков для объединенных объявлений
+
+    StatusMod не сообщает, какой игрок вошел или вышел, а присылает полный
+    список игроков онлайн. Изменения вычисляются сравнением с предыдущим
+    списком и копятся до отправки объявления: игрок, который вошел и вышел
+    в пределах одного окна, в объявление не попадает.
+    """
+
+    def __init__(self):
+        # Игроки онлайн по последнему уведомлению; None - список еще не известен
+        # (первый полученный список принимается без объявлений)
+        self.online = None
+        # Накопленные изменения (словари используются как упорядоченные множества)
+        self.joined = {}
+        self.left = {}
+
+    def observe(self, players):
+        """Сравнивает новый список игроков с предыдущим; возвращает True, если есть что объявить"""
+        current = set(players)
+        if self.online is None:
+            self.online = current
+            return False
+
+        for name in current - self.online:
+            if self.left.pop(name, False) is False:
+                self.joined[name] = None
+        for name in self.online - current:
+            if self.joined.pop(name, False) is False:
+                self.left[name] = None
+        self.online = current
+        return bool(self.joined or self.left)
+
+    def reset(self, players=None):
+        """Отбрасывает накопленные изменения (остановка или запуск сервера)
+
+        players - список игроков, от которого отсчитываются следующие изменения;
+        None - следующий полученный список принимается без объявлений.
+        """
+        self.online = set(players) if players is not None else None
+        self.joined.clear()
+        self.left.clear()
+
+    def take(self):
+        """Возвращает накопленные входы и выходы и очищает их"""
+        joined, left = list(self.joined), list(self.left)
+        self.joined.clear()
+        self.left.clear()
+        return joined, left
+
+
+def format_player_names(names, limit=PLAYER_NAMES_SHOWN):
+    """Перечисляет имена игроков: «Alice, Bob и Carol» или «Alice, Bob, Carol и еще 5»"""
+    names = [discord.utils.escape_markdown(name) for name in names]
+    if len(names) == 1:
+        return names[0]
+    if len(names) <= limit:
+        return f"{', '.join(names[:-1])} и {names[-1]}"
+    return f"{', '.join(names[:limit])} и еще {len(names) - limit}"
@@ -0,0 +1,31 @@
+import time
+import asyncio
+
+
+class TokenBucket:
+    """Ограничение частоты запросов: в среднем не более rate в секунду, всплеском до capacity
+
+    Ожидающие получают разрешения строго по очереди (под блокировкой),
+    поэтому при массовой рассылке запросы равномерно распределяются во времени.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = max(float(rate), 0.001)
+        self.capacity = float(capacity) if capacity else max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Дожидается разрешения на один запрос"""
+        async with self.lock:
+            self.refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self.refill()
+            self.tokens -= 1
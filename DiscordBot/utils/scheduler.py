@@ -0,0 +1,165 @@
+import time
+import heapq
+import asyncio
+import logging
+import secrets
+import itertools
+from collections import namedtuple
+from utils.storage import get_storage
+
+logger = logging.getLogger('discord_bot')
+
+# Задача планировщика: due - время выполнения (Unix time), kind - тип задачи (определяет обработчик)
+ScheduledJob = namedtuple('ScheduledJob', ['job_id', 'due', 'kind', 'payload'])
+
+# Насколько может опоздать задача (например, пока бот был остановлен), прежде чем она будет отброшена (в секундах)
+MISSED_JOB_GRACE = 300
+
+
+class Scheduler:
+    """Планировщик отложенных задач (напоминания о штормах, запланированные объявления)
+
+    Задачи хранятся в двоичной куче по времени выполнения, поэтому фоновая
+    задача спит ровно до ближайшей из них, а не опрашивает список по таймеру.
+    Добавление задачи раньше текущей ближайшей будит фоновую задачу.
+    Отмененные и замененные задачи удаляются из кучи лениво, когда оказываются
+    в ее вершине. Задачи сохраняются в хранилище и восстанавливаются при запуске.
+    """
+
+    def __init__(self, storage=None, missed_grace=MISSED_JOB_GRACE):
+        self.storage = storage
+        self.missed_grace = missed_grace
+        # Актуальные задачи по ID; запись в куче действительна, только если задача все еще здесь
+        self.jobs = {}
+        self.heap = []
+        # Порядковый номер разрешает равенство времени и сохраняет порядок добавления
+        self.counter = itertools.count()
+        # Обработчики по типу задачи: корутина, принимающая ScheduledJob
+        self.handlers = {}
+        self.task = None
+        self.wakeup = None
+
+    def load(self):
+        """Восстанавливает задачи из хранилища"""
+        if self.storage is None:
+            return
+        try:
+            stored = self.storage.load_scheduled_jobs()
+        except Exception as e:
+            logger.error(f"Ошибка при загрузке запланированных задач: {e}")
+            return
+        for item in stored:
+            job = ScheduledJob(item['id'], float(item['due']), item['kind'], item.get('payload') or {})
+            self.jobs[job.job_id] = job
+            self.heap.append((job.due, next(self.counter), job))
+        heapq.heapify(self.heap)
+
+    def register(self, kind, handler):
+        """Назначает обработчик задач типа kind (повторная регистрация заменяет обработчик)"""
+        self.handlers[kind] = handler
+
+    def schedule(self, kind, due, payload=None, job_id=None):
+        """Планирует задачу на время due (Unix time); задача с тем же job_id заменяется"""
+        job = ScheduledJob(job_id or secrets.token_hex(3), float(due), kind, payload or {})
+        earliest = self.peek()
+        self.jobs[job.job_id] = job
+        heapq.heappush(self.heap, (job.due, next(self.counter), job))
+        if len(self.heap) > 2 * len(self.jobs) + 16:
+            # Замененных задач в глубине кучи накопилось больше, чем актуальных - перестраиваем ее
+            self.heap = [entry for entry in self.heap if self.jobs.get(entry[2].job_id) is entry[2]]
+            heapq.heapify(self.heap)
+        self.persist(job)
+        if self.wakeup is not None and (earliest is None or job.due < earliest.due):
+            self.wakeup.set()
+        return job
+
+    def cancel(self, job_id):
+        """Отменяет задачу; возвращает False, если такой задачи нет"""
+        job = self.jobs.pop(job_id, None)
+        if job is None:
+            return False
+        self.forget(job)
+        return True
+
+    def pending(self, kind=None):
+        """Возвращает запланированные задачи (при указании kind - только этого типа) по времени выполнения"""
+        jobs = [job for job in self.jobs.values() if kind is None or job.kind == kind]
+        return sorted(jobs, key=lambda job: job.due)
+
+    def peek(self):
+        """Возвращает ближайшую задачу, попутно убирая из вершины кучи отмененные"""
+        while self.heap:
+            job = self.heap[0][2]
+            if self.jobs.get(job.job_id) is job:
+                return job
+            heapq.heappop(self.heap)
+        return None
+
+    def persist(self, job):
+        if self.storage is None:
+            return
+        try:
+            self.storage.save_scheduled_job({'id': job.job_id, 'due': job.due, 'kind': job.kind, 'payload': job.payload})
+        except Exception as e:
+            logger.error(f"Ошибка при сохранении запланированной задачи {job.job_id}: {e}")
+
+    def forget(self, job):
+        if self.storage is None:
+            return
+        try:
+            self.storage.delete_scheduled_job(job.job_id)
+        except Exception as e:
+            logger.error(f"Ошибка при удалении запланированной задачи {job.job_id}: {e}")
+
+    def start(self):
+        """Запускает фоновую задачу планировщика (повторный вызов ничего не делает)"""
+        if self.task is None:
+            self.wakeup = asyncio.Event()
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    def stop(self):
+        """Останавливает фоновую задачу; запланированные задачи остаются в хранилище"""
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+            self.wakeup = None
+
+    async def run(self):
+        while True:
+            job = self.peek()
+            delay = job.due - time.time() if job is not None else None
+            if delay is None or delay > 0:
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self.heap)
+            del self.jobs[job.job_id]
+            self.forget(job)
+            if -delay > self.missed_grace:
+                logger.warning(f"Задача {job.job_id} ({job.kind}) пропущена: опоздание {-delay:.0f} с")
+                continue
+            await self.execute(job)
+
+    async def execute(self, job):
+        handler = self.handlers.get(job.kind)
+        if handler is None:
+            logger.error(f"Нет обработчика для задачи {job.job_id} типа {job.kind}")
+            return
+        try:
+            await handler(job)
+        except Exception as e:
+            logger.error(f"Ошибка при выполнении задачи {job.job_id} ({job.kind}): {e}", exc_info=e)
+
+
+def get_scheduler(bot):
+    """Возвращает общий для бота планировщик, создавая его и восстанавливая задачи при первом обращении"""
+    scheduler = getattr(bot, 'scheduler', None)
+    if scheduler is None:
+        scheduler = Scheduler(get_storage(bot))
+        scheduler.load()
+        bot.scheduler = scheduler
+    return scheduler
@@ -0,0 +1,165 @@
+import re
+import math
+import heapq
+from collections import Counter
+
+# Слова, которые не несут смысла при поиске
+STOP_WORDS = frozenset([
+    'и', 'в', 'во', 'не', 'на', 'с', 'со', 'по', 'к', 'ко', 'у', 'о', 'об', 'от', 'до', 'из',
+    'за', 'для', 'как', 'что', 'это', 'то', 'а', 'но', 'или', 'же', 'ли', 'бы', 'при', 'над',
+    'под', 'так', 'его', 'ее', 'их', 'все', 'вы', 'мы', 'он', 'она', 'они', 'оно', 'я', 'ты',
+    'the', 'a', 'an', 'of', 'to', 'in', 'and', 'or', 'is', 'for', 'on'
+])
+
+# Окончания русских слов, отсекаемые при упрощенном стемминге (от длинных к коротким)
+RUSSIAN_ENDINGS = sorted([
+    'иями', 'ями', 'ами', 'иях', 'ях', 'ах', 'ией', 'ием',
+    'ого', 'его', 'ому', 'ему', 'ыми', 'ими', 'ая', 'яя', 'ое', 'ее', 'ые', 'ие', 'ый', 'ий', 'ой',
+    'ую', 'юю', 'ых', 'их', 'ым', 'им', 'ом', 'ем', 'ей', 'ов', 'ев', 'ам', 'ям',
+    'ать', 'ять', 'ить', 'еть', 'ыть', 'уть', 'ться', 'тся', 'ешь', 'ете', 'ишь', 'ите', 'ет', 'ит',
+    'ют', 'ут', 'ат', 'ят', 'ал', 'ял', 'ил', 'ел',
+    'ость', 'ости', 'ение', 'ения', 'ений', 'ании', 'ание', 'ания',
+    'а', 'я', 'о', 'е', 'ы', 'и', 'у', 'ю', 'ь', 'й'
+], key=len, reverse=True)
+
+# Минимальная длина основы после отсечения окончания
+MIN_STEM_LENGTH = 3
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+CYRILLIC_PATTERN = re.compile(r'[а-я]')
+
+
+def stem(word):
+    """Упрощенный стемминг: отсекает типичное окончание русского или английского слова"""
+    if CYRILLIC_PATTERN.search(word):
+        for ending in RUSSIAN_ENDINGS:
+            if word.endswith(ending) and len(word) - len(ending) >= MIN_STEM_LENGTH:
+                return word[:-len(ending)]
+        return word
+
+    for ending in ('ing', 'es', 'ed', 's'):
+        if word.endswith(ending) and len(word) - len(ending) >= MIN_STEM_LENGTH:
+            return word[:-len(ending)]
+    return word
+
+
+def tokenize(text):
+    """Разбивает текст на нормализованные основы слов (нижний регистр, ё -> е, без стоп-слов)"""
+    if not text:
+        return []
+    text = text.lower().replace('ё', 'е')
+    return [stem(token) for token in TOKEN_PATTERN.findall(text)
+            if len(token) > 1 and token not in STOP_WORDS and not token.isdigit()]
+
+
+class GuideSearchIndex:
+    """Инвертированный индекс по гайдам и их разделам
+
+    Документ индекса - это гайд целиком (название, описание, содержание)
+    или отдельный раздел гайда. Ключ документа: (ID гайда, индекс раздела),
+    для самого гайда индекс раздела равен None.
+    Индекс обновляется инкрементально при добавлении и удалении гайдов и разделов.
+    """
+
+    # Веса полей при ранжировании
+    TITLE_WEIGHT = 3
+    DESCRIPTION_WEIGHT = 2
+    CONTENT_WEIGHT = 1
+
+    def __init__(self):
+        # Основа слова -> {ключ документа: взвешенная частота}
+        self.postings = {}
+        # Ключ документа -> Counter основ (нужен для удаления документа из индекса)
+        self.documents = {}
+        # ID гайда -> множество ключей его документов
+        self.guide_documents = {}
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add_document(self, doc_key, fields):
+        """Добавляет документ; fields - список пар (текст, вес)"""
+        terms = Counter()
+        for text, weight in fields:
+            for term in tokenize(text):
+                terms[term] += weight
+
+        if doc_key in self.documents:
+            self.remove_document(doc_key)
+
+        self.documents[doc_key] = terms
+        self.guide_documents.setdefault(doc_key[0], set()).add(doc_key)
+        for term, weight in terms.items():
+            self.postings.setdefault(term, {})[doc_key] = weight
+
+    def remove_document(self, doc_key):
+        """Удаляет документ из индекса"""
+        terms = self.documents.pop(doc_key, None)
+        if terms is None:
+            return
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(doc_key, None)
+            if not posting:
+                del self.postings[term]
+
+        guide_docs = self.guide_documents.get(doc_key[0])
+        if guide_docs is not None:
+            guide_docs.discard(doc_key)
+            if not guide_docs:
+                del self.guide_documents[doc_key[0]]
+
+    def add_guide(self, guide_id, guide):
+        """Индексирует гайд и все его разделы"""
+        self.add_document((guide_id, None), [
+            (guide.get('title', ''), self.TITLE_WEIGHT),
+            (guide.get('short_description') or guide.get('description', ''), self.DESCRIPTION_WEIGHT),
+            (guide.get('content', ''), self.CONTENT_WEIGHT)
+        ])
+        for section_index, section in enumerate(guide.get('sections', [])):
+            self.add_section(guide_id, section_index, section)
+
+    def add_section(self, guide_id, section_index, section):
+        """Индексирует один раздел гайда"""
+        self.add_document((guide_id, section_index), [
+            (section.get('title', ''), self.TITLE_WEIGHT),
+            (section.get('content', ''), self.CONTENT_WEIGHT)
+        ])
+
+    def remove_guide(self, guide_id):
+        """Удаляет из индекса гайд и все его разделы"""
+        for doc_key in list(self.guide_documents.get(guide_id, ())):
+            self.remove_document(doc_key)
+
+    def search(self, query, limit=10):
+        """Ищет документы по запросу
+
+        Возвращает список (оценка, ID гайда, индекс раздела) по убыванию оценки.
+        Учитываются только основы из запроса, поэтому стоимость поиска зависит
+        от длины списков вхождений, а не от общего числа документов.
+        """
+        query_terms = set(tokenize(query))
+        if not query_terms or not self.documents:
+            return []
+
+        total_documents = len(self.documents)
+        scores = Counter()
+        matched_terms = Counter()
+        for term in query_terms:
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + total_documents / len(posting))
+            for doc_key, weight in posting.items():
+                scores[doc_key] += (1 + math.log(weight)) * idf
+                matched_terms[doc_key] += 1
+
+        # Документы, содержащие больше слов запроса, ранжируются выше
+        ranked = heapq.nlargest(
+            limit,
+            scores.items(),
+            key=lambda item: (matched_terms[item[0]], item[1])
+        )
+        return [(score, doc_key[0], doc_key[1]) for doc_key, score in ranked]
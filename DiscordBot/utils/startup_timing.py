@@ -0,0 +1,84 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger('discord_bot')
+
+# Названия этапов запуска в отчете
+CATEGORY_NAMES = {
+    'import': "Импорт модулей",
+    'extension': "Загрузка расширений",
+    'cog': "Инициализация cogs",
+    'data': "Загрузка данных",
+    'startup': "Этапы запуска"
+}
+
+
+class StartupTimer:
+    """Сбор времени этапов запуска бота: импорты, расширения, cogs, загрузка данных
+
+    Замеры принимаются только до события on_ready, поэтому перезагрузка данных
+    во время работы бота не искажает отчет о холодном старте.
+    """
+
+    def __init__(self, started_at=None):
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.records = []
+        self.ready_at = None
+        self.lock = threading.Lock()
+
+    @property
+    def finished(self):
+        return self.ready_at is not None
+
+    def record(self, category, name, duration):
+        if self.finished:
+            return
+        with self.lock:
+            self.records.append((category, name, duration))
+
+    @contextmanager
+    def measure(self, category, name):
+        """Замеряет время выполнения блока кода"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(category, name, time.perf_counter() - start)
+
+    def mark_ready(self):
+        """Фиксирует момент готовности (on_ready); возвращает False, если он уже зафиксирован"""
+        if self.finished:
+            return False
+        self.ready_at = time.perf_counter()
+        return True
+
+    @property
+    def total(self):
+        end = self.ready_at if self.ready_at is not None else time.perf_counter()
+        return end - self.started_at
+
+    def report(self, budget=None):
+        """Формирует текстовый отчет о времени запуска"""
+        lines = []
+        for category, title in CATEGORY_NAMES.items():
+            records = [record for record in self.records if record[0] == category]
+            if not records:
+                continue
+            lines.append(f"{title}:")
+            for _, name, duration in sorted(records, key=lambda record: record[2], reverse=True):
+                lines.append(f"  {name:<32} {duration * 1000:8.1f} мс")
+
+        state = "до on_ready" if self.finished else "запуск еще не завершен"
+        lines.append(f"Всего ({state}): {self.total * 1000:.1f} мс")
+        if budget:
+            if self.total > budget:
+                lines.append(f"⚠️ Превышен бюджет запуска {budget:.1f} с")
+            else:
+                lines.append(f"Бюджет запуска: {budget:.1f} с")
+        return "\n".join(lines)
+
+
+# Общий таймер процесса: замеры начинаются до создания бота, поэтому он не хранится в объекте бота
+startup_timer = StartupTimer()
@@ -0,0 +1,148 @@
+import json
+import time
+import logging
+import asyncio
+import aiohttp
+
+logger = logging.getLogger('discord_bot')
+
+class StatusClient:
+    """Клиент API статуса игрового сервера (StatusMod)
+
+    Поддерживает условные запросы: клиент запоминает ETag последнего ответа
+    и отправляет его в заголовке If-None-Match. Если состояние сервера не изменилось,
+    сервер отвечает 304 и клиент сообщает, что данные не изменились.
+
+    В режиме дельт клиент передает параметр since=<версия>, и сервер возвращает
+    только добавленных и ушедших игроков относительно этой версии.
+    """
+
+    def __init__(self, url, timeout=30, use_delta=True):
+        self.url = url
+        self.timeout = timeout
+        self.use_delta = use_delta
+        self.session = None
+
+        # Последний полученный ETag и версия состояния
+        self.etag = None
+        self.version = None
+
+        # Последний полный (нормализованный) ответ сервера, к которому применяются дельты
+        self.snapshot = None
+
+        # Время (time.monotonic) последнего успешного ответа сервера
+        self.last_success = None
+
+    async def get_session(self):
+        """Возвращает HTTP сессию, создавая ее при первом обращении"""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession()
+        return self.session
+
+    async def close(self):
+        """Закрывает HTTP сессию"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    def reset(self):
+        """Сбрасывает сохраненную версию, чтобы следующий запрос вернул полное состояние"""
+        self.etag = None
+        self.version = None
+        self.snapshot = None
+
+    @staticmethod
+    def normalize(data):
+        """Исправляет несогласованные ответы сервера"""
+        # Если в ответе есть игроки, но статус "offline", исправляем на "online"
+        if (not data.get('online', False) and
+            (data.get('players') and len(data.get('players', [])) > 0 or
+             data.get('playerCount', 0) > 0)):
+            data['online'] = True
+            logger.info("Сервер вернул статус 'offline', но есть игроки онлайн. Исправлено на 'online'.")
+        return data
+
+    def apply_delta(self, delta):
+        """Применяет дельту к последнему полному ответу и возвращает новое состояние"""
+        removed = set(delta.get('removed', []))
+        players = [player for player in self.snapshot.get('players', []) if player not in removed]
+        players.extend(player for player in delta.get('added', []) if player not in players)
+
+        data = dict(self.snapshot)
+        for key, value in delta.items():
+            if key not in ('delta', 'added', 'removed', 'baseVersion'):
+                data[key] = value
+        data['players'] = players
+        data['playerCount'] = len(players)
+        return data
+
+    async def read_json(self, response):
+        """Декодирует JSON из ответа, даже если Content-Type указан неверно"""
+        content_type = response.headers.get('Content-Type', '').lower()
+        logger.debug(f"Content-Type ответа: {content_type}")
+
+        if 'application/json' in content_type:
+            return await response.json(content_type=None)
+
+        # Считываем текст и пробуем вручную декодировать JSON
+        text = await response.text()
+        logger.info(f"Получен ответ не в формате JSON. Content-Type: {content_type}")
+        logger.debug(f"Текст ответа: {text[:200]}")
+        return json.loads(text)
+
+    async def fetch(self):
+        """Запрашивает статус сервера
+
+        Возвращает кортеж (data, changed). Если сервер ответил 304,
+        возвращается (последнее состояние, False) и обработку можно пропустить.
+        """
+        headers = {}
+        params = {}
+        if self.etag and self.snapshot is not None:
+            headers['If-None-Match'] = self.etag
+            if self.use_delta and self.version:
+                params['since'] = self.version
+
+        try:
+            session = await self.get_session()
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            async with session.get(self.url, headers=headers, params=params, timeout=timeout) as response:
+                if response.status == 304:
+                    self.last_success = time.monotonic()
+                    return self.snapshot, False
+
+                if response.status != 200:
+                    logger.info(f"Ошибка получения статуса сервера. Статус: {response.status}")
+                    self.reset()
+                    return {'online': False}, True
+
+                try:
+                    data = await self.read_json(response)
+                except (json.JSONDecodeError, aiohttp.ContentTypeError) as e:
+                    logger.error(f"Не удалось распарсить ответ как JSON: {e}")
+                    self.reset()
+                    return {'online': False}, True
+
+                # Полная диагностика данных от сервера
+                logger.debug(f"Ответ от сервера: {data}")
+
+                if data.get('delta') and self.snapshot is not None:
+                    data = self.apply_delta(data)
+
+                data = self.normalize(data)
+
+                # Запоминаем версию только для ответов, которые ее поддерживают
+                self.etag = response.headers.get('ETag')
+                self.version = data.get('version')
+                self.snapshot = data
+                self.last_success = time.monotonic()
+                return data, True
+        except aiohttp.ClientConnectorError:
+            logger.info("Не удалось подключиться к серверу. Сервер оффлайн или недоступен.")
+        except asyncio.TimeoutError:
+            logger.info("Таймаут при получении статуса сервера.")
+        except Exception as e:
+            logger.error(f"Ошибка при получении статуса сервера: {e}")
+
+        self.reset()
+        return {'online': False}, True
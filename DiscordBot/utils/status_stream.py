@@ -0,0 +1,124 @@
+import json
+import logging
+import asyncio
+import aiohttp
+
+logger = logging.getLogger('discord_bot')
+
+class StatusStream:
+    """Постоянное потоковое соединение (Server-Sent Events) с API статуса StatusMod
+
+    По одному соединению приходят снимки статуса (event: status) и уведомления
+    (event: notification). При обрыве клиент переподключается с экспоненциальной
+    задержкой и передает Last-Event-ID, чтобы сервер дослал пропущенные события.
+    """
+
+    def __init__(self, url, on_event, max_reconnect_delay=60, read_timeout=90):
+        self.url = url
+        # Корутина on_event(имя_события, данные) вызывается для каждого события
+        self.on_event = on_event
+        self.max_reconnect_delay = max(1, max_reconnect_delay)
+        # Сервер отправляет keepalive каждые 30 секунд, поэтому долгое молчание означает обрыв
+        self.read_timeout = read_timeout
+
+        self.last_event_id = None
+        self.connected = False
+        self.session = None
+
+    async def close(self):
+        """Закрывает HTTP сессию"""
+        self.connected = False
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    async def run(self):
+        """Поддерживает соединение, пока задача не будет отменена"""
+        delay = 1
+        while True:
+            received = False
+            try:
+                received = await self.listen()
+            except asyncio.CancelledError:
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.info(f"Потоковое соединение со статусом сервера недоступно: {e}")
+            except Exception as e:
+                logger.error(f"Ошибка в потоковом соединении со статусом сервера: {e}")
+            finally:
+                self.connected = False
+
+            # После успешного соединения переподключаемся быстро, иначе увеличиваем задержку
+            delay = 1 if received else min(delay * 2, self.max_reconnect_delay)
+            await asyncio.sleep(delay)
+
+    async def listen(self):
+        """Открывает соединение и обрабатывает события до его закрытия
+
+        Возвращает True, если было получено хотя бы одно событие.
+        """
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession()
+
+        headers = {'Accept': 'text/event-stream'}
+        if self.last_event_id:
+            headers['Last-Event-ID'] = self.last_event_id
+
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=self.read_timeout)
+        received = False
+        async with self.session.get(self.url, headers=headers, timeout=timeout) as response:
+            content_type = response.headers.get('Content-Type', '').lower()
+            if response.status != 200 or 'text/event-stream' not in content_type:
+                logger.info(f"Сервер не поддерживает потоковый канал (статус {response.status}, {content_type})")
+                return False
+
+            self.connected = True
+            logger.warning("Установлено потоковое соединение со статусом сервера")
+
+            event_id = None
+            event_name = 'message'
+            data_lines = []
+            async for raw_line in response.content:
+                line = raw_line.decode('utf-8').rstrip('\r\n')
+
+                # Пустая строка завершает событие
+                if not line:
+                    if data_lines:
+                        if event_id:
+                            self.last_event_id = event_id
+                        await self.dispatch(event_name, '\n'.join(data_lines))
+                        received = True
+                    event_id = None
+                    event_name = 'message'
+                    data_lines = []
+                    continue
+
+                # Комментарии (keepalive) пропускаем
+                if line.startswith(':'):
+                    continue
+
+                field, _, value = line.partition(':')
+                if value.startswith(' '):
+                    value = value[1:]
+
+                if field == 'id':
+                    event_id = value
+                elif field == 'event':
+                    event_name = value
+                elif field == 'data':
+                    data_lines.append(value)
+
+        return received
+
+    async def dispatch(self, event_name, raw_data):
+        """Декодирует данные события и передает их обработчику"""
+        try:
+            data = json.loads(raw_data)
+        except json.JSONDecodeError as e:
+            logger.error(f"Некорректные данные в событии потока '{event_name}': {e}")
+            return
+
+        try:
+            await self.on_event(event_name, data)
+        except Exception as e:
+            logger.error(f"Ошибка при обработке события потока '{event_name}': {e}")
@@ -0,0 +1,764 @@
+import os
+import abc
+import copy
+import json
+import logging
+import threading
+from datetime import datetime
+from config import Config
+from utils.startup_timing import startup_timer
+
+logger = logging.getLogger('discord_bot')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+
+# Файлы данных в формате JSON
+GUIDES_FILE = 'guides.json'
+STATUS_FILE = 'server_status.json'
+SCHEDULE_FILE = 'scheduled_jobs.json'
+SUBSCRIPTIONS_FILE = 'subscriptions.json'
+AVAILABILITY_FILE = 'availability.json'
+MESSAGE_FILES = {
+    'storm': 'storm_messages.json',
+    'season': 'season_messages.json'
+}
+
+
+def default_server_status():
+    """Структура статуса сервера по умолчанию"""
+    return {
+        "server": {
+            "online": False,
+            "player_count": 0,
+            "max_players": Config.DEFAULT_MAX_PLAYERS,
+            "last_checked": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "players": []
+        },
+        "manual_maintenance": {
+            "active": False,
+            "reason": ""
+        }
+    }
+
+
+def assign_guide_ids(guides):
+    """Назначает постоянные ID гайдам, у которых их нет (ID не меняются при удалении других гайдов)"""
+    next_id = max((guide.get('id') or 0 for guide in guides), default=0) + 1
+    for guide in guides:
+        if not guide.get('id'):
+            guide['id'] = next_id
+            next_id += 1
+
+
+def write_json_file(file_path, data):
+    """Записывает JSON через временный файл, чтобы не оставить частично записанный файл"""
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, file_path)
+
+
+def read_json_file(file_path):
+    """Читает JSON файл; возвращает None, если файла нет"""
+    if not os.path.exists(file_path):
+        return None
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class StorageBackend(abc.ABC):
+    """Интерфейс хранилища данных бота
+
+    Все изменения передаются хранилищу точечными операциями (добавить гайд,
+    добавить раздел, изменить статус и т.д.), чтобы хранилище могло записывать
+    только измененные данные, а не перезаписывать все целиком. Хранилище, в
+    котором не реализована какая-либо операция, нельзя создать.
+    """
+
+    name = 'base'
+
+    # Гайды
+    @abc.abstractmethod
+    def load_guides(self):
+        """Возвращает {"guides": [...]} с разделами в порядке добавления"""
+
+    @abc.abstractmethod
+    def insert_guide(self, guide):
+        """Добавляет гайд (вместе с ID) в конец списка"""
+
+    @abc.abstractmethod
+    def insert_section(self, guide_id, section_index, section):
+        """Вставляет раздел перед разделом с номером section_index (как list.insert)"""
+
+    @abc.abstractmethod
+    def delete_guide(self, guide_id):
+        """Удаляет гайд вместе с его разделами"""
+
+    # Сообщения о штормах и сезонах
+    @abc.abstractmethod
+    def load_messages(self, kind):
+        """Возвращает {ключ: [сообщения]} или None, если данные недоступны"""
+
+    @abc.abstractmethod
+    def messages_token(self, kind):
+        """Значение, которое меняется при внешнем изменении сообщений типа"""
+
+    @abc.abstractmethod
+    def insert_message(self, kind, key, text):
+        """Добавляет сообщение в конец списка сообщений ключа"""
+
+    @abc.abstractmethod
+    def delete_messages(self, kind, key, index=None):
+        """Удаляет сообщение по индексу или все сообщения ключа, если индекс не указан"""
+
+    @abc.abstractmethod
+    def replace_messages(self, kind, messages):
+        """Заменяет все сообщения типа"""
+
+    # Статус сервера
+    @abc.abstractmethod
+    def load_status(self):
+        """Возвращает статус в формате server_status.json"""
+
+    @abc.abstractmethod
+    def save_status_section(self, section, value):
+        """Сохраняет один раздел статуса (например, "server")"""
+
+    @abc.abstractmethod
+    def save_maintenance(self, active, reason):
+        """Сохраняет режим технического обслуживания"""
+
+    @abc.abstractmethod
+    def append_status_history(self, online, player_count, checked_at=None):
+        """Добавляет запись в историю статуса сервера"""
+
+    # Запланированные задачи
+    @abc.abstractmethod
+    def load_scheduled_jobs(self):
+        """Возвращает список задач [{"id", "due", "kind", "payload"}]"""
+
+    @abc.abstractmethod
+    def save_scheduled_job(self, job):
+        """Добавляет задачу или заменяет задачу с тем же ID"""
+
+    @abc.abstractmethod
+    def delete_scheduled_job(self, job_id):
+        """Удаляет задачу по ID"""
+
+    # Переходы доступности сервера
+    @abc.abstractmethod
+    def load_availability(self):
+        """Возвращает переходы доступности [(время Unix, online)] по времени; online - True, False или None"""
+
+    @abc.abstractmethod
+    def append_availability(self, at, online):
+        """Добавляет переход доступности"""
+
+    # Подписки на уведомления
+    @abc.abstractmethod
+    def load_subscriptions(self):
+        """Возвращает список подписок [{"topic", "user_id", "dm_channel_id", "failures"}]"""
+
+    @abc.abstractmethod
+    def save_subscriptions(self, subscriptions):
+        """Добавляет подписки или обновляет существующие (ключ - тема и пользователь)"""
+
+    @abc.abstractmethod
+    def delete_subscriptions(self, keys):
+        """Удаляет подписки по списку пар (тема, ID пользователя)"""
+
+    def export_json(self, target_dir):
+        """Выгружает все данные в JSON файлы в формате каталога data/"""
+        os.makedirs(target_dir, exist_ok=True)
+        write_json_file(os.path.join(target_dir, GUIDES_FILE), self.load_guides())
+        for kind, file_name in MESSAGE_FILES.items():
+            write_json_file(os.path.join(target_dir, file_name), self.load_messages(kind) or {})
+        write_json_file(os.path.join(target_dir, STATUS_FILE), self.load_status())
+        write_json_file(os.path.join(target_dir, SCHEDULE_FILE), {"jobs": self.load_scheduled_jobs()})
+        write_json_file(os.path.join(target_dir, SUBSCRIPTIONS_FILE), {"subscriptions": self.load_subscriptions()})
+        write_json_file(
+            os.path.join(target_dir, AVAILABILITY_FILE),
+            {"transitions": [{"at": at, "online": online} for at, online in self.load_availability()]}
+        )
+
+    def close(self):
+        """Завершает работу с хранилищем (вызывается при остановке бота)"""
+        pass
+
+
+class JsonStorage(StorageBackend):
+    """Хранилище в JSON файлах каталога data/ (формат, который редактируется вручную)
+
+    Каждое изменение перезаписывает соответствующий файл целиком.
+    История статуса в этом режиме не ведется.
+    """
+
+    name = 'json'
+
+    def __init__(self, data_dir=DATA_DIR):
+        self.data_dir = data_dir
+        self.lock = threading.Lock()
+        self.guides = None
+
+    def path(self, file_name):
+        return os.path.join(self.data_dir, file_name)
+
+    def _ensure_loaded(self):
+        """Загружает гайды из файла при первом обращении (вызывается под self.lock)"""
+        if self.guides is None:
+            try:
+                self.guides = read_json_file(self.path(GUIDES_FILE)) or {"guides": []}
+            except Exception as e:
+                logger.error(f"Ошибка при загрузке гайдов: {e}")
+                self.guides = {"guides": []}
+            assign_guide_ids(self.guides.setdefault('guides', []))
+
+    def load_guides(self):
+        with self.lock:
+            self._ensure_loaded()
+            return copy.deepcopy(self.guides)
+
+    def write_guides(self):
+        write_json_file(self.path(GUIDES_FILE), self.guides)
+
+    def find_guide(self, guide_id):
+        for guide in self.guides.get('guides', []):
+            if guide.get('id') == guide_id:
+                return guide
+        return None
+
+    def insert_guide(self, guide):
+        with self.lock:
+            self._ensure_loaded()
+            self.guides['guides'].append(copy.deepcopy(guide))
+            self.write_guides()
+
+    def insert_section(self, guide_id, section_index, section):
+        with self.lock:
+            self._ensure_loaded()
+            guide = self.find_guide(guide_id)
+            if guide is None:
+                raise KeyError(f"Гайд {guide_id} не найден")
+            guide.setdefault('sections', []).insert(section_index, dict(section))
+            self.write_guides()
+
+    def delete_guide(self, guide_id):
+        with self.lock:
+            self._ensure_loaded()
+            self.guides['guides'] = [guide for guide in self.guides['guides'] if guide.get('id') != guide_id]
+            self.write_guides()
+
+    def load_messages(self, kind):
+        file_path = self.path(MESSAGE_FILES[kind])
+        try:
+            messages = read_json_file(file_path)
+            if messages is None:
+                logger.warning(f"Файл {file_path} не найден")
+            return messages
+        except Exception as e:
+            logger.error(f"Ошибка при загрузке сообщений типа {kind}: {e}")
+            return None
+
+    def messages_token(self, kind):
+        try:
+            return os.stat(self.path(MESSAGE_FILES[kind])).st_mtime_ns
+        except OSError:
+            return None
+
+    def insert_message(self, kind, key, text):
+        with self.lock:
+            messages = read_json_file(self.path(MESSAGE_FILES[kind])) or {}
+            values = messages.get(key)
+            if values is None:
+                messages[key] = []
+            elif not isinstance(values, list):
+                messages[key] = [values]
+            messages[key].append(text)
+            write_json_file(self.path(MESSAGE_FILES[kind]), messages)
+
+    def delete_messages(self, kind, key, index=None):
+        with self.lock:
+            messages = read_json_file(self.path(MESSAGE_FILES[kind])) or {}
+            if key not in messages:
+                return
+            if index is None or not isinstance(messages[key], list):
+                del messages[key]
+            else:
+                messages[key].pop(index)
+                if not messages[key]:
+                    del messages[key]
+            write_json_file(self.path(MESSAGE_FILES[kind]), messages)
+
+    def replace_messages(self, kind, messages):
+        with self.lock:
+            write_json_file(self.path(MESSAGE_FILES[kind]), messages)
+
+    def load_status(self):
+        try:
+            status = read_json_file(self.path(STATUS_FILE))
+        except Exception as e:
+            logger.error(f"Ошибка при получении текущего статуса сервера: {e}")
+            status = None
+        if not status:
+            return default_server_status()
+        status.setdefault("manual_maintenance", {"active": False, "reason": ""})
+        return status
+
+    def save_status_section(self, section, value):
+        with self.lock:
+            status = self.load_status()
+            status[section] = value
+            write_json_file(self.path(STATUS_FILE), status)
+
+    def save_maintenance(self, active, reason):
+        self.save_status_section("manual_maintenance", {"active": active, "reason": reason})
+
+    def append_status_history(self, online, player_count, checked_at=None):
+        pass
+
+    def load_scheduled_jobs(self):
+        try:
+            data = read_json_file(self.path(SCHEDULE_FILE))
+        except Exception as e:
+            logger.error(f"Ошибка при загрузке запланированных задач: {e}")
+            data = None
+        return (data or {}).get("jobs", [])
+
+    def save_scheduled_job(self, job):
+        with self.lock:
+            jobs = [item for item in self.load_scheduled_jobs() if item.get('id') != job['id']]
+            jobs.append(dict(job))
+            write_json_file(self.path(SCHEDULE_FILE), {"jobs": jobs})
+
+    def delete_scheduled_job(self, job_id):
+        with self.lock:
+            jobs = self.load_scheduled_jobs()
+            remaining = [item for item in jobs if item.get('id') != job_id]
+            if len(remaining) != len(jobs):
+                write_json_file(self.path(SCHEDULE_FILE), {"jobs": remaining})
+
+    def load_availability(self):
+        try:
+            data = read_json_file(self.path(AVAILABILITY_FILE))
+        except Exception as e:
+            logger.error(f"Ошибка при загрузке истории доступности: {e}")
+            data = None
+        return [(item['at'], item['online']) for item in (data or {}).get("transitions", [])]
+
+    def append_availability(self, at, online):
+        # Переходы редки (отказы и восстановления сервера), поэтому файл перезаписывается целиком
+        with self.lock:
+            transitions = [{"at": item_at, "online": item_online} for item_at, item_online in self.load_availability()]
+            transitions.append({"at": at, "online": online})
+            write_json_file(self.path(AVAILABILITY_FILE), {"transitions": transitions})
+
+    def load_subscriptions(self):
+        try:
+            data = read_json_file(self.path(SUBSCRIPTIONS_FILE))
+        except Exception as e:
+            logger.error(f"Ошибка при загрузке подписок: {e}")
+            data = None
+        return (data or {}).get("subscriptions", [])
+
+    def save_subscriptions(self, subscriptions):
+        with self.lock:
+            rows = {(item['topic'], item['user_id']): item for item in self.load_subscriptions()}
+            for item in subscriptions:
+                rows[(item['topic'], item['user_id'])] = dict(item)
+            write_json_file(self.path(SUBSCRIPTIONS_FILE), {"subscriptions": list(rows.values())})
+
+    def delete_subscriptions(self, keys):
+        keys = set(keys)
+        with self.lock:
+            rows = [item for item in self.load_subscriptions() if (item['topic'], item['user_id']) not in keys]
+            write_json_file(self.path(SUBSCRIPTIONS_FILE), {"subscriptions": rows})
+
+
+class SQLiteStorage(StorageBackend):
+    """Хранилище в базе SQLite (журнал WAL)
+
+    Изменения записываются отдельными строками в индексированные таблицы,
+    поэтому стоимость изменения не зависит от общего объема данных.
+    При первом запуске с пустой базой данные однократно импортируются из JSON файлов.
+    """
+
+    name = 'sqlite'
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+        CREATE TABLE IF NOT EXISTS guides (
+            id INTEGER PRIMARY KEY,
+            position INTEGER NOT NULL,
+            title TEXT,
+            description TEXT,
+            content TEXT,
+            image_url TEXT,
+            author TEXT,
+            extra TEXT NOT NULL DEFAULT '{}'
+        );
+        CREATE INDEX IF NOT EXISTS idx_guides_position ON guides(position);
+        CREATE TABLE IF NOT EXISTS sections (
+            guide_id INTEGER NOT NULL REFERENCES guides(id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            title TEXT NOT NULL DEFAULT '',
+            content TEXT NOT NULL DEFAULT '',
+            PRIMARY KEY (guide_id, position)
+        );
+        CREATE TABLE IF NOT EXISTS messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            text TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_messages_kind_key ON messages(kind, key, id);
+        CREATE TABLE IF NOT EXISTS status (
+            section TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS maintenance (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            active INTEGER NOT NULL DEFAULT 0,
+            reason TEXT NOT NULL DEFAULT '',
+            updated_at TEXT NOT NULL DEFAULT ''
+        );
+        CREATE TABLE IF NOT EXISTS status_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            checked_at TEXT NOT NULL,
+            online INTEGER NOT NULL,
+            player_count INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_status_history_checked_at ON status_history(checked_at);
+        CREATE TABLE IF NOT EXISTS scheduled_jobs (
+            id TEXT PRIMARY KEY,
+            due REAL NOT NULL,
+            kind TEXT NOT NULL,
+            payload TEXT NOT NULL DEFAULT '{}'
+        );
+        CREATE TABLE IF NOT EXISTS availability (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            at REAL NOT NULL,
+            online INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS subscriptions (
+            topic TEXT NOT NULL,
+            user_id INTEGER NOT NULL,
+            dm_channel_id INTEGER,
+            failures INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (topic, user_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_subscriptions_user ON subscriptions(user_id);
+    """
+
+    # Поля гайда, хранящиеся в отдельных столбцах (остальные сохраняются в extra)
+    GUIDE_COLUMNS = ('title', 'description', 'content', 'image_url', 'author')
+
+    def __init__(self, db_path, import_dir=DATA_DIR):
+        # sqlite3 нужен только в этом режиме, поэтому импортируется при создании хранилища
+        import sqlite3
+
+        self.db_path = db_path
+        self.lock = threading.RLock()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.connection = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(self.SCHEMA)
+
+        if import_dir and self.get_meta('json_imported') is None:
+            self.import_json(import_dir)
+
+    def execute(self, sql, params=()):
+        """Выполняет изменяющий запрос; строки результата читаются через query"""
+        with self.lock:
+            return self.connection.execute(sql, params)
+
+    def query(self, sql, params=()):
+        """Выполняет запрос и считывает все строки под блокировкой
+
+        Соединение общее для всех потоков: курсор, прочитанный после освобождения
+        блокировки, мог бы вернуть строки незавершенной транзакции другого потока.
+        """
+        with self.lock:
+            return self.connection.execute(sql, params).fetchall()
+
+    def transaction(self):
+        """Контекст транзакции: изменения применяются целиком или не применяются вовсе"""
+        return _Transaction(self)
+
+    def get_meta(self, key):
+        rows = self.query("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0]['value'] if rows else None
+
+    def set_meta(self, key, value):
+        self.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def is_empty(self):
+        for table in ('guides', 'messages', 'status'):
+            if self.query(f"SELECT 1 FROM {table} LIMIT 1"):
+                return False
+        return True
+
+    def import_json(self, source_dir, force=False):
+        """Однократно импортирует данные из JSON файлов; возвращает True, если импорт выполнен"""
+        if not force and not self.is_empty():
+            self.set_meta('json_imported', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            return False
+
+        source = JsonStorage(source_dir)
+        guides = source.load_guides().get('guides', [])
+
+        with self.transaction():
+            if force:
+                for table in ('sections', 'guides', 'messages', 'status', 'maintenance', 'scheduled_jobs', 'subscriptions', 'availability'):
+                    self.execute(f"DELETE FROM {table}")
+
+            for guide in guides:
+                self.insert_guide(guide)
+                for section_index, section in enumerate(guide.get('sections', [])):
+                    self.insert_section(guide['id'], section_index, section)
+
+            for kind in MESSAGE_FILES:
+                self.replace_messages(kind, source.load_messages(kind) or {})
+
+            status = source.load_status()
+            for section, value in status.items():
+                if section != "manual_maintenance":
+                    self.save_status_section(section, value)
+            maintenance = status.get("manual_maintenance", {})
+            self.save_maintenance(maintenance.get("active", False), maintenance.get("reason", ""))
+
+            for job in source.load_scheduled_jobs():
+                self.save_scheduled_job(job)
+            self.save_subscriptions(source.load_subscriptions())
+            for at, online in source.load_availability():
+                self.append_availability(at, online)
+
+            self.set_meta('json_imported', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+        logger.warning(f"Данные импортированы из JSON файлов ({source_dir}) в базу {self.db_path}")
+        return True
+
+    def load_guides(self):
+        # Гайды и разделы читаются в одной транзакции, чтобы они относились к одному состоянию базы
+        with self.transaction():
+            guide_rows = self.query("SELECT * FROM guides ORDER BY position")
+            section_rows = self.query("SELECT guide_id, title, content FROM sections ORDER BY guide_id, position")
+
+        guides = []
+        by_id = {}
+        for row in guide_rows:
+            guide = {'id': row['id']}
+            guide.update(json.loads(row['extra']))
+            for column in self.GUIDE_COLUMNS:
+                # NULL означает, что поля у гайда не было
+                if row[column] is not None:
+                    guide[column] = row[column]
+            guide['sections'] = []
+            guides.append(guide)
+            by_id[row['id']] = guide
+
+        for row in section_rows:
+            guide = by_id.get(row['guide_id'])
+            if guide is not None:
+                guide['sections'].append({'title': row['title'], 'content': row['content']})
+        return {"guides": guides}
+
+    def insert_guide(self, guide):
+        extra = {key: value for key, value in guide.items()
+                 if key not in self.GUIDE_COLUMNS and key not in ('id', 'sections')}
+        with self.lock:
+            position = self.query("SELECT COALESCE(MAX(position), 0) + 1 FROM guides")[0][0]
+            self.execute(
+                "INSERT INTO guides (id, position, title, description, content, image_url, author, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (guide['id'], position, *(guide.get(column) for column in self.GUIDE_COLUMNS),
+                 json.dumps(extra, ensure_ascii=False))
+            )
+
+    def insert_section(self, guide_id, section_index, section):
+        with self.transaction():
+            count = self.query("SELECT COUNT(*) FROM sections WHERE guide_id = ?", (guide_id,))[0][0]
+            # Номер позиции как у list.insert: отрицательный считается с конца, за концом - добавление в конец
+            position = max(0, count + section_index) if section_index < 0 else min(section_index, count)
+            # Последующие разделы сдвигаются через отрицательные позиции, чтобы промежуточные
+            # значения не нарушали первичный ключ (guide_id, position)
+            self.execute(
+                "UPDATE sections SET position = -(position + 1) WHERE guide_id = ? AND position >= ?",
+                (guide_id, position)
+            )
+            self.execute("UPDATE sections SET position = -position WHERE guide_id = ? AND position < 0", (guide_id,))
+            self.execute(
+                "INSERT INTO sections (guide_id, position, title, content) VALUES (?, ?, ?, ?)",
+                (guide_id, position, section.get('title', ''), section.get('content', ''))
+            )
+
+    def delete_guide(self, guide_id):
+        self.execute("DELETE FROM guides WHERE id = ?", (guide_id,))
+
+    def load_messages(self, kind):
+        messages = {}
+        for row in self.query("SELECT key, text FROM messages WHERE kind = ? ORDER BY id", (kind,)):
+            messages.setdefault(row['key'], []).append(row['text'])
+        return messages
+
+    def messages_token(self, kind):
+        # data_version меняется, когда базу изменяет другое соединение (например, утилита миграции)
+        return self.query("PRAGMA data_version")[0][0]
+
+    def insert_message(self, kind, key, text):
+        self.execute("INSERT INTO messages (kind, key, text) VALUES (?, ?, ?)", (kind, key, text))
+
+    def delete_messages(self, kind, key, index=None):
+        if index is None:
+            self.execute("DELETE FROM messages WHERE kind = ? AND key = ?", (kind, key))
+            return
+        self.execute(
+            "DELETE FROM messages WHERE id = ("
+            "SELECT id FROM messages WHERE kind = ? AND key = ? ORDER BY id LIMIT 1 OFFSET ?)",
+            (kind, key, index)
+        )
+
+    def replace_messages(self, kind, messages):
+        with self.transaction():
+            self.execute("DELETE FROM messages WHERE kind = ?", (kind,))
+            for key, values in messages.items():
+                for text in values if isinstance(values, list) else [values]:
+                    self.insert_message(kind, key, text)
+
+    def load_status(self):
+        with self.transaction():
+            status_rows = self.query("SELECT section, value FROM status")
+            maintenance_rows = self.query("SELECT active, reason FROM maintenance WHERE id = 1")
+
+        status = default_server_status()
+        for row in status_rows:
+            status[row['section']] = json.loads(row['value'])
+        if maintenance_rows:
+            row = maintenance_rows[0]
+            status["manual_maintenance"] = {"active": bool(row['active']), "reason": row['reason']}
+        return status
+
+    def save_status_section(self, section, value):
+        self.execute(
+            "INSERT OR REPLACE INTO status (section, value) VALUES (?, ?)",
+            (section, json.dumps(value, ensure_ascii=False))
+        )
+
+    def save_maintenance(self, active, reason):
+        self.execute(
+            "INSERT OR REPLACE INTO maintenance (id, active, reason, updated_at) VALUES (1, ?, ?, ?)",
+            (int(bool(active)), reason or '', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        )
+
+    def append_status_history(self, online, player_count, checked_at=None):
+        self.execute(
+            "INSERT INTO status_history (checked_at, online, player_count) VALUES (?, ?, ?)",
+            (checked_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S"), int(bool(online)), player_count)
+        )
+
+    def load_scheduled_jobs(self):
+        return [
+            {'id': row['id'], 'due': row['due'], 'kind': row['kind'], 'payload': json.loads(row['payload'])}
+            for row in self.query("SELECT id, due, kind, payload FROM scheduled_jobs ORDER BY due")
+        ]
+
+    def save_scheduled_job(self, job):
+        self.execute(
+            "INSERT OR REPLACE INTO scheduled_jobs (id, due, kind, payload) VALUES (?, ?, ?, ?)",
+            (job['id'], job['due'], job['kind'], json.dumps(job.get('payload') or {}, ensure_ascii=False))
+        )
+
+    def delete_scheduled_job(self, job_id):
+        self.execute("DELETE FROM scheduled_jobs WHERE id = ?", (job_id,))
+
+    def load_availability(self):
+        return [
+            (row['at'], None if row['online'] is None else bool(row['online']))
+            for row in self.query("SELECT at, online FROM availability ORDER BY id")
+        ]
+
+    def append_availability(self, at, online):
+        self.execute("INSERT INTO availability (at, online) VALUES (?, ?)", (at, None if online is None else int(bool(online))))
+
+    def load_subscriptions(self):
+        return [
+            dict(row)
+            for row in self.query("SELECT topic, user_id, dm_channel_id, failures FROM subscriptions ORDER BY topic, user_id")
+        ]
+
+    def save_subscriptions(self, subscriptions):
+        with self.transaction():
+            for item in subscriptions:
+                self.execute(
+                    "INSERT OR REPLACE INTO subscriptions (topic, user_id, dm_channel_id, failures) VALUES (?, ?, ?, ?)",
+                    (item['topic'], item['user_id'], item.get('dm_channel_id'), item.get('failures', 0))
+                )
+
+    def delete_subscriptions(self, keys):
+        with self.transaction():
+            for topic, user_id in keys:
+                self.execute("DELETE FROM subscriptions WHERE topic = ? AND user_id = ?", (topic, user_id))
+
+    def close(self):
+        with self.lock:
+            # Переносим журнал WAL в основной файл базы, чтобы после остановки база была самодостаточной
+            try:
+                self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except Exception as e:
+                logger.error(f"Ошибка при сбросе журнала WAL: {e}")
+            self.connection.close()
+
+
+class _Transaction:
+    """Транзакция SQLite; вложенные транзакции выполняются в рамках внешней"""
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.outer = False
+
+    def __enter__(self):
+        self.storage.lock.acquire()
+        self.outer = not self.storage.connection.in_transaction
+        if self.outer:
+            self.storage.connection.execute("BEGIN")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self.outer:
+                self.storage.connection.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.storage.lock.release()
+        return False
+
+
+def resolve_sqlite_path(path=None):
+    """Возвращает абсолютный путь к базе SQLite (относительные пути считаются от каталога бота)"""
+    path = path or Config.SQLITE_PATH
+    return path if os.path.isabs(path) else os.path.join(BASE_DIR, path)
+
+
+def create_storage(backend=None):
+    """Создает хранилище по настройкам (STORAGE_BACKEND, SQLITE_PATH)"""
+    backend = (backend or Config.STORAGE_BACKEND).lower()
+    if backend == 'sqlite':
+        return SQLiteStorage(resolve_sqlite_path())
+    if backend != 'json':
+        logger.error(f"Неизвестный тип хранилища '{backend}', используется JSON")
+    return JsonStorage()
+
+
+def get_storage(bot):
+    """Возвращает общее для всех cogs хранилище, создавая его при первом обращении"""
+    storage = getattr(bot, 'storage', None)
+    if storage is None:
+        with startup_timer.measure('data', f"storage ({Config.STORAGE_BACKEND})"):
+            storage = create_storage()
+        bot.storage = storage
+    return storage
@@ -0,0 +1,133 @@
+import random
+import string
+
+# Подстановки, доступные в шаблонах сообщений
+TEMPLATE_FIELDS = {
+    'game_time': "игровое время из уведомления",
+    'player_count': "количество игроков онлайн",
+    'max_players': "максимальное количество игроков",
+    'server': "название сервера",
+    'season': "название сезона"
+}
+
+_formatter = string.Formatter()
+
+
+class TemplateError(ValueError):
+    """Ошибка в шаблоне сообщения"""
+    pass
+
+
+class MessageTemplate:
+    """Скомпилированный шаблон сообщения
+
+    Текст разбирается один раз: шаблон хранится как кортеж частей, где литеральный
+    текст чередуется с именами подстановок. Отрисовка - это только склейка строк,
+    поэтому она не может завершиться ошибкой разбора.
+    """
+
+    __slots__ = ('source', 'parts', 'fields')
+
+    def __init__(self, source, parts):
+        self.source = source
+        # Части шаблона: (литерал, имя подстановки или None)
+        self.parts = parts
+        self.fields = frozenset(field for _, field in parts if field)
+
+    def __str__(self):
+        return self.source
+
+    def __repr__(self):
+        return f"MessageTemplate({self.source!r})"
+
+    def render(self, context=None):
+        """Подставляет значения из context; отсутствующие подстановки заменяются пустой строкой"""
+        if not self.fields:
+            return self.parts[0][0] if self.parts else ''
+
+        context = context or {}
+        chunks = []
+        for literal, field in self.parts:
+            chunks.append(literal)
+            if field:
+                value = context.get(field)
+                chunks.append('' if value is None else str(value))
+        return ''.join(chunks)
+
+
+def compile_template(text):
+    """Компилирует текст сообщения в шаблон
+
+    Разрешены только подстановки вида {имя} из TEMPLATE_FIELDS; фигурные скобки
+    в обычном тексте записываются как {{ и }}. При ошибке выбрасывается TemplateError.
+    """
+    if not isinstance(text, str):
+        raise TemplateError("Сообщение должно быть строкой")
+
+    try:
+        parsed = list(_formatter.parse(text))
+    except ValueError as e:
+        raise TemplateError(f"Некорректные фигурные скобки в шаблоне: {e}")
+
+    parts = []
+    for literal, field, format_spec, conversion in parsed:
+        if field is None:
+            parts.append((literal, None))
+            continue
+        if field not in TEMPLATE_FIELDS:
+            allowed = ', '.join(f"{{{name}}}" for name in TEMPLATE_FIELDS)
+            if not field:
+                raise TemplateError(f"Пустая подстановка {{}} в шаблоне. Доступные подстановки: {allowed}")
+            raise TemplateError(f"Неизвестная подстановка {{{field}}}. Доступные подстановки: {allowed}")
+        if format_spec or conversion:
+            raise TemplateError(f"Форматирование подстановки {{{field}}} не поддерживается")
+        parts.append((literal, field))
+
+    # Соседние литералы объединяем, чтобы отрисовка склеивала минимум частей
+    merged = []
+    for literal, field in parts:
+        if merged and merged[-1][1] is None:
+            merged[-1] = (merged[-1][0] + literal, field)
+        else:
+            merged.append((literal, field))
+    return MessageTemplate(text, tuple(merged or [('', None)]))
+
+
+def literal_template(text):
+    """Шаблон, выводящий текст как есть (для сообщений с ошибками в шаблоне)"""
+    return MessageTemplate(text, ((text, None),))
+
+
+class ShuffleBag:
+    """Мешок для случайного выбора без повторов
+
+    Элементы выдаются в случайном порядке, и ни один не повторяется, пока
+    не будут выданы все. После этого мешок перемешивается заново, причем первым
+    не может оказаться последний выданный элемент. Выбор стоит O(1) в среднем:
+    перемешивание за O(n) выполняется один раз на n выборов.
+    """
+
+    __slots__ = ('items', 'order', 'position', 'last')
+
+    def __init__(self, items):
+        self.items = items
+        self.order = list(range(len(items)))
+        self.position = len(self.order)
+        # Индекс последнего выданного элемента
+        self.last = None
+
+    def draw(self):
+        if not self.items:
+            return None
+
+        if self.position >= len(self.order):
+            random.shuffle(self.order)
+            # Не допускаем повтора на границе двух перемешиваний
+            if len(self.order) > 1 and self.order[0] == self.last:
+                swap_index = random.randrange(1, len(self.order))
+                self.order[0], self.order[swap_index] = self.order[swap_index], self.order[0]
+            self.position = 0
+
+        self.last = self.order[self.position]
+        self.position += 1
+        return self.items[self.last]
@@ -0,0 +1,101 @@
+class _TrieNode:
+    __slots__ = ('children', 'values')
+
+    def __init__(self):
+        self.children = {}
+        # Значения, ключ которых заканчивается в этом узле
+        self.values = None
+
+
+class PrefixTrie:
+    """Префиксное дерево для автодополнения
+
+    Одно значение может быть доступно по нескольким ключам (например, гайд -
+    по названию и по каждому слову названия). Дерево изменяется инкрементально:
+    add() добавляет ключи значения, discard() удаляет все ключи значения и пустые узлы.
+    Поиск спускается по префиксу и обходит только его поддерево, останавливаясь,
+    как только набрано нужное количество значений.
+    """
+
+    def __init__(self):
+        self.root = _TrieNode()
+        # Значение -> множество его ключей (нужно для удаления значения)
+        self.keys_by_value = {}
+
+    def __len__(self):
+        return len(self.keys_by_value)
+
+    def __contains__(self, value):
+        return value in self.keys_by_value
+
+    @staticmethod
+    def normalize(text):
+        return (text or '').strip().lower().replace('ё', 'е')
+
+    def add(self, value, *keys):
+        """Добавляет значение, доступное по указанным ключам"""
+        value_keys = self.keys_by_value.setdefault(value, set())
+        for key in keys:
+            key = self.normalize(key)
+            if not key or key in value_keys:
+                continue
+            node = self.root
+            for char in key:
+                node = node.children.setdefault(char, _TrieNode())
+            if node.values is None:
+                node.values = {}
+            # dict вместо set сохраняет порядок добавления значений
+            node.values[value] = None
+            value_keys.add(key)
+
+    def discard(self, value):
+        """Удаляет значение по всем его ключам"""
+        for key in self.keys_by_value.pop(value, ()):
+            self._remove_key(key, value)
+
+    def _remove_key(self, key, value):
+        path = [self.root]
+        node = self.root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return
+            path.append(node)
+
+        if node.values is not None:
+            node.values.pop(value, None)
+            if not node.values:
+                node.values = None
+
+        # Удаляем опустевшие узлы снизу вверх
+        for depth in range(len(key), 0, -1):
+            current = path[depth]
+            if current.values is not None or current.children:
+                break
+            del path[depth - 1].children[key[depth - 1]]
+
+    def complete(self, prefix, limit=25):
+        """Возвращает до limit значений, ключи которых начинаются с prefix
+
+        Более короткие ключи (ближе к введенному префиксу) возвращаются первыми.
+        """
+        node = self.root
+        for char in self.normalize(prefix):
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        results = {}
+        level = [node]
+        # Обход в ширину: останавливаемся, как только набрано limit значений
+        while level and len(results) < limit:
+            next_level = []
+            for current in level:
+                if current.values:
+                    for value in current.values:
+                        results.setdefault(value, None)
+                        if len(results) >= limit:
+                            return list(results)
+                next_level.extend(current.children.values())
+            level = next_level
+        return list(results)
@@ -0,0 +1,120 @@
+import re
+import time
+import asyncio
+import logging
+import aiohttp
+from config import Config
+
+logger = logging.getLogger('discord_bot')
+
+# Адрес вебхука Discord: .../api/webhooks/<ID>/<токен>
+WEBHOOK_URL_PATTERN = re.compile(r'/webhooks/(\d+)/([\w-]+)')
+DISCORD_API_BASE = 'https://discord.com/api/v10'
+# Сколько раз повторяется запрос, получивший 429
+MAX_RETRIES = 3
+
+
+class WebhookDelivery:
+    """Отправка уведомлений через вебхуки Discord без подключения бота к шлюзу
+
+    Все вебхуки используют одну HTTP сессию с пулом соединений. Ограничения
+    частоты учитываются по заголовкам X-RateLimit-* отдельно для каждого вебхука:
+    если запросы в текущем окне закончились, следующая отправка ждет его сброса,
+    а запрос, получивший 429, повторяется после retry_after. Отправки в один
+    вебхук выполняются по очереди, в разные - параллельно.
+    """
+
+    def __init__(self, api_base=None, timeout=10, max_connections=5):
+        self.api_base = (api_base or DISCORD_API_BASE).rstrip('/')
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.session = None
+        # ID вебхука -> время (time.monotonic), до которого запросы к нему исчерпаны
+        self.blocked_until = {}
+        self.global_blocked_until = 0.0
+        self.locks = {}
+
+    async def get_session(self):
+        """Возвращает HTTP сессию, создавая ее при первом обращении"""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=max(1, self.max_connections)),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self.session
+
+    async def close(self):
+        """Закрывает HTTP сессию"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    async def wait_for_limit(self, webhook_id):
+        delay = max(self.blocked_until.get(webhook_id, 0.0), self.global_blocked_until) - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def update_limit(self, webhook_id, headers):
+        """Запоминает исчерпание окна по заголовкам ответа"""
+        if headers.get('X-RateLimit-Remaining') != '0':
+            return
+        try:
+            reset_after = float(headers.get('X-RateLimit-Reset-After', '0'))
+        except ValueError:
+            return
+        self.blocked_until[webhook_id] = time.monotonic() + reset_after
+
+    async def send(self, url, embed=None, content=None, mention_roles=False):
+        """Отправляет сообщение через вебхук; возвращает True при успехе"""
+        match = WEBHOOK_URL_PATTERN.search(url or '')
+        if not match:
+            logger.error("Некорректный адрес вебхука")
+            return False
+        webhook_id, token = match.groups()
+        endpoint = f"{self.api_base}/webhooks/{webhook_id}/{token}"
+
+        payload = {'allowed_mentions': {'parse': ['roles'] if mention_roles else []}}
+        if content:
+            payload['content'] = content
+        if embed is not None:
+            payload['embeds'] = [embed.to_dict()]
+
+        async with self.locks.setdefault(webhook_id, asyncio.Lock()):
+            for _ in range(MAX_RETRIES + 1):
+                await self.wait_for_limit(webhook_id)
+                try:
+                    session = await self.get_session()
+                    async with session.post(endpoint, json=payload, params={'wait': 'true'}) as response:
+                        self.update_limit(webhook_id, response.headers)
+                        if response.status == 429:
+                            data = await response.json(content_type=None)
+                            retry_after = float(data.get('retry_after', 1))
+                            if data.get('global'):
+                                self.global_blocked_until = time.monotonic() + retry_after
+                            else:
+                                self.blocked_until[webhook_id] = time.monotonic() + retry_after
+                            logger.warning(f"Превышен лимит запросов вебхука {webhook_id}, повтор через {retry_after:.2f} с")
+                            continue
+                        if response.status >= 400:
+                            text = await response.text()
+                            logger.error(f"Ошибка отправки через вебхук {webhook_id}: {response.status} {text[:200]}")
+                            return False
+                        return True
+                except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                    logger.error(f"Ошибка соединения при отправке через вебхук {webhook_id}: {e!r}")
+                    return False
+        logger.error(f"Не удалось отправить через вебхук {webhook_id}: лимит запросов не сбросился после {MAX_RETRIES} повторов")
+        return False
+
+
+def get_webhook_delivery(bot):
+    """Возвращает общую для бота доставку через вебхуки, создавая ее при первом обращении"""
+    delivery = getattr(bot, 'webhook_delivery', None)
+    if delivery is None:
+        delivery = WebhookDelivery(
+            api_base=Config.DISCORD_API_BASE or None,
+            timeout=Config.REQUEST_TIMEOUT,
+            max_connections=Config.NOTIFICATION_FANOUT_LIMIT
+        )
+        bot.webhook_delivery = delivery
+    return delivery
@@ -0,0 +1,475 @@
+"""Рабочий процесс для приема уведомлений и опроса статуса сервера (режим WORKER_MODE)
+
+Основной процесс держит соединение со шлюзом Discord и отправляет сообщения,
+а рабочий процесс выполняет HTTP сервер уведомлений, опрос API статуса и
+потоковый канал. Всплески нагрузки на прием уведомлений (разбор JSON, проверка
+подписей, потоки HTTP сервера) не задерживают heartbeat шлюза и обработку команд.
+
+Процессы связаны локальным сокетом multiprocessing.connection (Unix сокет,
+в Windows - именованный канал) с ключом аутентификации. Сообщения - кортежи:
+
+рабочий процесс -> основной:
+    ('started', pid)
+    ('status', данные или None, сколько секунд назад был успешный ответ API или None,
+     True, если данные не изменились по ответу 304 на запрос к API)
+    ('notification', уведомление)
+    ('drained',) - прием уведомлений остановлен, все принятые уже отправлены
+    ('log', поля записи журнала)
+основной -> рабочий процесс:
+    ('health', liveness, readiness, необработанных уведомлений) - для /healthz и /readyz
+    ('drain',), ('log_level', уровень), ('stop',)
+
+Рабочий процесс запускается и перезапускается WorkerSupervisor основного процесса;
+если основной процесс завершился, рабочий процесс завершается вслед за ним.
+"""
+import os
+import sys
+import time
+import signal
+import asyncio
+import logging
+import threading
+import subprocess
+from collections import deque
+from multiprocessing.connection import Listener, Client
+from config import Config
+from utils.health import get_health_state
+from utils.logging_setup import get_log_level
+from utils.status_client import StatusClient
+
+logger = logging.getLogger('discord_bot')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Переменная окружения, через которую рабочему процессу передается ключ аутентификации
+AUTHKEY_ENV = 'STATUS_WORKER_AUTHKEY'
+
+# Интервал опроса API статуса (как у задачи status_update_task)
+POLL_INTERVAL = 15
+# Интервал отправки состояния здоровья рабочему процессу (в секундах)
+HEALTH_PUBLISH_INTERVAL = 1
+# Время на подключение запущенного рабочего процесса (в секундах)
+CONNECT_TIMEOUT = 30
+# Если рабочий процесс проработал дольше (в секундах), задержка перезапуска сбрасывается
+STABLE_RUN_TIME = 60
+# Сколько уведомлений хранится, пока cog уведомлений перезагружается
+PENDING_LIMIT = 1000
+
+
+class WorkerChannel:
+    """Соединение между процессами; отправка возможна из нескольких потоков"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.lock = threading.Lock()
+
+    def send(self, message):
+        """Отправляет сообщение; возвращает False, если соединение разорвано"""
+        try:
+            with self.lock:
+                self.conn.send(message)
+            return True
+        except (OSError, EOFError, ValueError):
+            return False
+
+    def close(self):
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+
+
+# Рабочий процесс
+
+# Типы значений полей записи журнала, которые передаются основному процессу как есть
+LOG_FIELD_TYPES = (str, int, float, bool, type(None))
+
+
+class _ChannelLogHandler(logging.Handler):
+    """Передает записи журнала рабочего процесса основному процессу"""
+
+    def __init__(self, channel):
+        super().__init__()
+        self.channel = channel
+
+    def emit(self, record):
+        try:
+            exc_text = record.exc_text
+            if record.exc_info and not exc_text:
+                exc_text = logging.Formatter().formatException(record.exc_info)
+            # Передаются все поля записи, включая extra (event, cog) для JSON журнала;
+            # аргументы уже подставлены в сообщение, а значения, которые нельзя передать, - строками
+            fields = {
+                key: value if isinstance(value, LOG_FIELD_TYPES) else str(value)
+                for key, value in record.__dict__.items()
+                if key not in ('args', 'exc_info', 'msg', 'message')
+            }
+            fields['msg'] = f"[рабочий процесс] {record.getMessage()}"
+            fields['exc_text'] = exc_text
+            self.channel.send(('log', fields))
+        except Exception:
+            self.handleError(record)
+
+
+class RemoteHealth:
+    """Состояние здоровья основного процесса для /healthz и /readyz HTTP сервера рабочего процесса
+
+    Основной процесс присылает результаты проверок каждую секунду. Если они
+    давно не приходили, цикл событий основного процесса завис.
+    """
+
+    def __init__(self, loop_stall=30):
+        self.loop_stall = loop_stall
+        self.started_at = time.monotonic()
+        self.received_at = None
+        self.live = None
+        self.ready = None
+
+    def update(self, live, ready):
+        self.live = live
+        self.ready = ready
+        self.received_at = time.monotonic()
+
+    def stale(self):
+        age = time.monotonic() - (self.received_at if self.received_at is not None else self.started_at)
+        return age > self.loop_stall, round(age, 1)
+
+    def liveness(self):
+        stale, age = self.stale()
+        if stale or self.live is None:
+            return not stale, {'status': 'stalled' if stale else 'starting', 'event_loop_lag': age}
+        return self.live
+
+    def readiness(self):
+        stale, age = self.stale()
+        if stale or self.ready is None:
+            return False, {'status': 'not_ready', 'checks': {'main_process': {'ok': False, 'age': age}}}
+        return self.ready
+
+
+class IngestionForwarder:
+    """Замена cog уведомлений для HTTP сервера рабочего процесса: уведомления пересылаются основному процессу"""
+
+    def __init__(self, channel, limit):
+        self.channel = channel
+        self.limit = limit
+        # Необработанные уведомления основного процесса (уточняется с каждым сообщением health)
+        self.backlog = 0
+
+    def submit(self, notification):
+        if self.backlog >= self.limit:
+            return False
+        if not self.channel.send(('notification', notification)):
+            return False
+        self.backlog += 1
+        return True
+
+
+class StatusWorker:
+    """Рабочий процесс: HTTP сервер уведомлений, опрос API статуса и потоковый канал"""
+
+    def __init__(self, conn, log_level='ERROR'):
+        self.conn = conn
+        self.channel = WorkerChannel(conn)
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_ChannelLogHandler(self.channel))
+        root.setLevel(log_level)
+
+        self.health = RemoteHealth(loop_stall=Config.Timers.HEALTH_LOOP_STALL)
+        self.http_server = None
+        self.status_client = None
+        self.status_stream = None
+        self.loop = None
+        self.stopped = None
+
+    async def run(self):
+        # Импортируется здесь: модуль cogs нужен только рабочему процессу
+        from cogs.notifications import create_notifications_server, stop_notifications_server, IN_FLIGHT_LIMIT
+
+        self.loop = asyncio.get_running_loop()
+        self.stopped = asyncio.Event()
+
+        self.http_server = create_notifications_server(
+            port=Config.NOTIFICATION_PORT,
+            notifications_cog=IngestionForwarder(self.channel, IN_FLIGHT_LIMIT),
+            health=self.health
+        )
+        threading.Thread(target=self.http_server.serve_forever, daemon=True).start()
+        threading.Thread(target=self.read_commands, daemon=True).start()
+        logger.warning(f"HTTP сервер для уведомлений слушает порт {Config.NOTIFICATION_PORT}")
+
+        self.status_client = StatusClient(Config.VS_SERVER_URL, timeout=Config.REQUEST_TIMEOUT, use_delta=Config.STATUS_DELTA_MODE)
+        tasks = [asyncio.create_task(self.poll_status())]
+        if Config.STATUS_STREAM_ENABLED:
+            from utils.status_stream import StatusStream
+            stream_url = Config.VS_STREAM_URL or Config.VS_SERVER_URL.rstrip('/') + '/stream'
+            self.status_stream = StatusStream(stream_url, self.on_stream_event, max_reconnect_delay=Config.Timers.RECONNECT_DELAY)
+            tasks.append(asyncio.create_task(self.status_stream.run()))
+
+        self.channel.send(('started', os.getpid()))
+        try:
+            await self.stopped.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            stop_notifications_server(self.http_server)
+            if self.status_stream:
+                await self.status_stream.close()
+            await self.status_client.close()
+            self.channel.close()
+
+    def read_commands(self):
+        """Читает команды основного процесса в отдельном потоке"""
+        while True:
+            try:
+                message = self.conn.recv()
+            except (EOFError, OSError):
+                # Основной процесс завершился - завершаемся и мы
+                message = ('stop',)
+            self.loop.call_soon_threadsafe(self.handle_command, message)
+            if message[0] == 'stop':
+                return
+
+    def handle_command(self, message):
+        kind = message[0]
+        if kind == 'health':
+            _, live, ready, backlog = message
+            self.health.update(live, ready)
+            self.http_server.notifications_cog.backlog = backlog
+        elif kind == 'drain':
+            with self.http_server.handoff_lock:
+                self.http_server.draining = True
+            self.channel.send(('drained',))
+        elif kind == 'log_level':
+            logging.getLogger().setLevel(message[1])
+        elif kind == 'stop':
+            self.stopped.set()
+
+    def success_age(self):
+        last_success = self.status_client.last_success
+        return time.monotonic() - last_success if last_success is not None else None
+
+    async def poll_status(self):
+        while True:
+            # Пока работает потоковое соединение, статус приходит без опроса
+            if self.status_stream and self.status_stream.connected:
+                self.channel.send(('status', None, 0.0, False))
+            else:
+                try:
+                    data, changed = await self.status_client.fetch()
+                    self.channel.send(('status', data if changed else None, self.success_age(), not changed))
+                except Exception as e:
+                    logger.error(f"Ошибка при опросе статуса сервера: {e}")
+            await asyncio.sleep(POLL_INTERVAL)
+
+    async def on_stream_event(self, event_name, data):
+        if event_name == 'status':
+            self.channel.send(('status', StatusClient.normalize(data), 0.0, False))
+        elif event_name == 'notification':
+            self.channel.send(('notification', data))
+
+
+def main(argv=None):
+    """Точка входа рабочего процесса: python -m utils.worker <адрес> <уровень журнала>"""
+    argv = sys.argv[1:] if argv is None else argv
+    address, log_level = argv[0], argv[1]
+    # Ctrl+C и SIGTERM службы получает вся группа процессов; рабочий процесс
+    # останавливает основной процесс после завершения приема уведомлений
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, signal.SIG_IGN)
+    conn = Client(address, authkey=bytes.fromhex(os.environ.pop(AUTHKEY_ENV)))
+    asyncio.run(StatusWorker(conn, log_level).run())
+
+
+# Основной процесс
+
+class WorkerSupervisor:
+    """Запускает рабочий процесс, перезапускает его при падении и передает его сообщения cogs"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.process = None
+        self.channel = None
+        self.started_at = None
+        self.restarts = 0
+        self.stopping = False
+        self.loop = None
+        self.inbox = None
+        self.statuses = None
+        self.drained = None
+        self.consumer_task = None
+        self.tasks = []
+        # Уведомления, пришедшие во время перезагрузки cog уведомлений
+        self.pending = deque(maxlen=PENDING_LIMIT)
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.inbox = asyncio.Queue()
+        self.statuses = asyncio.Queue()
+        await self.spawn()
+        self.consumer_task = self.loop.create_task(self.consume())
+        self.tasks = [
+            self.loop.create_task(self.apply_statuses()),
+            self.loop.create_task(self.monitor())
+        ]
+
+    async def spawn(self):
+        """Запускает рабочий процесс и ждет его подключения"""
+        authkey = os.urandom(32)
+        listener = Listener(authkey=authkey)
+        env = dict(os.environ, **{AUTHKEY_ENV: authkey.hex()})
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'utils.worker', listener.address, get_log_level()],
+            cwd=BASE_DIR, env=env
+        )
+        try:
+            conn = await asyncio.wait_for(asyncio.to_thread(listener.accept), CONNECT_TIMEOUT)
+        except Exception:
+            process.kill()
+            raise
+        finally:
+            listener.close()
+
+        self.process = process
+        self.channel = WorkerChannel(conn)
+        self.started_at = time.monotonic()
+        threading.Thread(target=self.read_messages, args=(conn,), daemon=True).start()
+        logger.warning(f"Рабочий процесс запущен (PID {process.pid})")
+
+    def send(self, message):
+        return self.channel is not None and self.channel.send(message)
+
+    def read_messages(self, conn):
+        """Читает сообщения рабочего процесса в отдельном потоке и передает их в цикл событий"""
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                return
+            try:
+                self.loop.call_soon_threadsafe(self.inbox.put_nowait, message)
+            except RuntimeError:
+                # Цикл событий уже закрыт
+                return
+
+    async def consume(self):
+        """Обрабатывает сообщения по порядку: статусы применяются последовательно"""
+        while True:
+            message = await self.inbox.get()
+            try:
+                await self.handle(message)
+            except Exception as e:
+                logger.error(f"Ошибка при обработке сообщения рабочего процесса {message[0]}: {e}", exc_info=e)
+
+    async def handle(self, message):
+        kind = message[0]
+        if kind == 'log':
+            record = logging.makeLogRecord(message[1])
+            logging.getLogger(record.name).handle(record)
+        elif kind == 'status':
+            self.statuses.put_nowait(message[1:])
+        elif kind == 'notification':
+            self.pending.append(message[1])
+            self.flush_pending()
+        elif kind == 'drained':
+            if self.drained is not None and not self.drained.done():
+                self.drained.set_result(True)
+        elif kind == 'started':
+            logger.info(f"Рабочий процесс {message[1]} готов")
+
+    async def apply_statuses(self):
+        """Применяет статусы по порядку после подключения к Discord (как задача status_update_task)"""
+        await self.bot.wait_until_ready()
+        while True:
+            data, success_age, not_modified = await self.statuses.get()
+            server_status = self.bot.get_cog('ServerStatus')
+            if server_status is None:
+                continue
+            try:
+                await server_status.apply_worker_status(data, success_age, not_modified)
+            except Exception as e:
+                logger.error(f"Ошибка при применении статуса от рабочего процесса: {e}")
+
+    def flush_pending(self):
+        """Передает накопленные уведомления cog уведомлений, если он загружен"""
+        notifications = self.bot.get_cog('Notifications')
+        if notifications is None:
+            return
+        while self.pending:
+            notification = self.pending.popleft()
+            task = asyncio.ensure_future(notifications.process_notification(notification))
+            notifications.track(task, notification)
+
+    def publish_health(self):
+        health = get_health_state(self.bot)
+        self.send(('health', health.liveness(), health.readiness(), health.queue_depth))
+
+    async def monitor(self):
+        """Отправляет рабочему процессу состояние здоровья и перезапускает его при падении"""
+        delay = 1
+        while not self.stopping:
+            await asyncio.sleep(HEALTH_PUBLISH_INTERVAL)
+            self.flush_pending()
+            if self.process.poll() is None:
+                self.publish_health()
+                continue
+
+            if time.monotonic() - self.started_at >= STABLE_RUN_TIME:
+                delay = 1
+            logger.error(f"Рабочий процесс завершился с кодом {self.process.returncode}, перезапуск через {delay} с")
+            self.channel.close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max(1, Config.Timers.RECONNECT_DELAY))
+            try:
+                await self.spawn()
+                self.restarts += 1
+            except Exception as e:
+                logger.error(f"Не удалось перезапустить рабочий процесс: {e}")
+                # Следующая попытка будет на следующей итерации
+                self.started_at = time.monotonic()
+
+    async def drain(self, timeout=5):
+        """Останавливает прием уведомлений в рабочем процессе
+
+        Возвращает описания уведомлений, которые некому передать (cog уведомлений не загружен).
+        Уже переданные уведомления дожидается Notifications.drain.
+        """
+        self.drained = self.loop.create_future()
+        if self.send(('drain',)):
+            try:
+                # Ответ приходит после всех уведомлений, отправленных до остановки приема
+                await asyncio.wait_for(asyncio.shield(self.drained), timeout)
+            except asyncio.TimeoutError:
+                logger.error("Рабочий процесс не подтвердил остановку приема уведомлений")
+        self.flush_pending()
+        return [notification.get('type', '?') for notification in self.pending]
+
+    async def stop(self, timeout=5):
+        """Останавливает рабочий процесс"""
+        self.stopping = True
+        for task in self.tasks:
+            task.cancel()
+        if self.process is not None and self.process.poll() is None:
+            self.send(('stop',))
+            try:
+                await asyncio.wait_for(asyncio.to_thread(self.process.wait), timeout)
+            except asyncio.TimeoutError:
+                logger.error("Рабочий процесс не завершился вовремя и будет остановлен принудительно")
+                self.process.kill()
+        # Дописываем в журнал последние записи рабочего процесса
+        await asyncio.sleep(0.1)
+        while not self.inbox.empty():
+            message = self.inbox.get_nowait()
+            if message[0] == 'log':
+                await self.handle(message)
+        if self.consumer_task is not None:
+            self.consumer_task.cancel()
+        if self.channel is not None:
+            self.channel.close()
+        logger.warning("Рабочий процесс остановлен")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ using System.Linq;
 using System;
 using System.Threading;
 using System.Net.Http;
+using System.Security.Cryptography;
 using System.Threading.Tasks;
 using System.Collections.Generic;
 
@@ -40,6 +41,9 @@ namespace StatusMod
         private int _lastPlayerCount = 0;
         private bool _lastServerOnline = false;
         
+        // Сервер останавливается: отключения игроков не отправляются боту
+        private bool _shuttingDown = false;
+        
         // Время ожидания запроса в миллисекундах
         private const int RequestTimeoutMs = 100;
         
@@ -47,6 +51,13 @@ namespace StatusMod
         private bool _lastStormStatus = false;
         private bool _stormWarningIssued = false;
         
+        // Последний отправленный боту прогноз шторма (игровые сутки и ожидаемое реальное время начала)
+        private double _lastForecastStormDays = -1;
+        private DateTime _lastForecastStormAtUtc = DateTime.MinValue;
+        // Расхождение ожидаемого времени, при котором прогноз отправляется повторно (в секундах),
+        // например если время на сервере стояло или изменилась скорость календаря
+        private const double StormForecastDriftSeconds = 120;
+        
         // Статус сезона для отслеживания изменений
         private string _lastSeason = "";
         
@@ -85,6 +96,8 @@ namespace StatusMod
             public int PlayerCount { get; set; }
             public string Message { get; set; }
             public string[] Players { get; set; }
+            // Первое уведомление после запуска сервера
+            public bool IsStartup { get; set; }
         }
 
         private const string DiscordBotUrl = "http://localhost:8081/status/notification";
@@ -92,6 +105,33 @@ namespace StatusMod
         // Статический HttpClient для многократного использования
         private static readonly HttpClient httpClient = new HttpClient();
 
+        // Общий с ботом секрет для подписи уведомлений (NOTIFICATION_SECRET в .env бота)
+        // Если переменная окружения не задана, уведомления отправляются без подписи
+        private static readonly string NotificationSecret = Environment.GetEnvironmentVariable("STATUSMOD_SECRET") ?? "";
+
+        // Создает запрос с уведомлениями и подписывает его: HMAC-SHA256 от "<метка времени>.<тело>"
+        private static HttpRequestMessage CreateNotificationRequest(string jsonString)
+        {
+            var request = new HttpRequestMessage(HttpMethod.Post, DiscordBotUrl)
+            {
+                Content = new StringContent(jsonString, Encoding.UTF8, "application/json")
+            };
+
+            if (!string.IsNullOrEmpty(NotificationSecret))
+            {
+                string timestamp = DateTimeOffset.UtcNow.ToUnixTimeSeconds().ToString();
+                using (var hmac = new HMACSHA256(Encoding.UTF8.GetBytes(NotificationSecret)))
+                {
+                    byte[] hash = hmac.ComputeHash(Encoding.UTF8.GetBytes(timestamp + "." + jsonString));
+                    string signature = BitConverter.ToString(hash).Replace("-", "").ToLowerInvariant();
+                    request.Headers.Add("X-Timestamp", timestamp);
+                    request.Headers.Add("X-Signature", "sha256=" + signature);
+                }
+            }
+
+            return request;
+        }
+
         // Класс для хранения элементов буфера уведомлений
         private class NotificationItem
         {
@@ -109,6 +149,52 @@ namespace StatusMod
 
         // Новый таймер для периодической отправки статуса сервера
         private long _periodicStatusTickListenerId;
+        
+        // Версионирование ответа статуса для условных запросов (ETag / 304) и дельт
+        private readonly object _statusVersionLock = new object();
+        // Эпоха отличает версии разных запусков мода, чтобы после перезапуска не было ложных 304
+        private readonly string _statusEpoch = DateTime.UtcNow.Ticks.ToString();
+        private long _statusVersionCounter = 0;
+        private string _statusFingerprint = null;
+        // История списков игроков по версиям (для ответов в режиме дельт)
+        private readonly Dictionary<string, string[]> _playersByVersion = new Dictionary<string, string[]>();
+        private readonly Queue<string> _statusVersionHistory = new Queue<string>();
+        private const int StatusVersionHistorySize = 64;
+        
+        // Потоковый канал (Server-Sent Events) для бота: снимки статуса и уведомления в реальном времени
+        private class StreamEvent
+        {
+            public string Id { get; set; }
+            public string Name { get; set; }
+            public string Json { get; set; }
+        }
+        
+        // Клиент потокового канала: кадры пишет в сокет отдельная задача клиента, а не игровой поток,
+        // поэтому клиент, который перестал читать, не задерживает тики сервера и других клиентов
+        private class StreamClient
+        {
+            public HttpListenerResponse Response { get; set; }
+            public readonly Queue<byte[]> Frames = new Queue<byte[]>();
+            public readonly SemaphoreSlim Signal = new SemaphoreSlim(0);
+            public volatile bool Closed;
+        }
+        
+        private readonly object _streamLock = new object();
+        private readonly List<StreamClient> _streamClients = new List<StreamClient>();
+        // История последних событий для возобновления соединения по Last-Event-ID
+        private readonly LinkedList<StreamEvent> _streamEvents = new LinkedList<StreamEvent>();
+        private long _streamSequence = 0;
+        private const int StreamEventHistorySize = 256;
+        // Очередь кадров клиента (вмещает всю историю для возобновления); при переполнении клиент отключается
+        private const int StreamClientQueueSize = StreamEventHistorySize + 64;
+        // Время, за которое должен записаться кадр, иначе клиент отключается (в миллисекундах)
+        private const int StreamWriteTimeout = 10000;
+        private string _lastStreamedStatusVersion = null;
+        private long _streamTickListenerId;
+        
+        // Интервал отправки keepalive-комментариев в поток при отсутствии событий (в секундах)
+        private const float StreamKeepAliveInterval = 30.0f;
+        private float _streamKeepAliveCounter = 0;
 
         public override void StartServerSide(ICoreServerAPI api)
         {
@@ -125,11 +211,13 @@ namespace StatusMod
                 _playerCountCheckListenerId = api.Event.RegisterGameTickListener(dt => CheckPlayerCountInternal(), 5000);
                 _notificationSenderTickListenerId = api.Event.RegisterGameTickListener(ProcessNotificationBuffer, 1000);
                 _periodicStatusTickListenerId = api.Event.RegisterGameTickListener(SendPeriodicServerStatus, 20000);
+                _streamTickListenerId = api.Event.RegisterGameTickListener(ProcessStream, 1000);
                 
                 StartHttpServer();
                 
                 api.Event.PlayerJoin += OnPlayerJoin;
                 api.Event.PlayerDisconnect += OnPlayerDisconnect;
+                api.Event.ServerRunPhase(EnumServerRunPhase.Shutdown, OnServerShutdown);
                 
                 SendInitialServerStatus();
                 
@@ -235,6 +323,14 @@ namespace StatusMod
                     response.Close();
                     return;
                 }
+                
+                // Потоковый канал: соединение остается открытым, ответ закрывается при отключении клиента
+                if (context.Request.Url.AbsolutePath.TrimEnd('/').EndsWith("/status/stream"))
+                {
+                    AcceptStreamClient(context);
+                    response = null;
+                    return;
+                }
 
                 // Готовим данные ответа
                 bool isOnline = true; // Сервер считается онлайн, если код выполняется
@@ -263,15 +359,63 @@ namespace StatusMod
                     maxPlayers = 32; // Стандартное значение
                 }
                 
-                var serverData = new
+                bool stormActive = GetTemporalStormStatus();
+                string prettyDate = api.World.Calendar.PrettyDate();
+                
+                // Версия меняется только при значимых изменениях (игроки, шторм, лимит игроков, игровой час),
+                // поэтому частые опросы бота чаще всего получают короткий ответ 304
+                string version = UpdateStatusVersion(playerNames, maxPlayers, stormActive, (long)api.World.Calendar.TotalHours);
+                string etag = "\"" + version + "\"";
+                
+                if (context.Request.Headers["If-None-Match"] == etag)
                 {
-                    online = isOnline,
-                    playerCount = playerCount,
-                    maxPlayers = maxPlayers,
-                    players = playerNames,
-                    prettyDate = api.World.Calendar.PrettyDate(),
-                    temporalStorm = GetTemporalStormStatus() ? "Активен" : "Неактивен"
-                };
+                    response.StatusCode = 304;
+                    response.AddHeader("ETag", etag);
+                    response.AddHeader("Cache-Control", "no-cache");
+                    return;
+                }
+                
+                // Режим дельт: если бот прислал известную версию, возвращаем только изменения списка игроков
+                string since = context.Request.QueryString["since"];
+                string[] basePlayers = null;
+                if (!string.IsNullOrEmpty(since))
+                {
+                    lock (_statusVersionLock)
+                    {
+                        _playersByVersion.TryGetValue(since, out basePlayers);
+                    }
+                }
+                
+                object serverData;
+                if (basePlayers != null)
+                {
+                    serverData = new
+                    {
+                        delta = true,
+                        version = version,
+                        baseVersion = since,
+                        online = isOnline,
+                        playerCount = playerCount,
+                        maxPlayers = maxPlayers,
+                        added = playerNames.Except(basePlayers).ToArray(),
+                        removed = basePlayers.Except(playerNames).ToArray(),
+                        prettyDate = prettyDate,
+                        temporalStorm = stormActive ? "Активен" : "Неактивен"
+                    };
+                }
+                else
+                {
+                    serverData = new
+                    {
+                        version = version,
+                        online = isOnline,
+                        playerCount = playerCount,
+                        maxPlayers = maxPlayers,
+                        players = playerNames,
+                        prettyDate = prettyDate,
+                        temporalStorm = stormActive ? "Активен" : "Неактивен"
+                    };
+                }
 
                 string jsonResponse = JsonConvert.SerializeObject(serverData);
                 byte[] buffer = Encoding.UTF8.GetBytes(jsonResponse);
@@ -281,9 +425,9 @@ namespace StatusMod
                 response.ContentType = "application/json; charset=utf-8";
                 response.ContentLength64 = buffer.Length;
                 response.AddHeader("Access-Control-Allow-Origin", "*");
-                response.AddHeader("Cache-Control", "no-cache, no-store, must-revalidate");
-                response.AddHeader("Pragma", "no-cache");
-                response.AddHeader("Expires", "0");
+                response.AddHeader("ETag", etag);
+                // no-cache разрешает повторную проверку по ETag
+                response.AddHeader("Cache-Control", "no-cache");
                 
                 try {
                     response.OutputStream.Write(buffer, 0, buffer.Length);
@@ -309,6 +453,259 @@ namespace StatusMod
             }
         }
 
+        // Обновляет версию состояния сервера, если изменились значимые данные, и возвращает текущую версию
+        private string UpdateStatusVersion(string[] players, int maxPlayers, bool stormActive, long totalHours)
+        {
+            string fingerprint = string.Join("\n", players.OrderBy(p => p)) + "|" + maxPlayers + "|" + stormActive + "|" + totalHours;
+            
+            lock (_statusVersionLock)
+            {
+                if (fingerprint != _statusFingerprint)
+                {
+                    _statusFingerprint = fingerprint;
+                    _statusVersionCounter++;
+                    
+                    string newVersion = _statusEpoch + "-" + _statusVersionCounter;
+                    _playersByVersion[newVersion] = players;
+                    _statusVersionHistory.Enqueue(newVersion);
+                    
+                    // Храним ограниченное количество версий
+                    while (_statusVersionHistory.Count > StatusVersionHistorySize)
+                    {
+                        _playersByVersion.Remove(_statusVersionHistory.Dequeue());
+                    }
+                }
+                
+                return _statusEpoch + "-" + _statusVersionCounter;
+            }
+        }
+
+        // Формирует полный снимок статуса сервера для потокового канала
+        private object BuildStreamStatusSnapshot(out string version)
+        {
+            string[] playerNames = api.World.AllOnlinePlayers?.Select(p => p.PlayerName).ToArray() ?? new string[0];
+            
+            int maxPlayers = 32;
+            try {
+                if (api.Server.Config.MaxClients > 0) maxPlayers = api.Server.Config.MaxClients;
+            } catch { }
+            
+            bool stormActive = GetTemporalStormStatus();
+            version = UpdateStatusVersion(playerNames, maxPlayers, stormActive, (long)api.World.Calendar.TotalHours);
+            
+            return new
+            {
+                version = version,
+                online = true,
+                playerCount = playerNames.Length,
+                maxPlayers = maxPlayers,
+                players = playerNames,
+                prettyDate = api.World.Calendar.PrettyDate(),
+                temporalStorm = stormActive ? "Активен" : "Неактивен"
+            };
+        }
+        
+        private static byte[] FormatStreamFrame(string id, string name, string json)
+        {
+            var frame = new StringBuilder();
+            if (!string.IsNullOrEmpty(id)) frame.Append("id: ").Append(id).Append('\n');
+            frame.Append("event: ").Append(name).Append('\n');
+            frame.Append("data: ").Append(json).Append("\n\n");
+            return Encoding.UTF8.GetBytes(frame.ToString());
+        }
+        
+        // Ставит кадр в очередь клиента; возвращает false, если клиент отключен или его очередь переполнена.
+        // Не обращается к сокету, поэтому может вызываться из игрового потока и под _streamLock
+        private bool EnqueueStreamFrame(StreamClient client, byte[] frame)
+        {
+            if (client.Closed) return false;
+            lock (client.Frames)
+            {
+                if (client.Frames.Count >= StreamClientQueueSize)
+                {
+                    _logger?.Warning("Клиент потокового канала не успевает читать события и будет отключен");
+                    CloseStreamClient(client);
+                    return false;
+                }
+                client.Frames.Enqueue(frame);
+            }
+            client.Signal.Release();
+            return true;
+        }
+        
+        // Помечает клиента закрытым; соединение разрывает его задача записи
+        private static void CloseStreamClient(StreamClient client)
+        {
+            client.Closed = true;
+            client.Signal.Release();
+        }
+        
+        // Отправляет кадры очереди клиента, пока он не отключится, не переполнит очередь или не перестанет читать
+        private async Task RunStreamWriter(StreamClient client)
+        {
+            try
+            {
+                while (!client.Closed)
+                {
+                    await client.Signal.WaitAsync();
+                    byte[] frame;
+                    lock (client.Frames)
+                    {
+                        if (client.Closed || client.Frames.Count == 0) continue;
+                        frame = client.Frames.Dequeue();
+                    }
+                    
+                    Task write = WriteStreamFrameAsync(client.Response, frame);
+                    if (await Task.WhenAny(write, Task.Delay(StreamWriteTimeout)) != write)
+                    {
+                        _logger?.Warning("Истекло время записи в потоковый канал, клиент отключен");
+                        break;
+                    }
+                    await write;
+                }
+            }
+            catch
+            {
+                // Клиент отключился
+            }
+            finally
+            {
+                lock (_streamLock)
+                {
+                    _streamClients.Remove(client);
+                }
+                client.Closed = true;
+                try { client.Response.Abort(); } catch { }
+            }
+        }
+        
+        private static async Task WriteStreamFrameAsync(HttpListenerResponse response, byte[] frame)
+        {
+            await response.OutputStream.WriteAsync(frame, 0, frame.Length);
+            await response.OutputStream.FlushAsync();
+        }
+        
+        // Ставит кадр в очереди всех подключенных клиентов (вызывается под _streamLock)
+        private void BroadcastStreamFrame(byte[] frame)
+        {
+            _streamClients.RemoveAll(client => !EnqueueStreamFrame(client, frame));
+        }
+        
+        private bool HasStreamClients()
+        {
+            lock (_streamLock)
+            {
+                return _streamClients.Count > 0;
+            }
+        }
+        
+        // Подключает нового клиента потокового канала и досылает пропущенные события
+        private void AcceptStreamClient(HttpListenerContext context)
+        {
+            var response = context.Response;
+            response.StatusCode = 200;
+            response.ContentType = "text/event-stream; charset=utf-8";
+            response.SendChunked = true;
+            response.AddHeader("Cache-Control", "no-cache");
+            var client = new StreamClient { Response = response };
+            
+            string lastEventId = context.Request.Headers["Last-Event-ID"];
+            
+            lock (_streamLock)
+            {
+                LinkedListNode<StreamEvent> resumeFrom = null;
+                if (!string.IsNullOrEmpty(lastEventId))
+                {
+                    for (var node = _streamEvents.Last; node != null; node = node.Previous)
+                    {
+                        if (node.Value.Id == lastEventId)
+                        {
+                            resumeFrom = node;
+                            break;
+                        }
+                    }
+                }
+                
+                if (resumeFrom != null)
+                {
+                    // Клиент возобновляет соединение: досылаем только пропущенные события
+                    for (var node = resumeFrom.Next; node != null; node = node.Next)
+                    {
+                        EnqueueStreamFrame(client, FormatStreamFrame(node.Value.Id, node.Value.Name, node.Value.Json));
+                    }
+                }
+                else
+                {
+                    // Новый клиент или история уже вытеснена: отправляем полный снимок статуса
+                    string lastId = _streamEvents.Last?.Value.Id;
+                    object snapshot = BuildStreamStatusSnapshot(out string version);
+                    EnqueueStreamFrame(client, FormatStreamFrame(lastId, "status", JsonConvert.SerializeObject(snapshot)));
+                    _lastStreamedStatusVersion = version;
+                }
+                
+                _streamClients.Add(client);
+            }
+            
+            // Заголовки и досланные события отправляет задача записи клиента
+            Task.Run(() => RunStreamWriter(client));
+            _logger.Warning("Бот подключился к потоковому каналу статуса");
+        }
+        
+        // Публикует событие в потоковый канал и сохраняет его в истории
+        private void PublishStreamEvent(string name, object data)
+        {
+            lock (_streamLock)
+            {
+                _streamSequence++;
+                var streamEvent = new StreamEvent
+                {
+                    Id = _statusEpoch + "-" + _streamSequence,
+                    Name = name,
+                    Json = JsonConvert.SerializeObject(data)
+                };
+                
+                _streamEvents.AddLast(streamEvent);
+                while (_streamEvents.Count > StreamEventHistorySize)
+                {
+                    _streamEvents.RemoveFirst();
+                }
+                
+                BroadcastStreamFrame(FormatStreamFrame(streamEvent.Id, streamEvent.Name, streamEvent.Json));
+                _streamKeepAliveCounter = 0;
+            }
+        }
+        
+        // Публикует снимок статуса при его изменении и поддерживает соединение keepalive-комментариями
+        private void ProcessStream(float dt)
+        {
+            if (_disposed || !_isInitialized || !HasStreamClients()) return;
+            
+            try
+            {
+                object snapshot = BuildStreamStatusSnapshot(out string version);
+                if (version != _lastStreamedStatusVersion)
+                {
+                    _lastStreamedStatusVersion = version;
+                    PublishStreamEvent("status", snapshot);
+                    return;
+                }
+                
+                _streamKeepAliveCounter += dt;
+                if (_streamKeepAliveCounter >= StreamKeepAliveInterval)
+                {
+                    _streamKeepAliveCounter = 0;
+                    lock (_streamLock)
+                    {
+                        BroadcastStreamFrame(Encoding.UTF8.GetBytes(": keepalive\n\n"));
+                    }
+                }
+            }
+            catch (Exception ex)
+            {
+                _logger?.Error($"Ошибка при обработке потокового канала: {ex}");
+            }
+        }
+
         private bool GetTemporalStormStatus()
         {
             if (_disposed || api == null) return false;
@@ -355,6 +752,9 @@ namespace StatusMod
                         // Отменяем регистрацию таймера для периодической отправки статуса
                         api.Event.UnregisterGameTickListener(_periodicStatusTickListenerId);
                         
+                        // Отменяем регистрацию таймера потокового канала
+                        api.Event.UnregisterGameTickListener(_streamTickListenerId);
+                        
                         // Отправляем оставшиеся уведомления в буфере
                         lock (_bufferLock)
                         {
@@ -379,8 +779,7 @@ namespace StatusMod
                                 try
                                 {
                                     string jsonString = JsonConvert.SerializeObject(batchRequest);
-                                    var content = new StringContent(jsonString, Encoding.UTF8, "application/json");
-                                    var response = httpClient.PostAsync(DiscordBotUrl, content).Result;
+                                    var response = httpClient.SendAsync(CreateNotificationRequest(jsonString)).Result;
                                     
                                     if (response.IsSuccessStatusCode)
                                     {
@@ -408,6 +807,16 @@ namespace StatusMod
                     }
                 }
                 
+                // Закрываем соединения потокового канала
+                lock (_streamLock)
+                {
+                    foreach (var client in _streamClients)
+                    {
+                        CloseStreamClient(client);
+                    }
+                    _streamClients.Clear();
+                }
+                
                 lock (_lock)
                 {
                     if (listener != null)
@@ -644,6 +1053,11 @@ namespace StatusMod
                     
                     _lastStormStatus = currentStormStatus;
                 }
+                
+                if (!currentStormStatus)
+                {
+                    UpdateStormForecast(systems.StormData.nextStormTotalDays);
+                }
             }
             catch (Exception ex)
             {
@@ -651,6 +1065,39 @@ namespace StatusMod
             }
         }
         
+        // Отправляет боту прогноз следующего шторма, если он изменился: бот сам планирует напоминание
+        private void UpdateStormForecast(double nextStormTotalDays)
+        {
+            var calendar = api.World.Calendar;
+            double daysUntil = nextStormTotalDays - calendar.TotalDays;
+            double gameSecondsPerSecond = calendar.SpeedOfTime * calendar.CalendarSpeedMul;
+            if (daysUntil <= 0 || gameSecondsPerSecond <= 0) return;
+            
+            // Длительность игровых суток в реальных секундах
+            double secondsPerDay = calendar.HoursPerDay * 3600.0 / gameSecondsPerSecond;
+            DateTime stormAtUtc = DateTime.UtcNow.AddSeconds(daysUntil * secondsPerDay);
+            
+            if (nextStormTotalDays == _lastForecastStormDays &&
+                Math.Abs((stormAtUtc - _lastForecastStormAtUtc).TotalSeconds) < StormForecastDriftSeconds)
+            {
+                return;
+            }
+            
+            _lastForecastStormDays = nextStormTotalDays;
+            _lastForecastStormAtUtc = stormAtUtc;
+            
+            var requestData = new
+            {
+                type = "storm_forecast",
+                storm_at = new DateTimeOffset(stormAtUtc).ToUnixTimeSeconds(),
+                days_until = daysUntil,
+                seconds_per_day = secondsPerDay,
+                time = calendar.PrettyDate()
+            };
+            
+            SendHttpNotification(requestData, "прогнозе шторма");
+        }
+        
         // Внутренний метод для проверки сезона (без параметра dt)
         private void CheckSeasonChangeInternal()
         {
@@ -688,6 +1135,8 @@ namespace StatusMod
         // Внутренний метод для проверки количества игроков (без параметра dt)
         private void CheckPlayerCountInternal()
         {
+            if (_shuttingDown) return;
+            
             try
             {
                 // Получаем текущее количество игроков
@@ -773,13 +1222,13 @@ namespace StatusMod
             try
             {
                 string jsonString = JsonConvert.SerializeObject(batchData);
-                var content = new StringContent(jsonString, Encoding.UTF8, "application/json");
+                var request = CreateNotificationRequest(jsonString);
                 
                 Task.Run(async () =>
                 {
                     try
                     {
-                        var response = await httpClient.PostAsync(DiscordBotUrl, content);
+                        var response = await httpClient.SendAsync(request);
                         
                         if (!response.IsSuccessStatusCode)
                         {
@@ -804,6 +1253,18 @@ namespace StatusMod
         {
             try
             {
+                // Если бот подключен к потоковому каналу, доставляем уведомление сразу, минуя буфер
+                if (HasStreamClients())
+                {
+                    PublishStreamEvent("notification", new
+                    {
+                        type = notificationType,
+                        data = data,
+                        timestamp = DateTime.Now.ToString("yyyy-MM-dd HH:mm:ss")
+                    });
+                    return;
+                }
+                
                 lock (_bufferLock)
                 {
                     _notificationBuffer.Add(new NotificationItem(data, notificationType));
@@ -879,6 +1340,7 @@ namespace StatusMod
                     player_count = notification.PlayerCount,
                     players = notification.Players ?? new string[0],
                     message = notification.Message,
+                    is_startup = notification.IsStartup,
                     time = api?.World?.Calendar?.PrettyDate() ?? "Неизвестно"
                 };
                 
@@ -904,7 +1366,8 @@ namespace StatusMod
                     IsOnline = true,
                     PlayerCount = currentPlayerCount,
                     Message = $"Сервер запущен, игроков онлайн: {currentPlayerCount}",
-                    Players = playerNames
+                    Players = playerNames,
+                    IsStartup = true
                 };
                 
                 SendServerStatusNotification(notification);
@@ -944,10 +1407,15 @@ namespace StatusMod
         // Обработчик события отключения игрока
         private void OnPlayerDisconnect(IServerPlayer player)
         {
+            // При остановке сервера отключаются все игроки: бот получает одно уведомление об остановке
+            if (_shuttingDown) return;
+            
             try
             {
-                int currentPlayerCount = api.World.AllOnlinePlayers.Length;
-                string[] playerNames = api.World.AllOnlinePlayers.Select(p => p.PlayerName).ToArray();
+                // Отключающийся игрок еще может быть в списке онлайн
+                var remainingPlayers = api.World.AllOnlinePlayers.Where(p => p.PlayerUID != player.PlayerUID).ToArray();
+                int currentPlayerCount = remainingPlayers.Length;
+                string[] playerNames = remainingPlayers.Select(p => p.PlayerName).ToArray();
                 
                 _lastPlayerCount = currentPlayerCount;
                 
@@ -967,9 +1435,35 @@ namespace StatusMod
             }
         }
         
+        // Обработчик остановки сервера
+        private void OnServerShutdown()
+        {
+            _shuttingDown = true;
+            
+            try
+            {
+                var notification = new ServerStatusNotification
+                {
+                    IsOnline = false,
+                    PlayerCount = 0,
+                    Message = "Сервер останавливается",
+                    Players = new string[0]
+                };
+                
+                SendServerStatusNotification(notification);
+            }
+            catch (Exception ex)
+            {
+                _logger.Error($"Ошибка при отправке уведомления об остановке сервера: {ex}");
+            }
+        }
+        
         // Метод для отправки периодических обновлений статуса сервера (каждые 20 секунд)
         private void SendPeriodicServerStatus(float dt)
         {
+            // При подключенном потоковом канале пульс не нужен: бот получает снимки статуса и keepalive
+            if (HasStreamClients()) return;
+            
             try
             {
                 int currentPlayerCount = api.World.AllOnlinePlayers.Length;